@@ -70,7 +70,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'skucore.authentication.SchoolTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -150,6 +150,23 @@ elif not DEBUG:
         print(f"Warning: Could not configure database from DATABASE_URL: {e}")
 
 
+# Cache
+# Tenant/role invalidation, calendar and counter caches only reach every gunicorn
+# worker through a shared cache, so production sets REDIS_URL. Without it each
+# process has its own in-memory cache (fine for a single dev server).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -210,6 +227,54 @@ LOGOUT_REDIRECT_URL = 'login'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Month (1-12) in which the academic year starts; used by the attendance bitmap index
+ACADEMIC_YEAR_START_MONTH = config('ACADEMIC_YEAR_START_MONTH', default=9, cast=int)
+# Chronic absenteeism: share of recorded days absent over a rolling window
+CHRONIC_ABSENCE_THRESHOLD = config('CHRONIC_ABSENCE_THRESHOLD', default=0.1, cast=float)
+CHRONIC_ABSENCE_WINDOW_DAYS = config('CHRONIC_ABSENCE_WINDOW_DAYS', default=30, cast=int)
+# Seconds a month of the attendance calendar stays cached. Writes invalidate it in
+# every worker only with a shared cache (REDIS_URL); otherwise just in their own process.
+ATTENDANCE_CALENDAR_CACHE_TTL = config('ATTENDANCE_CALENDAR_CACHE_TTL', default=3600, cast=int)
+# Seconds dashboard/portal counters stay cached. Writes invalidate them in every
+# worker only with a shared cache (REDIS_URL); otherwise just in their own process.
+SCHOOL_STATS_CACHE_TTL = config('SCHOOL_STATS_CACHE_TTL', default=300, cast=int)
+# Background jobs (skucore/jobs.py, manage.py run_workers). JOBS_EAGER runs jobs in
+# the web process right after commit instead, for setups without a worker.
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)
+JOB_WORKER_THREADS = config('JOB_WORKER_THREADS', default=2, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=2.0, cast=float)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+# Retry backoff: base * 2^(attempt - 1) seconds, capped
+JOB_RETRY_BASE_DELAY = config('JOB_RETRY_BASE_DELAY', default=10, cast=int)
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=3600, cast=int)
+# Seconds after which a running job is assumed lost and requeued
+JOB_LOCK_TIMEOUT = config('JOB_LOCK_TIMEOUT', default=1800, cast=int)
+JOB_RETENTION_DAYS = config('JOB_RETENTION_DAYS', default=7, cast=int)
+# Chunked Record uploads (skucore/uploads.py): part files, size limits and idle expiry
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default=os.path.join(BASE_DIR, 'upload_sessions'))
+UPLOAD_CHUNK_MAX_SIZE = config('UPLOAD_CHUNK_MAX_SIZE', default=8 * 1024 * 1024, cast=int)
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=200 * 1024 * 1024, cast=int)
+UPLOAD_SESSION_TTL_HOURS = config('UPLOAD_SESSION_TTL_HOURS', default=24, cast=int)
+# Hours an unreferenced Record blob is kept before gc_record_blobs deletes it
+RECORD_BLOB_GC_GRACE_HOURS = config('RECORD_BLOB_GC_GRACE_HOURS', default=24, cast=int)
+# Signed media links (skucore/media.py): lifetime window in seconds, and an optional
+# hand-off to the front server (nginx internal location prefix, or Apache X-Sendfile)
+MEDIA_URL_TTL = config('MEDIA_URL_TTL', default=300, cast=int)
+MEDIA_X_ACCEL_PREFIX = config('MEDIA_X_ACCEL_PREFIX', default='')
+MEDIA_X_SENDFILE = config('MEDIA_X_SENDFILE', default=False, cast=bool)
+# Threads hashing passwords during import_staff / POST /api/staff/import/ (default: one per CPU)
+STAFF_IMPORT_WORKERS = config('STAFF_IMPORT_WORKERS', default=os.cpu_count() or 4, cast=int)
+# Private folder holding queued staff import CSVs (they contain passwords) until their job runs
+STAFF_IMPORT_DIR = config('STAFF_IMPORT_DIR', default=os.path.join(BASE_DIR, 'staff_imports'))
+
+# Process-local tenant resolution cache (skucore/tenant_cache.py); entries are also
+# checked against a generation number in the shared cache on every lookup
+TENANT_CACHE_MAX_SIZE = config('TENANT_CACHE_MAX_SIZE', default=1024, cast=int)
+TENANT_CACHE_TTL = config('TENANT_CACHE_TTL', default=300, cast=int)
+# Seconds a role/capability snapshot stays valid in a session; role changes end it
+# earlier through a version number in the shared cache
+CAPABILITY_SNAPSHOT_TTL = config('CAPABILITY_SNAPSHOT_TTL', default=300, cast=int)
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
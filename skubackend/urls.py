@@ -23,6 +23,10 @@ from skucore.views import (
     bus_list, bus_create, bus_detail, bus_update, bus_delete,
     # Attendance
     attendance_list, attendance_create, attendance_update, attendance_delete,
+    # Autocomplete
+    autocomplete,
+    # Media
+    media_file,
     # Original views
     python_home, api_data
 )
@@ -34,6 +38,7 @@ from skucore.portal_views import (
     # Individual portals
     teacher_portal, operator_portal, readonly_portal, admin_portal,
     principal_portal, vice_principal_portal,
+    portal_student_rows, portal_parent_rows,
     # Onboarding
     onboarding_request_list, onboarding_request_create, onboarding_request_detail,
     onboarding_request_approve, onboarding_pending_approvals,
@@ -64,6 +69,8 @@ urlpatterns = [
     path('portal/admin/', admin_portal, name='admin_portal'),
     path('portal/principal/', principal_portal, name='principal_portal'),
     path('portal/vice-principal/', vice_principal_portal, name='vice_principal_portal'),
+    path('portal/students/rows/', portal_student_rows, name='portal_student_rows'),
+    path('portal/parents/rows/', portal_parent_rows, name='portal_parent_rows'),
     
     # Onboarding Requests
     path('onboarding/', onboarding_request_list, name='onboarding_request_list'),
@@ -121,6 +128,12 @@ urlpatterns = [
     path('attendance/<int:pk>/edit/', attendance_update, name='attendance_update'),
     path('attendance/<int:pk>/delete/', attendance_delete, name='attendance_delete'),
     
+    # Autocomplete (form widgets)
+    path('autocomplete/<str:kind>/', autocomplete, name='autocomplete'),
+
+    # Signed Record files and photos (under /media/ so no school context is loaded)
+    path('media/signed/<str:token>/<str:filename>', media_file, name='media_file'),
+    
     # Original views
     path('python-ui/', python_home),
     path('api/data/', api_data),
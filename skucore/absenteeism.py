@@ -0,0 +1,86 @@
+"""
+Chronic absenteeism detection.
+
+Absence rates are computed in the database with one grouped aggregate per
+school (recorded days and absent days per active student over a rolling
+window), so no Attendance rows are loaded into Python. The nightly job
+writes the flagged students of each school to ChronicAbsence.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Attendance, ChronicAbsence
+
+
+def default_threshold():
+    return getattr(settings, 'CHRONIC_ABSENCE_THRESHOLD', 0.1)
+
+
+def default_window():
+    return getattr(settings, 'CHRONIC_ABSENCE_WINDOW_DAYS', 30)
+
+
+def window_bounds(days, as_of=None):
+    """(from_date, to_date) of a rolling window of `days` days ending on as_of"""
+    to_date = as_of or timezone.localdate()
+    return to_date - timedelta(days=days - 1), to_date
+
+
+def absence_rates(school_id, from_date, to_date):
+    """
+    Recorded and absent day counts per active student of a school over
+    [from_date, to_date], one grouped query. Students with no attendance in
+    the window are left out.
+    """
+    rows = (
+        Attendance.objects
+        .filter(school_id=school_id, student__is_active=True, date__range=(from_date, to_date))
+        .order_by()
+        .values('student')
+        .annotate(days_recorded=Count('id'), days_absent=Count('id', filter=Q(status='absent')))
+    )
+    return [
+        {
+            'student': row['student'],
+            'days_recorded': row['days_recorded'],
+            'days_absent': row['days_absent'],
+            'absence_rate': round(row['days_absent'] / row['days_recorded'], 4),
+        }
+        for row in rows
+    ]
+
+
+def find_chronic_absentees(school_id, threshold=None, days=None, as_of=None):
+    """Students whose absence rate is at or above threshold, worst first"""
+    threshold = default_threshold() if threshold is None else threshold
+    from_date, to_date = window_bounds(days or default_window(), as_of)
+    flagged = [row for row in absence_rates(school_id, from_date, to_date) if row['absence_rate'] >= threshold]
+    flagged.sort(key=lambda row: row['absence_rate'], reverse=True)
+    return from_date, to_date, flagged
+
+
+def detect_chronic_absenteeism(school_id, threshold=None, days=None, as_of=None):
+    """Recompute and store the flagged set of one school. Returns (from_date, to_date, flagged)."""
+    threshold = default_threshold() if threshold is None else threshold
+    from_date, to_date, flagged = find_chronic_absentees(school_id, threshold, days, as_of)
+    with transaction.atomic():
+        ChronicAbsence.objects.filter(school_id=school_id).delete()
+        ChronicAbsence.objects.bulk_create([
+            ChronicAbsence(
+                school_id=school_id,
+                student_id=row['student'],
+                from_date=from_date,
+                to_date=to_date,
+                days_recorded=row['days_recorded'],
+                days_absent=row['days_absent'],
+                absence_rate=row['absence_rate'],
+                threshold=threshold,
+            )
+            for row in flagged
+        ], batch_size=1000)
+    return from_date, to_date, flagged
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .api_views import (
-    api_login, api_logout, api_me,
+    api_login, api_logout, api_me, api_cache_stats, api_search, api_storage_usage,
+    api_import_staff, api_import_staff_status,
     StudentViewSet, ParentViewSet, GradeViewSet,
     SubjectViewSet, BusViewSet, RouteViewSet,
-    AttendanceViewSet, OnboardingViewSet,
+    AttendanceViewSet, OnboardingViewSet, UploadSessionViewSet,
 )
 
 router = DefaultRouter()
@@ -16,12 +17,18 @@ router.register(r'routes', RouteViewSet, basename='api-route')
 router.register(r'buses', BusViewSet, basename='api-bus')
 router.register(r'attendance', AttendanceViewSet, basename='api-attendance')
 router.register(r'onboarding', OnboardingViewSet, basename='api-onboarding')
+router.register(r'uploads', UploadSessionViewSet, basename='api-upload')
 
 urlpatterns = [
     # Auth endpoints
     path('auth/login/', api_login, name='api-login'),
     path('auth/logout/', api_logout, name='api-logout'),
     path('auth/me/', api_me, name='api-me'),
+    path('system/cache-stats/', api_cache_stats, name='api-cache-stats'),
+    path('system/storage-usage/', api_storage_usage, name='api-storage-usage'),
+    path('search/', api_search, name='api-search'),
+    path('staff/import/', api_import_staff, name='api-staff-import'),
+    path('staff/import/<int:job_id>/', api_import_staff_status, name='api-staff-import-status'),
 
     # All resource endpoints
     path('', include(router.urls)),
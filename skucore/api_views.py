@@ -1,23 +1,32 @@
+import io
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser, SAFE_METHODS
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from .models import (
     Student, Parent, Grade, Subject, Bus, Route,
-    Attendance, Address, Record, StudentOnboardingRequest
+    Attendance, Address, Job, Record, StudentOnboardingRequest, UploadSession
 )
 from .serializers import (
     StudentSerializer, ParentSerializer, GradeSerializer,
     SubjectSerializer, BusSerializer, RouteSerializer,
     AttendanceSerializer, AddressSerializer, RecordSerializer,
-    StudentOnboardingSerializer
+    StudentOnboardingSerializer, UploadSessionSerializer
 )
+from .attendance import bulk_upsert_attendance, summarize_attendance
+from . import absenteeism, archives, attendance_index, jobs, search, staff_import, storage, uploads
+from .onboarding import move_onboarding_records
+from .pagination import KeysetPagination
 from .permissions import user_is_admin
+from . import tenant_cache
 
 
 # ============================================================
@@ -76,15 +85,8 @@ def api_me(request):
     GET /api/auth/me/
     Returns current user info and school context
     """
-    from .models import UserSchool
     user = request.user
-    school = getattr(request, 'school', None)
-    if not school:
-        user_school = UserSchool.objects.filter(
-            user=user, is_active=True
-        ).select_related('school').first()
-        if user_school:
-            school = user_school.school
+    school = getattr(request, 'school', None) or tenant_cache.get_user_school(user)
     return Response({
         'id': user.id,
         'username': user.username,
@@ -98,6 +100,132 @@ def api_me(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_cache_stats(request):
+    """
+    GET /api/system/cache-stats/
+    Hit/miss counters of the in-process caches for the worker serving this request
+    """
+    return Response({'caches': tenant_cache.cache_stats()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_storage_usage(request):
+    """
+    GET /api/system/storage-usage/
+    Record file storage of the current school (admins): logical bytes across
+    all records and stored bytes with duplicates counted once
+    """
+    if not user_is_admin(request.user):
+        return Response({'error': 'Only admins can view storage usage'}, status=status.HTTP_403_FORBIDDEN)
+    school = getattr(request, 'school', None) or tenant_cache.get_user_school(request.user)
+    if not school:
+        return Response({'error': 'No active school context'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'school': school.id, **storage.storage_usage(school.id)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_import_staff(request):
+    """
+    POST /api/staff/import/  (multipart: file=<csv>[, dry_run=true])
+    Create staff users, roles and memberships of the current school from a
+    CSV (admins). Invalid rows are skipped and listed with their line number.
+    A dry run validates the file and answers at once; an import is queued
+    and answers 202 with the job to poll at GET /api/staff/import/<job>/.
+    """
+    if not user_is_admin(request.user):
+        return Response({'error': 'Only admins can import staff'}, status=status.HTTP_403_FORBIDDEN)
+    school = getattr(request, 'school', None) or tenant_cache.get_user_school(request.user)
+    if not school:
+        return Response({'error': 'No active school context'}, status=status.HTTP_400_BAD_REQUEST)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    try:
+        text = upload.read().decode('utf-8-sig')
+        rows = staff_import.read_csv(io.StringIO(text, newline=''))
+        if dry_run:
+            result = staff_import.import_staff(rows, school, dry_run=True)
+    except (staff_import.StaffImportError, UnicodeDecodeError) as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if dry_run:
+        return Response({'school': school.id, 'dry_run': True, **result})
+
+    job = staff_import.queue_import(school, text)
+    return Response(
+        {'school': school.id, 'dry_run': False, 'job': job.id, 'status': job.status},
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_import_staff_status(request, job_id):
+    """
+    GET /api/staff/import/<job>/
+    Status of a queued staff import of the current school (admins), with
+    the import result ('created', 'skipped', 'errors') once it succeeded
+    """
+    if not user_is_admin(request.user):
+        return Response({'error': 'Only admins can import staff'}, status=status.HTTP_403_FORBIDDEN)
+    school = getattr(request, 'school', None) or tenant_cache.get_user_school(request.user)
+    job = Job.objects.filter(id=job_id, task=staff_import.import_staff_csv.job_name).first()
+    if job is None or not school or job.args[:1] != [school.id]:
+        return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+    response = {'school': school.id, 'job': job.id, 'status': job.status}
+    if job.status == 'succeeded':
+        response.update(job.result)
+    elif job.status == 'failed':
+        response['error'] = 'The import failed; no staff were created'
+    return Response(response)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_search(request):
+    """
+    GET /api/search/?q=jo sm[&type=student,parent,onboarding][&limit=20]
+    Ranked prefix search over the current school's students, parents and
+    onboarding requests
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q query parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+    kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+    if any(kind not in search.KINDS for kind in kinds):
+        return Response(
+            {'error': f"type must be one of: {', '.join(search.KINDS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+
+    school = getattr(request, 'school', None) or tenant_cache.get_user_school(request.user)
+    results = search.search(school, query, kinds=kinds, limit=limit)
+    return Response({'query': query, 'count': len(results), 'results': results})
+
+
+def parse_index_window(params):
+    """(academic_year, from_date, to_date) from ?year=&from_date=&to_date=; raises ValueError"""
+    from_date = parse_date(params['from_date']) if params.get('from_date') else None
+    to_date = parse_date(params['to_date']) if params.get('to_date') else None
+    if params.get('from_date') and not from_date or params.get('to_date') and not to_date:
+        raise ValueError('Dates must be YYYY-MM-DD')
+    if params.get('year'):
+        year = int(params['year'])
+    else:
+        year = attendance_index.academic_year_for(from_date or timezone.localdate())
+    if not 1900 <= year <= 2100:
+        raise ValueError('year must be between 1900 and 2100')
+    return year, from_date, to_date
+
+
 # ============================================================
 # BASE VIEWSET
 # ============================================================
@@ -105,32 +233,61 @@ def api_me(request):
 class SchoolFilteredViewSet(viewsets.ModelViewSet):
     """Base viewset that auto-filters queryset by school and sets school on create."""
     permission_classes = [IsAuthenticated]
+    # Ordering for opt-in keyset pagination (?pagination=cursor); must end
+    # with a unique column. None keeps page-number pagination only.
+    cursor_ordering = None
+
+    @property
+    def paginator(self):
+        if (not hasattr(self, '_paginator') and self.cursor_ordering
+                and KeysetPagination.requested(self.request)):
+            self._paginator = KeysetPagination(self.cursor_ordering)
+        return super().paginator
 
     def get_school(self):
         """
-        Get school for current request. DRF token auth runs inside the view
-        (after middleware), so request.school may be None for token requests.
-        Fall back to UserSchool lookup using the now-authenticated request.user.
+        Get school for current request. For token requests the school is
+        attached by SchoolTokenAuthentication; otherwise it is set by
+        SchoolContextMiddleware. Fall back to the cached UserSchool lookup.
         """
-        from .models import UserSchool
         school = getattr(self.request, 'school', None)
         if school:
             return school
-        # Token auth: user is now authenticated but middleware ran before auth
-        user = self.request.user
-        if user and user.is_authenticated:
-            user_school = UserSchool.objects.filter(
-                user=user, is_active=True
-            ).select_related('school').first()
-            if user_school:
-                return user_school.school
-        return None
+        return tenant_cache.get_user_school(self.request.user)
+
+    def get_field_selection(self):
+        """
+        (fields, expand) requested with ?fields=a,b / ?expand=c on reads.
+        Writes always use the full serializer.
+        """
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None, None
+        params = self.request.query_params
+
+        def split(name):
+            if name not in params:
+                return None
+            return [field for field in params[name].split(',') if field]
+
+        return split('fields'), split('expand')
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_field_selection()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if expand is not None:
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
         school = self.get_school()
-        if school:
-            return self.queryset.filter(school=school)
-        return self.queryset.none()
+        if not school:
+            return self.queryset.none()
+        queryset = self.queryset.filter(school=school)
+        # Only join/prefetch what the requested fields need
+        serializer_class = self.get_serializer_class()
+        field_names = serializer_class.resolve_field_names(*self.get_field_selection())
+        return serializer_class.setup_eager_loading(queryset, field_names)
 
     def perform_create(self, serializer):
         school = self.get_school()
@@ -149,10 +306,28 @@ class GradeViewSet(SchoolFilteredViewSet):
     PUT    /api/grades/{id}/      - Update grade
     PATCH  /api/grades/{id}/      - Partial update
     DELETE /api/grades/{id}/      - Delete grade
+    GET    /api/grades/{id}/records/archive/ - ZIP of every student's records (admin only)
     """
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
 
+    @action(detail=True, methods=['get'], url_path='records/archive')
+    def records_archive(self, request, pk=None):
+        """GET /api/grades/{id}/records/archive/ - Streamed ZIP with a folder per student and manifest.csv"""
+        if not user_is_admin(request.user):
+            return Response(
+                {'error': 'Only admins can export grade records'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        grade = self.get_object()
+        records = (
+            Record.objects.filter(school=grade.school, student__grade=grade)
+            .select_related('student', 'uploaded_by')
+            .order_by('student__last_name', 'student__first_name', 'student_id', 'created_at')
+        )
+        filename = f"{archives._safe(grade.grade_name)}_records.zip"
+        return archives.archive_response(records.iterator(chunk_size=500), filename)
+
 
 # ============================================================
 # SUBJECT VIEWSET
@@ -202,14 +377,14 @@ class BusViewSet(SchoolFilteredViewSet):
     DELETE /api/buses/{id}/                 - Delete bus
     GET    /api/buses/{id}/students/        - List students on this bus
     """
-    queryset = Bus.objects.select_related('route').all()
+    queryset = Bus.objects.all()
     serializer_class = BusSerializer
 
     @action(detail=True, methods=['get'])
     def students(self, request, pk=None):
         """GET /api/buses/{id}/students/ - Get all students on this bus"""
         bus = self.get_object()
-        students = bus.students.filter(school=request.school)
+        students = StudentSerializer.setup_eager_loading(bus.students.filter(school=request.school))
         serializer = StudentSerializer(students, many=True)
         return Response(serializer.data)
 
@@ -228,14 +403,14 @@ class ParentViewSet(SchoolFilteredViewSet):
     DELETE /api/parents/{id}/     - Delete parent
     GET    /api/parents/{id}/students/ - List children of this parent
     """
-    queryset = Parent.objects.select_related('address').all()
+    queryset = Parent.objects.all()
     serializer_class = ParentSerializer
 
     @action(detail=True, methods=['get'])
     def students(self, request, pk=None):
         """GET /api/parents/{id}/students/ - Get all children of this parent"""
         parent = self.get_object()
-        students = parent.students.filter(school=request.school)
+        students = StudentSerializer.setup_eager_loading(parent.students.filter(school=request.school))
         serializer = StudentSerializer(students, many=True)
         return Response(serializer.data)
 
@@ -246,7 +421,9 @@ class ParentViewSet(SchoolFilteredViewSet):
 
 class StudentViewSet(SchoolFilteredViewSet):
     """
-    GET    /api/students/                       - List all students
+    GET    /api/students/                       - List all students (?pagination=cursor for keyset pages)
+                                                  ?fields=id,first_name,... for sparse rows,
+                                                  ?expand= for lean rows, ?expand=grade_detail,... to add nested data
     POST   /api/students/                       - Create student (admin only)
     GET    /api/students/{id}/                  - Retrieve student
     PUT    /api/students/{id}/                  - Update student (admin only)
@@ -254,13 +431,15 @@ class StudentViewSet(SchoolFilteredViewSet):
     DELETE /api/students/{id}/                  - Delete student (admin only)
     GET    /api/students/active/                - List only active students
     GET    /api/students/{id}/attendance/       - Student's attendance history
+    GET    /api/students/{id}/attendance_stats/ - Attendance rate and streaks (?year=)
     POST   /api/students/{id}/records/          - Upload a record for student
+                                                   (large files: see /api/uploads/)
     GET    /api/students/{id}/records/          - List records for student
+    GET    /api/students/{id}/records/archive/  - All of the student's records as a streamed ZIP
     """
-    queryset = Student.objects.select_related('grade', 'bus').prefetch_related(
-        'parents', 'subjects', 'records'
-    ).all()
+    queryset = Student.objects.all()
     serializer_class = StudentSerializer
+    cursor_ordering = ('last_name', 'first_name', 'id')
 
     def create(self, request, *args, **kwargs):
         if not user_is_admin(request.user):
@@ -310,6 +489,21 @@ class StudentViewSet(SchoolFilteredViewSet):
         serializer = AttendanceSerializer(records, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def attendance_stats(self, request, pk=None):
+        """
+        GET /api/students/{id}/attendance_stats/?year=2025[&from_date=&to_date=]
+        Counts per status, attendance rate and streaks for an academic year,
+        computed from the bitmap index
+        """
+        student = self.get_object()
+        try:
+            year, from_date, to_date = parse_index_window(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        stats = attendance_index.student_stats(student, year, from_date, to_date)
+        return Response({'student': student.id, 'academic_year': year, **stats})
+
     @action(detail=True, methods=['get', 'post'])
     def records(self, request, pk=None):
         """
@@ -333,6 +527,14 @@ class StudentViewSet(SchoolFilteredViewSet):
         serializer = RecordSerializer(records, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='records/archive')
+    def records_archive(self, request, pk=None):
+        """GET /api/students/{id}/records/archive/ - Streamed ZIP of the records with manifest.csv"""
+        student = self.get_object()
+        records = student.records.select_related('student', 'uploaded_by').order_by('created_at')
+        filename = f"{archives.student_folder(student)}_records.zip"
+        return archives.archive_response(records.iterator(), filename)
+
 
 # ============================================================
 # ATTENDANCE VIEWSET
@@ -340,18 +542,24 @@ class StudentViewSet(SchoolFilteredViewSet):
 
 class AttendanceViewSet(SchoolFilteredViewSet):
     """
-    GET    /api/attendance/               - List attendance records
+    GET    /api/attendance/               - List attendance records (?pagination=cursor for keyset pages)
     POST   /api/attendance/               - Create single attendance record
     GET    /api/attendance/{id}/          - Retrieve attendance record
     PUT    /api/attendance/{id}/          - Update attendance record
     PATCH  /api/attendance/{id}/          - Partial update
     DELETE /api/attendance/{id}/          - Delete attendance record
-    POST   /api/attendance/bulk/          - Create multiple attendance records
+    POST   /api/attendance/bulk/          - Create or update multiple attendance records
     GET    /api/attendance/by_date/       - Get attendance for a specific date (?date=YYYY-MM-DD)
     GET    /api/attendance/summary/       - Attendance summary for a date (?date=YYYY-MM-DD)
+                                            or a range (?from_date=&to_date=[&grade=])
+    GET    /api/attendance/rates/         - Per-student attendance rates (?year=[&below=])
+    GET    /api/attendance/absent_on/     - Students absent on all of ?dates=d1,d2,...
+    GET    /api/attendance/chronic_absence/ - Students over an absence rate (?threshold=&days=&as_of=)
+    POST   /api/attendance/chronic_absence/ - Same, and store the flagged set (admins)
     """
-    queryset = Attendance.objects.select_related('student').all()
+    queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
+    cursor_ordering = ('-date', '-id')
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -370,34 +578,123 @@ class AttendanceViewSet(SchoolFilteredViewSet):
             {"student": 2, "date": "2026-02-19", "status": "absent"},
             ...
         ]
+        Inserts or updates (school, student, date) rows in one transaction, so
+        a roster can be resubmitted. Returns one result per index:
+        {"index": 0, "status": "saved"} or {"index": 1, "status": "error", "errors": {...}}
         """
         if not isinstance(request.data, list):
             return Response(
                 {'error': 'Expected a list of attendance records'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        school = self.get_school()
+        if not school:
+            return Response(
+                {'error': 'No active school context.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        created = []
-        errors = []
+        results = bulk_upsert_attendance(school, request.data)
+        saved = sum(1 for result in results if result['status'] == 'saved')
+        failed = len(results) - saved
 
-        for idx, item in enumerate(request.data):
-            serializer = AttendanceSerializer(data=item)
-            if serializer.is_valid():
-                serializer.save(school=request.school)
-                created.append(serializer.data)
-            else:
-                errors.append({'index': idx, 'errors': serializer.errors})
+        return Response(
+            {
+                'message': f'{saved} attendance records saved',
+                'saved': saved,
+                'failed': failed,
+                'results': results,
+            },
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'])
+    def rates(self, request):
+        """
+        GET /api/attendance/rates/?year=2025[&from_date=&to_date=&below=0.9]
+        Attendance rate of every student in the school, from the bitmap index.
+        Optional ?below= keeps only students under that rate.
+        """
+        try:
+            year, from_date, to_date = parse_index_window(request.query_params)
+            below = float(request.query_params['below']) if request.query_params.get('below') else None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rates = attendance_index.school_rates(self.get_school(), year, from_date, to_date)
+        if below is not None:
+            rates = [row for row in rates if row['attendance_rate'] < below]
+        rates.sort(key=lambda row: row['attendance_rate'])
+        return Response({'academic_year': year, 'count': len(rates), 'results': rates})
 
-        if errors:
+    @action(detail=False, methods=['get'])
+    def absent_on(self, request):
+        """
+        GET /api/attendance/absent_on/?dates=2026-02-19,2026-02-20
+        Students marked absent on every one of the given dates
+        """
+        try:
+            days = [parse_date(value) for value in request.query_params.get('dates', '').split(',') if value]
+        except ValueError:
+            days = [None]
+        if not days or None in days:
             return Response(
-                {'created': created, 'errors': errors},
-                status=status.HTTP_207_MULTI_STATUS
+                {'error': 'dates query parameter is required (comma-separated YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        school = self.get_school()
+        student_ids = attendance_index.absent_on_all(school, days)
+        students = Student.objects.filter(school=school, id__in=student_ids).values('id', 'first_name', 'last_name')
+        return Response({'dates': days, 'count': len(students), 'results': list(students)})
 
-        return Response(
-            {'message': f'{len(created)} attendance records created', 'data': created},
-            status=status.HTTP_201_CREATED
-        )
+    @action(detail=False, methods=['get', 'post'])
+    def chronic_absence(self, request):
+        """
+        GET  /api/attendance/chronic_absence/?threshold=0.1&days=30[&as_of=2026-02-19]
+            Active students whose absence rate over the rolling window is at
+            or above threshold, computed with one grouped query
+        POST /api/attendance/chronic_absence/
+            Recompute and store the flagged set for this school
+        """
+        params = request.query_params
+        try:
+            threshold = float(params['threshold']) if params.get('threshold') else absenteeism.default_threshold()
+            days = int(params['days']) if params.get('days') else absenteeism.default_window()
+            as_of = parse_date(params['as_of']) if params.get('as_of') else None
+            if params.get('as_of') and not as_of or not 1 <= days <= 3660 or not 0 < threshold <= 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': 'threshold must be a number between 0 and 1, days an integer from 1 to 3660 and as_of YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        school = self.get_school()
+        if not school:
+            return Response(
+                {'error': 'No active school context.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if request.method == 'POST':
+            if not user_is_admin(request.user):
+                return Response({'error': 'Only admins can store results'}, status=status.HTTP_403_FORBIDDEN)
+            detect = absenteeism.detect_chronic_absenteeism
+        else:
+            detect = absenteeism.find_chronic_absentees
+        from_date, to_date, flagged = detect(school.id, threshold, days, as_of)
+        names = {
+            student['id']: f"{student['first_name']} {student['last_name']}"
+            for student in Student.objects.filter(id__in=[row['student'] for row in flagged])
+            .values('id', 'first_name', 'last_name')
+        }
+        for row in flagged:
+            row['student_name'] = names.get(row['student'])
+        return Response({
+            'from_date': from_date,
+            'to_date': to_date,
+            'threshold': threshold,
+            'count': len(flagged),
+            'results': flagged,
+        })
 
     @action(detail=False, methods=['get'])
     def by_date(self, request):
@@ -419,24 +716,37 @@ class AttendanceViewSet(SchoolFilteredViewSet):
     def summary(self, request):
         """
         GET /api/attendance/summary/?date=2026-02-19
-        Returns count of present, absent, late, excused for a date
+            Returns count of present, absent, late, excused for a date
+        GET /api/attendance/summary/?from_date=2026-02-01&to_date=2026-02-28[&grade=3]
+            Returns per-day counts and totals for a date range
+        Served from the daily roll-ups, not by counting Attendance rows.
         """
-        date = request.query_params.get('date')
-        if not date:
+        params = request.query_params
+        date = params.get('date')
+        try:
+            if date:
+                from_date = to_date = parse_date(date)
+            else:
+                from_date = parse_date(params.get('from_date') or '')
+                to_date = parse_date(params.get('to_date') or '')
+            grade_id = int(params['grade']) if params.get('grade') else None
+        except ValueError:
+            from_date = to_date = None
+        if not from_date or not to_date:
             return Response(
-                {'error': 'date query parameter is required (YYYY-MM-DD)'},
+                {'error': 'date (or from_date and to_date) query parameters are required (YYYY-MM-DD)'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        records = self.get_queryset().filter(date=date)
-        summary = {
-            'date': date,
-            'total': records.count(),
-            'present': records.filter(status='present').count(),
-            'absent': records.filter(status='absent').count(),
-            'late': records.filter(status='late').count(),
-            'excused': records.filter(status='excused').count(),
-        }
-        return Response(summary)
+
+        days, totals = summarize_attendance(self.get_school(), from_date, to_date, grade_id)
+        if date:
+            return Response({'date': date, **totals})
+        return Response({
+            'from_date': from_date,
+            'to_date': to_date,
+            **totals,
+            'days': days,
+        })
 
 
 # ============================================================
@@ -445,7 +755,7 @@ class AttendanceViewSet(SchoolFilteredViewSet):
 
 class OnboardingViewSet(SchoolFilteredViewSet):
     """
-    GET    /api/onboarding/               - List onboarding requests
+    GET    /api/onboarding/               - List onboarding requests (?pagination=cursor for keyset pages)
     POST   /api/onboarding/               - Submit new onboarding request
     GET    /api/onboarding/{id}/          - Retrieve request
     GET    /api/onboarding/pending/       - List pending requests
@@ -454,6 +764,7 @@ class OnboardingViewSet(SchoolFilteredViewSet):
     """
     queryset = StudentOnboardingRequest.objects.all()
     serializer_class = StudentOnboardingSerializer
+    cursor_ordering = ('-created_at', '-id')
 
     def perform_create(self, serializer):
         school = self.get_school()
@@ -492,27 +803,29 @@ class OnboardingViewSet(SchoolFilteredViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create the student from onboarding data
-        student = Student.objects.create(
-            school=onboarding.school,
-            first_name=onboarding.first_name,
-            last_name=onboarding.last_name,
-            email=onboarding.email,
-            phone_number=onboarding.phone_number,
-            date_of_birth=onboarding.date_of_birth,
-            photo=onboarding.photo,
-            grade=onboarding.grade,
-            bus=onboarding.bus,
-            address=onboarding.address,
-        )
-        student.parents.set(onboarding.parents.all())
-        student.subjects.set(onboarding.subjects.all())
+        with transaction.atomic():
+            # Create the student from onboarding data
+            student = Student.objects.create(
+                school=onboarding.school,
+                first_name=onboarding.first_name,
+                last_name=onboarding.last_name,
+                email=onboarding.email,
+                phone_number=onboarding.phone_number,
+                date_of_birth=onboarding.date_of_birth,
+                photo=onboarding.photo,
+                grade=onboarding.grade,
+                bus=onboarding.bus,
+                address=onboarding.address,
+            )
+            student.parents.set(onboarding.parents.all())
+            student.subjects.set(onboarding.subjects.all())
+            move_onboarding_records(onboarding.id, student.id)
 
-        onboarding.status = 'completed'
-        onboarding.approved_by = request.user
-        onboarding.approved_at = timezone.now()
-        onboarding.created_student = student
-        onboarding.save()
+            onboarding.status = 'completed'
+            onboarding.approved_by = request.user
+            onboarding.approved_at = timezone.now()
+            onboarding.created_student = student
+            onboarding.save()
 
         return Response({
             'message': 'Onboarding request approved and student created',
@@ -542,3 +855,91 @@ class OnboardingViewSet(SchoolFilteredViewSet):
         onboarding.save()
 
         return Response({'message': 'Onboarding request rejected', 'reason': reason})
+
+
+# ============================================================
+# CHUNKED UPLOADS VIEWSET
+# ============================================================
+
+class UploadSessionViewSet(SchoolFilteredViewSet):
+    """
+    POST   /api/uploads/                  - Open a session: {filename, total_size, record_type,
+                                            student | onboarding_request[, description, expected_sha256]}
+    GET    /api/uploads/                  - List your upload sessions
+    GET    /api/uploads/{id}/             - Session status; `received` is where to resume
+    PUT    /api/uploads/{id}/chunk/       - Raw chunk bytes at ?offset= (or an Upload-Offset header)
+    POST   /api/uploads/{id}/finalize/    - Verify the checksum and create the Record
+    DELETE /api/uploads/{id}/             - Abort and discard the received bytes
+    """
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+    http_method_names = ['get', 'post', 'put', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        return super().get_queryset().filter(created_by=self.request.user)
+
+    def perform_create(self, serializer):
+        from rest_framework.exceptions import ValidationError
+        school = self.get_school()
+        if not school:
+            raise ValidationError({'school': 'No active school context.'})
+        data = serializer.validated_data
+        target = data.get('student') or data.get('onboarding_request')
+        if target.school_id != school.id:
+            raise ValidationError({'student': 'Student or onboarding request not found in this school.'})
+        if data['total_size'] > uploads.max_upload_size():
+            raise ValidationError({'total_size': f'Files may be at most {uploads.max_upload_size()} bytes.'})
+        serializer.save(school=school, created_by=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        return Response(
+            {'error': 'Send chunks to /api/uploads/{id}/chunk/'},
+            status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        session = self.get_object()
+        if session.status == 'open':
+            uploads.abort(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """
+        PUT /api/uploads/{id}/chunk/?offset=N
+        Body: the raw bytes of the chunk (any Content-Type), with Content-Length
+        409 with the current `received` when the offset is past it
+        """
+        session = self.get_object()
+        offset = request.query_params.get('offset', request.headers.get('Upload-Offset'))
+        length = request.headers.get('Content-Length')
+        if offset is None or length is None:
+            return Response(
+                {'error': 'offset and a Content-Length header are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            offset, length = int(offset), int(length)
+        except ValueError:
+            return Response({'error': 'offset and Content-Length must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = request.stream
+        if stream is None:
+            length = 0
+        try:
+            session = uploads.write_chunk(session.id, offset, stream, length)
+        except uploads.OffsetMismatch as e:
+            return Response({'error': str(e), 'received': e.received}, status=status.HTTP_409_CONFLICT)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'id': session.id, 'received': session.received, 'total_size': session.total_size})
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """POST /api/uploads/{id}/finalize/ - Assemble the Record once every byte is received"""
+        session = self.get_object()
+        try:
+            session = uploads.finalize(session.id)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(session).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,142 @@
+"""
+Streaming ZIP archives of Record files.
+
+The archive is written by zipfile into a sink that is drained after every
+block, so the response starts with the first file's header and memory use
+stays at about one block however large the archive grows. Files that are
+already compressed (PDF, images, office documents) are stored as-is, the
+rest is deflated. A manifest.csv listing every record, including files
+missing from storage, is appended at the end.
+"""
+
+import csv
+import io
+import os
+import re
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+from .storage import BLOCK_SIZE
+
+
+STORED_EXTENSIONS = {
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.zip', '.gz', '.docx', '.xlsx', '.pptx', '.mp4', '.mp3',
+}
+MANIFEST_FIELDS = [
+    'path', 'record_id', 'student_id', 'student_name', 'record_type',
+    'description', 'size', 'sha256', 'uploaded_by', 'created_at', 'status',
+]
+
+
+class _Sink:
+    """Write-only, unseekable file object; zipfile then writes data descriptors"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _safe(text):
+    return re.sub(r'[^\w.-]+', '_', text or '').strip('_') or 'unnamed'
+
+
+def student_folder(student):
+    if student is None:
+        return 'onboarding'
+    return _safe(f'{student.last_name}_{student.first_name}_{student.id}')
+
+
+def _entry_name(record, folder):
+    ext = os.path.splitext(record.file.name)[1].lower()
+    return f'{folder}/{_safe(record.record_type)}_{record.id}{ext}'
+
+
+def _zip_info(name, when, size=None):
+    info = zipfile.ZipInfo(name, date_time=timezone.localtime(when).timetuple()[:6])
+    ext = os.path.splitext(name)[1].lower()
+    info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    if size is not None:
+        info.file_size = size  # Lets zipfile pick ZIP64 headers up front for large files
+    return info
+
+
+def stream_records_zip(records, folder=student_folder):
+    """
+    Yield a ZIP archive of `records` (an iterable of Record with student
+    loaded) block by block. `folder(student)` names each student's directory.
+    """
+    sink = _Sink()
+    manifest = io.StringIO()
+    writer = csv.DictWriter(manifest, fieldnames=MANIFEST_FIELDS)
+    writer.writeheader()
+    used = set()
+
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as archive:
+        for record in records:
+            name = _entry_name(record, folder(record.student))
+            while name in used:
+                root, ext = os.path.splitext(name)
+                name = f'{root}_dup{ext}'
+            row = {
+                'path': name,
+                'record_id': record.id,
+                'student_id': record.student_id or '',
+                'student_name': f'{record.student.first_name} {record.student.last_name}' if record.student else '',
+                'record_type': record.get_record_type_display(),
+                'description': record.description or '',
+                'size': record.size or '',
+                'sha256': record.sha256,
+                'uploaded_by': record.uploaded_by.username if record.uploaded_by else '',
+                'created_at': record.created_at.isoformat(),
+                'status': 'included',
+            }
+            storage = record.file.storage
+            if not record.file.name or not storage.exists(record.file.name):
+                row.update(path='', status='missing')
+                writer.writerow(row)
+                continue
+
+            used.add(name)
+            size = storage.size(record.file.name)
+            row['size'] = size
+            with storage.open(record.file.name, 'rb') as source, \
+                    archive.open(_zip_info(name, record.created_at, size), 'w', force_zip64=size > 0x7FFFFFFF) as target:
+                while True:
+                    block = source.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    target.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            writer.writerow(row)
+            data = sink.drain()
+            if data:
+                yield data
+
+        archive.writestr(_zip_info('manifest.csv', timezone.now()), manifest.getvalue())
+    yield sink.drain()
+
+
+def archive_response(records, filename, folder=student_folder):
+    """StreamingHttpResponse downloading `records` as `filename`"""
+    response = StreamingHttpResponse(stream_records_zip(records, folder), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'  # Let nginx pass blocks through as they are produced
+    return response
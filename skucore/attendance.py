@@ -0,0 +1,305 @@
+"""
+Attendance write paths shared by the API and the HTML views.
+"""
+
+import calendar
+import operator
+from collections import Counter, defaultdict
+from datetime import date as date_cls
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from .attendance_index import index_attendance
+from .models import Attendance, AttendanceDailySummary, Student
+from .serializers import AttendanceBulkItemSerializer
+
+
+UPSERT_FIELDS = ['status', 'remarks', 'recorded_by']
+STATUSES = [value for value, _ in Attendance.ATTENDANCE_CHOICES]
+
+
+def bulk_upsert_attendance(school, items):
+    """
+    Insert-or-update a batch of attendance rows for one school.
+
+    Rows are validated in Python, student ids are checked against the school
+    with a single query, and everything is written with one
+    INSERT ... ON CONFLICT (school, student, date) DO UPDATE inside a
+    transaction, so resubmitting a roster is idempotent.
+
+    Returns a list with one result per input item:
+    {'index': i, 'status': 'saved'} or {'index': i, 'status': 'error', 'errors': {...}}
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = AttendanceBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+    student_ids = {data['student'] for _, data in valid}
+    # student id -> grade id, which is also the roll-up row the mark counts in
+    known_students = dict(
+        Student.objects.filter(school=school, id__in=student_ids).values_list('id', 'grade_id')
+    ) if student_ids else {}
+
+    # (student, date) -> index; the last entry for a student/day wins
+    rows = {}
+    for index, data in valid:
+        if data['student'] not in known_students:
+            results[index] = {
+                'index': index, 'status': 'error',
+                'errors': {'student': [f'Invalid pk "{data["student"]}" - object does not exist.']},
+            }
+            continue
+        key = (data['student'], data['date'])
+        if key in rows:
+            earlier = rows[key][0]
+            results[earlier] = {
+                'index': earlier, 'status': 'error',
+                'errors': {'non_field_errors': [f'Superseded by entry {index} for the same student and date.']},
+            }
+        rows[key] = (index, data)
+
+    objs = [
+        Attendance(
+            school=school,
+            student_id=data['student'],
+            date=data['date'],
+            status=data['status'],
+            remarks=data.get('remarks'),
+            recorded_by=data.get('recorded_by', ''),
+        )
+        for _, data in rows.values()
+    ]
+    if objs:
+        with transaction.atomic():
+            # Lock the rows about to be overwritten, so each old status is taken off the roll-ups once
+            previous = {
+                (student_id, day): status
+                for student_id, day, status in Attendance.objects.select_for_update()
+                .filter(school=school, student_id__in={obj.student_id for obj in objs}, date__in={obj.date for obj in objs})
+                .order_by('pk').values_list('student_id', 'date', 'status')
+            }
+            Attendance.objects.bulk_create(
+                objs,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['school', 'student', 'date'],
+                update_fields=UPSERT_FIELDS,
+            )
+            # bulk_create sends no signals; update the roll-ups and bitmaps here
+            deltas = defaultdict(Counter)
+            for obj in objs:
+                counts = deltas[(school.id, obj.date, known_students[obj.student_id])]
+                old = previous.get((obj.student_id, obj.date))
+                if old:
+                    counts[old] -= 1
+                counts[obj.status] += 1
+            apply_summary_deltas(deltas)
+            index_attendance(marks=[(school.id, obj.student_id, obj.date, obj.status) for obj in objs])
+    for index, _ in rows.values():
+        results[index] = {'index': index, 'status': 'saved'}
+    return results
+
+
+# ============ DAILY ROLL-UPS ============
+
+def status_counts():
+    """Aggregates counting all rows and each status in a single pass"""
+    counts = {'total': Count('id')}
+    for status in STATUSES:
+        counts[status] = Count('id', filter=Q(status=status))
+    return counts
+
+
+def apply_summary_deltas(deltas):
+    """
+    Add status counts to the AttendanceDailySummary rows they belong to.
+    `deltas` maps (school_id, date, grade_id) to {status: change}; 'total'
+    follows their sum. Missing rows are inserted empty, then one UPDATE adds
+    a CASE over the keys to every counter, so concurrent writes only wait on
+    the (school, date, grade) rows they touch. Rows that drop to zero are
+    deleted.
+    """
+    changes = {}
+    for key, counts in deltas.items():
+        counts = {status: n for status, n in counts.items() if n}
+        if key[0] and counts:
+            changes[key] = counts
+    if not changes:
+        return
+    # Inserted in a fixed order, so two writers never wait on each other's new rows crosswise
+    keys = sorted(changes, key=lambda key: (key[0], key[1], key[2] or 0))
+    rows = {key: Q(school_id=key[0], date=key[1], grade_id=key[2]) for key in keys}
+    matching = reduce(operator.or_, rows.values())
+
+    def delta(field):
+        whens = [
+            When(row, then=Value(sum(changes[key].values()) if field == 'total' else changes[key].get(field, 0)))
+            for key, row in rows.items()
+        ]
+        return F(field) + Case(*whens, default=Value(0))
+
+    with transaction.atomic(savepoint=False):
+        AttendanceDailySummary.objects.bulk_create(
+            [AttendanceDailySummary(school_id=school_id, date=day, grade_id=grade_id) for school_id, day, grade_id in keys],
+            ignore_conflicts=True,
+        )
+        summaries = AttendanceDailySummary.objects.filter(matching)
+        summaries.update(updated_at=timezone.now(), **{field: delta(field) for field in ['total'] + STATUSES})
+        if any(sum(counts.values()) < 0 for counts in changes.values()):
+            summaries.filter(total=0).delete()
+
+    months = defaultdict(set)
+    for school_id, day, _ in keys:
+        months[school_id].add((day.year, day.month))
+    for school_id, school_months in months.items():
+        # After commit, or another worker could re-cache the month from the old roll-ups
+        transaction.on_commit(lambda school_id=school_id, school_months=school_months: invalidate_calendar(
+            school_id, months=school_months
+        ))
+
+
+def attendance_deltas(attendance, grade_id, sign):
+    """Deltas adding (sign=1) or removing (sign=-1) the marks of an Attendance queryset under `grade_id`"""
+    deltas = defaultdict(Counter)
+    rows = attendance.order_by().values('school_id', 'date', 'status').annotate(count=Count('id'))
+    for row in rows:
+        deltas[(row['school_id'], row['date'], grade_id)][row['status']] += sign * row['count']
+    return deltas
+
+
+def fold_grade_summaries(grade_id):
+    """A grade is being deleted and its students un-graded: move its roll-ups to the no-grade rows"""
+    summaries = AttendanceDailySummary.objects.filter(grade_id=grade_id)
+    deltas = {
+        (row['school_id'], row['date'], None): {status: row[status] for status in STATUSES}
+        for row in summaries.values('school_id', 'date', *STATUSES)
+    }
+    summaries.delete()
+    apply_summary_deltas(deltas)
+
+
+def rebuild_daily_summaries(school_id, dates=None, from_date=None, to_date=None):
+    """
+    Recompute the AttendanceDailySummary rows of one school, either for the
+    given dates or for a date range (the whole history if neither is given),
+    with one grouped aggregate over Attendance.
+
+    For backfills and repairs (seeding, manage.py rebuild_attendance_summaries);
+    writes keep the roll-ups current with apply_summary_deltas(). The old rows
+    are deleted before the aggregate is read, so a concurrent write to a row
+    that already existed waits for the rebuild and is then counted.
+    """
+    attendance = Attendance.objects.filter(school_id=school_id)
+    summaries = AttendanceDailySummary.objects.filter(school_id=school_id)
+    if dates is not None:
+        attendance = attendance.filter(date__in=dates)
+        summaries = summaries.filter(date__in=dates)
+    if from_date:
+        attendance = attendance.filter(date__gte=from_date)
+        summaries = summaries.filter(date__gte=from_date)
+    if to_date:
+        attendance = attendance.filter(date__lte=to_date)
+        summaries = summaries.filter(date__lte=to_date)
+
+    with transaction.atomic():
+        summaries.delete()
+        rows = attendance.order_by().values('date', 'student__grade').annotate(**status_counts())
+        AttendanceDailySummary.objects.bulk_create([
+            AttendanceDailySummary(
+                school_id=school_id,
+                date=row['date'],
+                grade_id=row['student__grade'],
+                total=row['total'],
+                **{status: row[status] for status in STATUSES},
+            )
+            for row in rows
+        ], batch_size=1000)
+    months = {(day.year, day.month) for day in dates} if dates is not None else None
+    transaction.on_commit(lambda: invalidate_calendar(school_id, months=months))
+
+
+def summarize_attendance(school, from_date, to_date, grade_id=None):
+    """
+    Per-day status counts for a date range, read from the roll-ups.
+    Returns (days, totals).
+    """
+    summaries = AttendanceDailySummary.objects.filter(school=school, date__range=(from_date, to_date))
+    if grade_id:
+        summaries = summaries.filter(grade_id=grade_id)
+    fields = ['total'] + STATUSES
+    days = list(
+        summaries.order_by('date').values('date').annotate(**{field: Sum(field) for field in fields})
+    )
+    totals = {field: sum(day[field] for day in days) for field in fields}
+    return days, totals
+
+
+# ============ CALENDAR ============
+
+def _calendar_version_key(school_id):
+    return f'skucore:attendance-calendar-version:{school_id}'
+
+
+def _calendar_key(school_id, year, month):
+    version = cache.get(_calendar_version_key(school_id), 0)
+    return f'skucore:attendance-calendar:{school_id}:{version}:{year}-{month:02d}'
+
+
+def invalidate_calendar(school_id, months=None):
+    """
+    Drop cached calendar months of a school: the given (year, month) pairs,
+    or every month when months is None.
+    """
+    if months is not None:
+        cache.delete_many([_calendar_key(school_id, year, month) for year, month in months])
+        return
+    key = _calendar_version_key(school_id)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def month_day_counts(school_id, year, month):
+    """
+    {day of month: {'total': n, 'present': n, ...}} for the days of one month
+    that have attendance, one grouped query over the roll-ups. Cached per
+    (school, year, month) until an attendance write touches that month;
+    with a shared cache (REDIS_URL) that holds for every worker.
+    """
+    key = _calendar_key(school_id, year, month)
+    days = cache.get(key)
+    if days is None:
+        last_day = calendar.monthrange(year, month)[1]
+        fields = ['total'] + STATUSES
+        rows = (
+            AttendanceDailySummary.objects
+            .filter(school_id=school_id, date__range=(date_cls(year, month, 1), date_cls(year, month, last_day)))
+            .order_by().values('date').annotate(**{field: Sum(field) for field in fields})
+        )
+        days = {row['date'].day: {field: row[field] for field in fields} for row in rows}
+        cache.set(key, days, getattr(settings, 'ATTENDANCE_CALENDAR_CACHE_TTL', 3600))
+    return days
+
+
+def month_calendar(school_id, year, month, firstweekday=calendar.SUNDAY):
+    """
+    Weeks of one month for the attendance calendar. Each week is a list of
+    seven cells: None outside the month, else {'day': d, 'counts': {...} or None}.
+    """
+    days = month_day_counts(school_id, year, month)
+    return [
+        [{'day': day, 'counts': days.get(day)} if day else None for day in week]
+        for week in calendar.Calendar(firstweekday).monthdayscalendar(year, month)
+    ]
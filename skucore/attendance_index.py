@@ -0,0 +1,267 @@
+"""
+Bitmap index over attendance.
+
+Each (student, academic year) has one AttendanceBitmap row holding a bit
+array per status, indexed by day offset from the start of the academic
+year. Bit arrays are handled as Python ints, so masks, counts and set
+queries for a whole school run as word-wide integer operations over a few
+kilobytes instead of scanning Attendance rows.
+"""
+
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Attendance, AttendanceBitmap
+
+
+STATUSES = [value for value, _ in Attendance.ATTENDANCE_CHOICES]
+ATTENDED = ('present', 'late')
+
+
+# ============ DAY ARITHMETIC ============
+
+def start_month():
+    return getattr(settings, 'ACADEMIC_YEAR_START_MONTH', 9)
+
+
+def academic_year_for(day):
+    return day.year if day.month >= start_month() else day.year - 1
+
+
+def year_start(academic_year):
+    return date_cls(academic_year, start_month(), 1)
+
+
+def year_end(academic_year):
+    return year_start(academic_year + 1) - timedelta(days=1)
+
+
+def day_index(day):
+    return (day - year_start(academic_year_for(day))).days
+
+
+def range_mask(academic_year, from_date=None, to_date=None):
+    """Bits of the days in [from_date, to_date] clipped to the academic year"""
+    first = max(from_date or year_start(academic_year), year_start(academic_year))
+    last = min(to_date or year_end(academic_year), year_end(academic_year))
+    if last < first:
+        return 0
+    lo = (first - year_start(academic_year)).days
+    hi = (last - year_start(academic_year)).days
+    return ((1 << (hi - lo + 1)) - 1) << lo
+
+
+def to_int(value):
+    return int.from_bytes(bytes(value or b''), 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def lanes(bitmap):
+    """Status -> int bit array for one AttendanceBitmap row"""
+    return {status: to_int(getattr(bitmap, status)) for status in STATUSES}
+
+
+# ============ MAINTENANCE ============
+
+def index_attendance(marks=(), clears=()):
+    """
+    Apply attendance writes to the bitmaps.
+
+    marks: iterable of (school_id, student_id, date, status) to set
+    clears: iterable of (student_id, date) to clear in every lane
+    Touched bitmaps are read with one locking query and written with one
+    upsert. Rows are locked (in pk order) before the bits are merged, and
+    missing rows are first inserted empty, so concurrent marks of the same
+    student and year on different days cannot overwrite each other.
+    """
+    # (student_id, academic_year) -> list of (day, status or None)
+    changes = defaultdict(list)
+    schools = {}
+    for student_id, day in clears:
+        changes[(student_id, academic_year_for(day))].append((day, None))
+    for school_id, student_id, day, status in marks:
+        key = (student_id, academic_year_for(day))
+        changes[key].append((day, status))
+        schools[key] = school_id
+    if not changes:
+        return
+
+    # Joins the caller's transaction (the attendance write) when there is one
+    with transaction.atomic(savepoint=False):
+        existing = _lock_bitmaps(changes)
+        missing = [key for key in changes if key not in existing and key in schools]
+        if missing:
+            AttendanceBitmap.objects.bulk_create([
+                AttendanceBitmap(school_id=schools[key], student_id=key[0], academic_year=key[1])
+                for key in missing
+            ], batch_size=500, ignore_conflicts=True)
+            existing.update(_lock_bitmaps(missing))
+        _apply_changes(changes, existing, schools)
+
+
+def _lock_bitmaps(keys):
+    """(student_id, academic_year) -> AttendanceBitmap for the given keys, locked for update"""
+    return {
+        (bitmap.student_id, bitmap.academic_year): bitmap
+        for bitmap in AttendanceBitmap.objects.select_for_update().filter(
+            student_id__in={student_id for student_id, _ in keys},
+            academic_year__in={year for _, year in keys},
+        ).order_by('pk')
+    }
+
+
+def _apply_changes(changes, existing, schools):
+    updated = []
+    for key, day_changes in changes.items():
+        bitmap = existing.get(key)
+        if bitmap is None:
+            if key not in schools:
+                continue  # Nothing to clear
+            bitmap = AttendanceBitmap(student_id=key[0], academic_year=key[1])
+        if key in schools:
+            bitmap.school_id = schools[key]
+        values = lanes(bitmap)
+        for day, status in day_changes:
+            bit = 1 << day_index(day)
+            for lane in STATUSES:
+                values[lane] &= ~bit
+            if status in values:
+                values[status] |= bit
+        for lane in STATUSES:
+            setattr(bitmap, lane, to_bytes(values[lane]))
+        updated.append(bitmap)
+
+    AttendanceBitmap.objects.bulk_create(
+        updated,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['student', 'academic_year'],
+        update_fields=['school'] + STATUSES + ['updated_at'],
+    )
+
+
+def rebuild_index(school_id):
+    """Rebuild every bitmap of a school from its Attendance rows"""
+    bitmaps = {}
+    rows = (
+        Attendance.objects.filter(school_id=school_id)
+        .order_by().values_list('student_id', 'date', 'status').iterator(chunk_size=5000)
+    )
+    for student_id, day, status in rows:
+        if status not in STATUSES:
+            continue
+        key = (student_id, academic_year_for(day))
+        values = bitmaps.setdefault(key, dict.fromkeys(STATUSES, 0))
+        values[status] |= 1 << day_index(day)
+
+    with transaction.atomic():
+        AttendanceBitmap.objects.filter(school_id=school_id).delete()
+        AttendanceBitmap.objects.bulk_create([
+            AttendanceBitmap(
+                school_id=school_id,
+                student_id=student_id,
+                academic_year=year,
+                **{lane: to_bytes(value) for lane, value in values.items()},
+            )
+            for (student_id, year), values in bitmaps.items()
+        ], batch_size=1000)
+    return len(bitmaps)
+
+
+# ============ QUERIES ============
+
+def lane_stats(values, mask=-1):
+    """Counts, attendance rate and streaks for one student's lanes"""
+    values = {lane: value & mask for lane, value in values.items()}
+    recorded = 0
+    for value in values.values():
+        recorded |= value
+    attended = 0
+    for lane in ATTENDED:
+        attended |= values[lane]
+
+    counts = {lane: value.bit_count() for lane, value in values.items()}
+    days_recorded = recorded.bit_count()
+
+    # Walk recorded days from the most recent backwards
+    current_streak = 0
+    counting = True
+    longest_absence = run = 0
+    remaining = recorded
+    while remaining:
+        top = remaining.bit_length() - 1
+        bit = 1 << top
+        if attended & bit:
+            if counting:
+                current_streak += 1
+            run = 0
+        else:
+            counting = False
+            if values['absent'] & bit:
+                run += 1
+                longest_absence = max(longest_absence, run)
+            else:
+                run = 0
+        remaining ^= bit
+
+    return {
+        **counts,
+        'days_recorded': days_recorded,
+        'attendance_rate': round(attended.bit_count() / days_recorded, 4) if days_recorded else None,
+        'current_attended_streak': current_streak,
+        'longest_absence_streak': longest_absence,
+    }
+
+
+def student_stats(student, academic_year, from_date=None, to_date=None):
+    bitmap = AttendanceBitmap.objects.filter(student=student, academic_year=academic_year).first()
+    values = lanes(bitmap) if bitmap else dict.fromkeys(STATUSES, 0)
+    return lane_stats(values, range_mask(academic_year, from_date, to_date))
+
+
+def school_rates(school, academic_year, from_date=None, to_date=None):
+    """Per-student counts and rates for a whole school, one query"""
+    mask = range_mask(academic_year, from_date, to_date)
+    results = []
+    bitmaps = AttendanceBitmap.objects.filter(school=school, academic_year=academic_year).only(
+        'student_id', *STATUSES
+    )
+    for bitmap in bitmaps:
+        values = {lane: value & mask for lane, value in lanes(bitmap).items()}
+        recorded = 0
+        for value in values.values():
+            recorded |= value
+        days_recorded = recorded.bit_count()
+        if not days_recorded:
+            continue
+        attended = sum(values[lane].bit_count() for lane in ATTENDED)
+        results.append({
+            'student': bitmap.student_id,
+            **{lane: value.bit_count() for lane, value in values.items()},
+            'days_recorded': days_recorded,
+            'attendance_rate': round(attended / days_recorded, 4),
+        })
+    return results
+
+
+def absent_on_all(school, days):
+    """Ids of students marked absent on every one of `days`"""
+    masks = defaultdict(int)
+    for day in days:
+        masks[academic_year_for(day)] |= 1 << day_index(day)
+
+    matches = None
+    for year, mask in masks.items():
+        year_matches = {
+            bitmap.student_id
+            for bitmap in AttendanceBitmap.objects.filter(school=school, academic_year=year).only('student_id', 'absent')
+            if to_int(bitmap.absent) & mask == mask
+        }
+        matches = year_matches if matches is None else matches & year_matches
+    return matches or set()
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from . import tenant_cache
+from .permissions import attach_capabilities, compute_capabilities, get_role_version
+from .tenant_cache import LRUCache
+
+
+# token key -> (user_id, school_id, capabilities), stored under the
+# (tenant generation, role version) it was computed for
+token_cache = LRUCache(
+    'tokens',
+    max_size=getattr(settings, 'TENANT_CACHE_MAX_SIZE', 1024),
+    ttl=getattr(settings, 'TENANT_CACHE_TTL', 300),
+)
+
+
+def invalidate_user_tokens(user_id):
+    token_cache.delete_where(lambda key, tenant: tenant[0] == user_id)
+
+
+def invalidate_users_tokens(user_ids):
+    user_ids = set(user_ids)
+    token_cache.delete_where(lambda key, tenant: tenant[0] in user_ids)
+
+
+def invalidate_token(key):
+    token_cache.delete(key)
+
+
+class SchoolTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that also resolves the tenant.
+
+    DRF authenticates inside the view, after SchoolContextMiddleware has run,
+    so token requests arrive with request.school = None. This class attaches
+    request.school, request.role and request.capabilities once per request
+    from a cached token -> (school, capabilities) mapping, so views never
+    repeat the UserSchool / UserRole lookups.
+
+    The token row and its user are still read on every request (one indexed
+    query), so a logout or a deactivated user is refused by every worker at
+    once. Only the derived tenant is cached, and it is recomputed when the
+    shared tenant generation or the user's role version moves.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None:
+            return None
+        user, token = result
+        school_id, capabilities = token.tenant
+        # Set on the underlying HttpRequest so both the DRF request and
+        # plain Django code see the same values
+        request._request.school = tenant_cache.get_school(school_id, token.generation) if school_id else None
+        attach_capabilities(request._request, capabilities, user=user)
+        return user, token
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        generation = tenant_cache.get_generation()
+        version = (generation, get_role_version(token.user_id))
+        tenant = token_cache.get(key, version=version)
+        if tenant is None:
+            school = tenant_cache.get_user_school(token.user, generation)
+            tenant = (token.user_id, school.id if school else None, compute_capabilities(token.user))
+            token_cache.set(key, tenant, version=version)
+        token.tenant = tenant[1:]
+        token.generation = generation
+
+        return (token.user, token)
+
@@ -1,10 +1,81 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 from .models import (
     Student, Parent, Grade, Subject, Bus, Route, 
     Attendance, Address, StudentOnboardingRequest, Record
 )
 
 
+# ============ AUTOCOMPLETE WIDGETS ============
+
+class AutocompleteMixin:
+    """
+    Select widget that renders only the currently selected options.
+    The rest are fetched on demand by static/js/autocomplete.js from the
+    tenant-scoped autocomplete endpoint, so rendering the form never loads
+    the whole table.
+    """
+    def __init__(self, kind, attrs=None):
+        self.kind = kind
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        attrs = {
+            'class': 'form-control',
+            **(attrs or {}),
+            'data-autocomplete-url': reverse_lazy('autocomplete', args=[self.kind]),
+        }
+        return super().get_context(name, value, attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        field = getattr(self.choices, 'field', None)
+        if field is None:
+            return []
+        # A re-rendered invalid form passes the raw POSTed values; drop the ones that are not keys
+        opts = field.queryset.model._meta
+        key = opts.get_field(field.to_field_name) if field.to_field_name else opts.pk
+        selected = []
+        for v in value:
+            if v in ('', None):
+                continue
+            try:
+                selected.append(key.to_python(v))
+            except (ValidationError, ValueError, TypeError):
+                continue
+        if not selected:
+            return []
+        options = []
+        for index, obj in enumerate(field.queryset.filter(**{f'{key.attname}__in': selected})):
+            option = self.create_option(
+                name, obj.pk, field.label_from_instance(obj), True, index, attrs=attrs
+            )
+            options.append((None, [option], index))
+        return options
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
+
+
+class PersonChoiceLabelMixin:
+    """Labels without the school name, so no per-option School query"""
+    def label_from_instance(self, obj):
+        return f"{obj.first_name} {obj.last_name}"
+
+
+class PersonChoiceField(PersonChoiceLabelMixin, forms.ModelChoiceField):
+    pass
+
+
+class PersonMultipleChoiceField(PersonChoiceLabelMixin, forms.ModelMultipleChoiceField):
+    pass
+
+
 class AddressForm(forms.ModelForm):
     class Meta:
         model = Address
@@ -78,14 +149,14 @@ class ParentForm(forms.ModelForm):
 
 
 class StudentForm(forms.ModelForm):
-    parents = forms.ModelMultipleChoiceField(
+    parents = PersonMultipleChoiceField(
         queryset=Parent.objects.none(),  # Will be set in __init__
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('parents'),
         required=False
     )
     subjects = forms.ModelMultipleChoiceField(
         queryset=Subject.objects.none(),  # Will be set in __init__
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('subjects'),
         required=False
     )
 
@@ -111,10 +182,11 @@ class StudentForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         # Filter parents and subjects by school if provided
         if school:
-            self.fields['parents'].queryset = Parent.objects.filter(school=school)
-            self.fields['subjects'].queryset = Subject.objects.filter(school=school)
-            self.fields['grade'].queryset = Grade.objects.filter(school=school)
-            self.fields['bus'].queryset = Bus.objects.filter(school=school)
+            # Option labels (__str__) show the school and the bus route
+            self.fields['parents'].queryset = Parent.objects.filter(school=school).select_related('school')
+            self.fields['subjects'].queryset = Subject.objects.filter(school=school).select_related('school')
+            self.fields['grade'].queryset = Grade.objects.filter(school=school).select_related('school')
+            self.fields['bus'].queryset = Bus.objects.filter(school=school).select_related('school', 'route')
         else:
             # Fallback to all if no school provided (for non-school-aware contexts)
             self.fields['parents'].queryset = Parent.objects.all()
@@ -122,17 +194,28 @@ class StudentForm(forms.ModelForm):
 
 
 class AttendanceForm(forms.ModelForm):
+    student = PersonChoiceField(
+        queryset=Student.objects.none(),  # Will be set in __init__
+        widget=AutocompleteSelect('students'),
+    )
+
     class Meta:
         model = Attendance
         fields = ['student', 'date', 'status', 'remarks', 'recorded_by']
         widgets = {
-            'student': forms.Select(attrs={'class': 'form-control'}),
             'date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
             'status': forms.Select(attrs={'class': 'form-control'}),
             'remarks': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'recorded_by': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Recorded by (name)'}),
         }
 
+    def __init__(self, *args, school=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if school:
+            self.fields['student'].queryset = Student.objects.filter(school=school)
+        else:
+            self.fields['student'].queryset = Student.objects.all()
+
 
 class StudentOnboardingRequestForm(forms.ModelForm):
     # Add a custom address field for Mapbox integration
@@ -148,16 +231,16 @@ class StudentOnboardingRequestForm(forms.ModelForm):
     )
     
     # Parents field - ModelMultipleChoiceField to select existing or newly created parents
-    parents = forms.ModelMultipleChoiceField(
+    parents = PersonMultipleChoiceField(
         queryset=Parent.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('parents'),
         required=False,
         label='Parents/Guardians'
     )
     
     subjects = forms.ModelMultipleChoiceField(
         queryset=Subject.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('subjects'),
         required=False
     )
 
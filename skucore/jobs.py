@@ -0,0 +1,205 @@
+"""
+Background jobs stored in the database.
+
+Heavy work (photo renditions, record moves, exports) is queued as a Job
+row instead of running in a request worker:
+
+    @jobs.task(max_attempts=3)
+    def process_photo(label, pk): ...
+
+    jobs.enqueue(process_photo, 'skucore.Student', 7)
+
+The row is inserted in the caller's transaction, so a job never runs for
+data that was rolled back. `manage.py run_workers` claims ready jobs with
+a conditional UPDATE (safe with several workers on SQLite or PostgreSQL)
+and runs them in a thread or process pool. A failing job is retried with
+exponential backoff until max_attempts; jobs left running by a worker
+that died are put back in the queue after JOB_LOCK_TIMEOUT.
+
+Arguments and return values must be JSON-serializable; the return value
+of a succeeded job is kept in Job.result for callers polling it. With JOBS_EAGER set, jobs run in
+the enqueuing process right after commit (handy for local development);
+tests can drain the queue with run_pending().
+"""
+
+import logging
+import os
+import random
+import socket
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, max_attempts=None, priority=0):
+    """Register a function as a job task, named by its dotted path"""
+    def register(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        func.job_name = name
+        func.job_options = {'max_attempts': max_attempts, 'priority': priority}
+        _registry[name] = func
+        return func
+    return register(func) if func else register
+
+
+def get_task(name):
+    if name not in _registry:
+        try:
+            import_string(name)  # Importing the module registers its tasks
+        except ImportError:
+            pass
+    if name not in _registry:
+        raise LookupError(f'Unknown job task {name}')
+    return _registry[name]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ============ ENQUEUEING ============
+
+def enqueue(func, *args, delay=None, priority=None, max_attempts=None, **kwargs):
+    """
+    Queue `func(*args, **kwargs)`; `func` is a registered task or its name.
+    `delay` (seconds or timedelta) postpones the first run. Returns the Job.
+    """
+    name = func if isinstance(func, str) else func.job_name
+    options = get_task(name).job_options
+    if isinstance(delay, (int, float)):
+        delay = timedelta(seconds=delay)
+    job = Job.objects.create(
+        task=name,
+        args=list(args),
+        kwargs=kwargs,
+        priority=options['priority'] if priority is None else priority,
+        max_attempts=max_attempts or options['max_attempts'] or _setting('JOB_MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+    if _setting('JOBS_EAGER', False) and not delay:
+        transaction.on_commit(lambda: run_job(job.pk, worker='eager'))
+    return job
+
+
+# ============ RUNNING ============
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, limit):
+    """Mark up to `limit` ready jobs as running for `worker`; returns their ids"""
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status='queued', run_at__lte=now)
+        .order_by('-priority', 'run_at', 'id')
+        .values_list('id', flat=True)[:limit * 2]
+    )
+    claimed = []
+    for job_id in candidates:
+        # Only one worker can move a given row out of 'queued'
+        won = Job.objects.filter(id=job_id, status='queued').update(
+            status='running', locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if won:
+            claimed.append(job_id)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def _backoff(attempts):
+    base = _setting('JOB_RETRY_BASE_DELAY', 10)
+    delay = min(base * 2 ** (attempts - 1), _setting('JOB_RETRY_MAX_DELAY', 3600))
+    return timedelta(seconds=delay * random.uniform(1.0, 1.1))
+
+
+def run_job(job_id, worker=None):
+    """
+    Run one job. Claims it first unless a worker already has (eager and
+    inline runs). Returns the final status, or None if it was not runnable.
+    Connection housekeeping is left to the caller (run_workers closes its
+    connections around each job), so this is safe inside a transaction.
+    """
+    if worker in (None, 'eager'):
+        now = timezone.now()
+        won = Job.objects.filter(id=job_id, status='queued').update(
+            status='running', locked_by=worker or worker_name(), locked_at=now, attempts=F('attempts') + 1,
+        )
+        if not won:
+            return None
+    job = Job.objects.filter(id=job_id, status='running').first()
+    if job is None:
+        return None
+
+    try:
+        # Inside a caller's transaction (run_pending() in a test), a savepoint keeps a
+        # failing task from breaking it; workers run in autocommit mode
+        with transaction.atomic() if connection.in_atomic_block else nullcontext():
+            result = get_task(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed on attempt %s', job.pk, job.task, job.attempts)
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(id=job.id).update(
+                status='queued', run_at=timezone.now() + _backoff(job.attempts),
+                locked_by='', locked_at=None, last_error=error,
+            )
+            return 'queued'
+        Job.objects.filter(id=job.id).update(
+            status='failed', finished_at=timezone.now(), locked_by='', locked_at=None, last_error=error,
+        )
+        logger.error('Job %s (%s) gave up after %s attempts', job.pk, job.task, job.attempts)
+        return 'failed'
+
+    Job.objects.filter(id=job.id).update(
+        status='succeeded', finished_at=timezone.now(), locked_by='', locked_at=None, result=result,
+    )
+    return 'succeeded'
+
+
+def run_pending(limit=None):
+    """Run ready jobs in this process until none are left (or `limit` ran). Returns the count."""
+    ran = 0
+    worker = worker_name()
+    while limit is None or ran < limit:
+        claimed = claim(worker, 1)
+        if not claimed:
+            break
+        run_job(claimed[0], worker=worker)
+        ran += 1
+    return ran
+
+
+# ============ MAINTENANCE ============
+
+def requeue_stale():
+    """Put back jobs whose worker stopped without finishing them. Returns the count."""
+    cutoff = timezone.now() - timedelta(seconds=_setting('JOB_LOCK_TIMEOUT', 1800))
+    stale = Job.objects.filter(status='running', locked_at__lt=cutoff)
+    gave_up = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=timezone.now(), locked_by='', last_error='Worker stopped while running the job',
+    )
+    requeued = stale.update(status='queued', run_at=timezone.now(), locked_by='', locked_at=None)
+    return requeued + gave_up
+
+
+def prune_finished():
+    """Delete succeeded and failed jobs older than JOB_RETENTION_DAYS. Returns the count."""
+    cutoff = timezone.now() - timedelta(days=_setting('JOB_RETENTION_DAYS', 7))
+    deleted, _ = Job.objects.filter(
+        Q(status='succeeded') | Q(status='failed'), finished_at__lt=cutoff
+    ).delete()
+    return deleted
@@ -0,0 +1,316 @@
+"""
+Replay of the Postman collection as a concurrent load test.
+
+The collection (Skulz_API.postman_collection.json) is flattened into one
+list of requests. {{base_url}} and {{token}} are filled in by the caller;
+the {{..._id}} variables, and the foreign keys in JSON bodies (grade,
+route, bus, student), are drawn at random per request from the ids of one
+school, so the load spreads over a seeded tenant instead of hammering
+row 1. Unique names in create/update bodies get a sequence suffix so
+repeated writes do not fail validation.
+
+Workers are threads, each with its own keep-alive requests.Session,
+replaying a random mix of the selected requests until the deadline.
+Latencies are kept per request and summarised as p50/p95/p99 and
+throughput.
+"""
+
+import copy
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .models import (
+    Attendance, Bus, Grade, Parent, Route, Student, StudentOnboardingRequest, Subject,
+)
+
+
+VARIABLE_RE = re.compile(r'\{\{(\w+)\}\}')
+# A URL ending in an id variable, e.g. {{base_url}}/api/students/{{student_id}}/
+TRAILING_ID_RE = re.compile(r'\{\{(\w+_id)\}\}/?$')
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+# Never replayed: logout deletes the shared token, /db-info/ is a debug page
+SKIPPED_PATHS = ('/api/auth/logout/', '/db-info/')
+# A POST that changes no data, replayed with the reads
+LOGIN_PATH = '/api/auth/login/'
+POOL_SIZE = 1000
+
+# Collection variable -> model whose ids (in the replayed school) fill it
+ID_VARIABLES = {
+    'student_id': Student,
+    'parent_id': Parent,
+    'grade_id': Grade,
+    'subject_id': Subject,
+    'route_id': Route,
+    'bus_id': Bus,
+    'attendance_id': Attendance,
+    'onboarding_id': StudentOnboardingRequest,
+}
+# JSON body key -> collection variable of the id it holds
+BODY_IDS = {'student': 'student_id', 'grade': 'grade_id', 'route': 'route_id', 'bus': 'bus_id'}
+UNIQUE_FIELDS = ('email', 'grade_name', 'subject_name', 'route_name', 'bus_number')
+UPLOAD = ('load-test.pdf', b'%PDF-1.4\n% load test\n%%EOF\n', 'application/pdf')
+
+
+class CollectionError(ValueError):
+    """The collection file cannot be replayed"""
+
+
+# ============ COLLECTION ============
+
+def _flatten(items, folder=''):
+    for item in items:
+        if 'item' in item:
+            yield from _flatten(item['item'], f'{folder}{item["name"]}/')
+        elif 'request' in item:
+            yield folder + item['name'], item['request']
+
+
+def load_collection(path):
+    """
+    Requests of a Postman v2.1 collection as dicts:
+    {'name', 'method', 'url', 'headers', 'body', 'auth'}. `body` is None,
+    ('raw', text) or ('formdata', [(key, value or None for a file)]).
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            collection = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CollectionError(f'Cannot read {path}: {e}')
+    if not isinstance(collection.get('item'), list):
+        raise CollectionError(f'{path} is not a Postman collection')
+
+    default_auth = collection.get('auth', {}).get('type') != 'noauth'
+    requests_ = []
+    for name, request in _flatten(collection['item']):
+        url = request.get('url', '')
+        if isinstance(url, dict):
+            url = url.get('raw', '')
+        body = request.get('body') or {}
+        if body.get('mode') == 'raw' and body.get('raw'):
+            body = ('raw', body['raw'])
+        elif body.get('mode') == 'formdata':
+            body = ('formdata', [
+                (field['key'], None if field.get('type') == 'file' else field.get('value', ''))
+                for field in body.get('formdata', []) if not field.get('disabled')
+            ])
+        else:
+            body = None
+        auth = request.get('auth')
+        requests_.append({
+            'name': name,
+            'method': request.get('method', 'GET').upper(),
+            'url': url,
+            'headers': {h['key']: h.get('value', '') for h in request.get('header', []) if not h.get('disabled')},
+            'body': body,
+            'auth': default_auth if auth is None else auth.get('type') != 'noauth',
+        })
+    return requests_
+
+
+def select_requests(requests_, include_writes=False, only=None):
+    """The requests to replay: reads only unless include_writes, filtered by a name/URL substring"""
+    selected = []
+    for request in requests_:
+        if any(path in request['url'] for path in SKIPPED_PATHS):
+            continue
+        if request['method'] in WRITE_METHODS and not include_writes and not request['url'].endswith(LOGIN_PATH):
+            continue
+        if only and not any(term.lower() in f'{request["name"]} {request["url"]}'.lower() for term in only):
+            continue
+        selected.append(request)
+    return selected
+
+
+def id_pools(school):
+    """Collection variable -> list of ids in `school` (up to POOL_SIZE each, newest first)"""
+    return {
+        variable: list(model.objects.filter(school=school).order_by('-id').values_list('id', flat=True)[:POOL_SIZE])
+        for variable, model in ID_VARIABLES.items()
+    }
+
+
+# ============ SUBSTITUTION ============
+
+class Replayer:
+    """Turns collection requests into concrete ones for a base URL, token and id pools"""
+
+    def __init__(self, base_url, token, pools, credentials=None):
+        self.variables = {'base_url': base_url.rstrip('/'), 'token': token}
+        self.pools = pools
+        self.credentials = credentials
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _value(self, variable, rng):
+        if variable in self.variables:
+            return self.variables[variable]
+        with self._lock:
+            pool = self.pools.get(variable)
+            return rng.choice(pool) if pool else None
+
+    def forget(self, request, url):
+        """Drop the id a successful DELETE of `url` removed, so later requests do not 404 on it"""
+        match = TRAILING_ID_RE.search(request['url'])
+        if not match:
+            return
+        removed = int(url.rstrip('/').rsplit('/', 1)[-1])
+        with self._lock:
+            pool = self.pools.get(match.group(1)) or []
+            if removed in pool:
+                pool.remove(removed)
+
+    def _fill(self, text, rng):
+        return VARIABLE_RE.sub(lambda m: str(self._value(m.group(1), rng) or ''), text)
+
+    def _json_body(self, data, rng, sequence):
+        if isinstance(data, list):
+            # Bulk payloads need distinct students
+            with self._lock:
+                students = self.pools.get('student_id') or []
+                picked = rng.sample(students, min(len(data), len(students)))
+            data = [self._json_body(item, rng, sequence) for item in data]
+            for item, student in zip(data, picked):
+                if isinstance(item, dict) and 'student' in item:
+                    item['student'] = student
+            return data
+        if not isinstance(data, dict):
+            return data
+        data = copy.copy(data)
+        for key, value in data.items():
+            if key in BODY_IDS and isinstance(value, int):
+                data[key] = self._value(BODY_IDS[key], rng) or value
+            elif key in UNIQUE_FIELDS and isinstance(value, str):
+                if key == 'email':
+                    local, _, domain = value.partition('@')
+                    data[key] = f'{local}+load{sequence}@{domain}'
+                else:
+                    data[key] = f'{value} {sequence}'
+        if self.credentials and {'username', 'password'} <= data.keys():
+            data['username'], data['password'] = self.credentials
+        return data
+
+    def prepare(self, request, rng):
+        """(method, url, requests keyword arguments) for one replay of `request`"""
+        headers = {key: self._fill(value, rng) for key, value in request['headers'].items()}
+        if request['auth'] and self.variables['token']:
+            headers['Authorization'] = f'Token {self.variables["token"]}'
+        kwargs = {'headers': headers}
+
+        body = request['body']
+        if body and body[0] == 'raw':
+            text = self._fill(body[1], rng)
+            try:
+                data = json.loads(text)
+            except ValueError:
+                kwargs['data'] = text.encode()
+            else:
+                kwargs['json'] = self._json_body(data, rng, next(self._sequence))
+                headers.pop('Content-Type', None)
+        elif body and body[0] == 'formdata':
+            kwargs['data'] = {key: self._fill(value, rng) for key, value in body[1] if value is not None}
+            kwargs['files'] = {key: UPLOAD for key, value in body[1] if value is None}
+        return request['method'], self._fill(request['url'], rng), kwargs
+
+
+# ============ REPLAY ============
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _worker(replayer, selected, deadline, record, seed, timeout):
+    rng = random.Random(seed)
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            request = rng.choice(selected)
+            method, url, kwargs = replayer.prepare(request, rng)
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=timeout, allow_redirects=False, **kwargs)
+                outcome = response.status_code
+                size = len(response.content)
+                if method == 'DELETE' and response.ok:
+                    replayer.forget(request, url)
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+                size = 0
+            record(request['name'], time.perf_counter() - started, outcome, size)
+
+
+def replay(replayer, selected, concurrency=8, duration=30, warmup=0, seed=0, timeout=30):
+    """
+    Replay `selected` with `concurrency` threads for `duration` seconds
+    (after `warmup` seconds whose results are discarded). Returns
+    {'elapsed': s, 'endpoints': {name: {'method', 'latencies', 'statuses', 'bytes'}}}.
+    """
+    if not selected:
+        raise CollectionError('No requests selected')
+    lock = threading.Lock()
+    measure_from = time.monotonic() + warmup
+    deadline = measure_from + duration
+    methods = {request['name']: request['method'] for request in selected}
+    endpoints = {}
+
+    def record(name, elapsed, outcome, size):
+        if time.monotonic() < measure_from:
+            return
+        with lock:
+            stats = endpoints.setdefault(name, {'method': methods[name], 'latencies': [], 'statuses': {}, 'bytes': 0})
+            stats['latencies'].append(elapsed)
+            stats['statuses'][outcome] = stats['statuses'].get(outcome, 0) + 1
+            stats['bytes'] += size
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='replay') as pool:
+        futures = [
+            pool.submit(_worker, replayer, selected, deadline, record, seed * 1000 + n, timeout)
+            for n in range(concurrency)
+        ]
+        for future in futures:
+            future.result()
+    return {'elapsed': max(time.monotonic() - measure_from, 0.001), 'endpoints': endpoints}
+
+
+def _is_error(outcome):
+    return not isinstance(outcome, int) or outcome >= 400
+
+
+def summarize(result):
+    """Per-endpoint rows (sorted by name) plus an 'All' total, latencies in ms"""
+    elapsed = result['elapsed']
+
+    def row(name, method, latencies, statuses):
+        latencies = sorted(latencies)
+        return {
+            'name': name,
+            'method': method,
+            'count': len(latencies),
+            'errors': sum(count for outcome, count in statuses.items() if _is_error(outcome)),
+            'statuses': {str(outcome): count for outcome, count in sorted(statuses.items(), key=str)},
+            'rps': round(len(latencies) / elapsed, 2),
+            **{
+                f'p{pct}': round(percentile(latencies, pct) * 1000, 1) if latencies else None
+                for pct in (50, 95, 99)
+            },
+        }
+
+    rows = [
+        row(name, stats['method'], stats['latencies'], stats['statuses'])
+        for name, stats in sorted(result['endpoints'].items())
+    ]
+    statuses = {}
+    for stats in result['endpoints'].values():
+        for outcome, count in stats['statuses'].items():
+            statuses[outcome] = statuses.get(outcome, 0) + count
+    total = row('All', '', [l for stats in result['endpoints'].values() for l in stats['latencies']], statuses)
+    return rows, total
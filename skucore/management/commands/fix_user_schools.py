@@ -1,42 +1,21 @@
 from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User
-from skucore.models import School, UserSchool
+from skucore.models import School
+from skucore.provisioning import provision_user_schools
 
 
 class Command(BaseCommand):
     help = 'Create missing UserSchool records for existing users'
 
     def handle(self, *args, **options):
-        # Get all active schools
-        active_schools = School.objects.filter(is_active=True)
-        
-        if not active_schools.exists():
+        if not School.objects.filter(is_active=True).exists():
             self.stdout.write(self.style.WARNING('No active schools found.'))
             return
-        
-        # Get all users
-        users = User.objects.all()
-        
-        fixed_count = 0
-        
-        for user in users:
-            for school in active_schools:
-                # Get or create UserSchool
-                user_school, created = UserSchool.objects.get_or_create(
-                    user=user,
-                    school=school,
-                    defaults={'is_active': True}
-                )
-                
-                # If it exists but is inactive, activate it
-                if not created and not user_school.is_active:
-                    user_school.is_active = True
-                    user_school.save()
-                    fixed_count += 1
-                
-                if created:
-                    fixed_count += 1
-        
+
+        # One anti-join finds the missing memberships; they are bulk-inserted
+        result = provision_user_schools(reactivate=True)
+        self.stdout.write(f'✓ {result["created"]} memberships created, {result["reactivated"]} reactivated')
+
+        fixed_count = result['created'] + result['reactivated']
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully created/fixed {fixed_count} UserSchool records'
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from skucore.storage import collect_garbage, migrate_legacy_files, recount_references
+
+
+class Command(BaseCommand):
+    help = 'Delete Record file blobs that no Record references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, help='Keep unreferenced blobs this long (default: RECORD_BLOB_GC_GRACE_HOURS)')
+        parser.add_argument('--recount', action='store_true', help='Recompute reference counts from the Record table first')
+        parser.add_argument('--migrate-legacy', action='store_true', help='Move files saved before content addressing into the blob store first')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['migrate_legacy']:
+            moved, missing = migrate_legacy_files()
+            self.stdout.write(f'✓ {moved} legacy files moved ({missing} missing on disk)')
+        if options['recount']:
+            changed = recount_references()
+            self.stdout.write(f'✓ {changed} reference counts corrected')
+
+        deleted, freed = collect_garbage(options['grace_hours'], dry_run=options['dry_run'])
+        verb = 'would be deleted' if options['dry_run'] else 'deleted'
+        self.stdout.write(f'✓ {deleted} blobs {verb} ({freed} bytes)')
+
+        self.stdout.write(self.style.SUCCESS('Record blob collection complete'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from skucore.models import School
+from skucore.staff_import import StaffImportError, import_staff, read_csv
+
+
+class Command(BaseCommand):
+    help = 'Create staff users, roles and school memberships from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='CSV with username,email,first_name,last_name,role,department,password')
+        parser.add_argument('--school', type=int, required=True, help='School id the staff join (as primary school)')
+        parser.add_argument('--workers', type=int, help='Password hashing threads (default STAFF_IMPORT_WORKERS)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating anything')
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(id=options['school']).first()
+        if school is None:
+            raise CommandError(f'School {options["school"]} does not exist')
+
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as handle:
+                result = import_staff(
+                    read_csv(handle), school, dry_run=options['dry_run'], workers=options['workers'],
+                )
+        except (OSError, StaffImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f'Line {error["line"]} ({error["username"] or "no username"}): {"; ".join(error["errors"])}')
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(f'✓ {result["created"]} staff users {verb} in {school.name}, {result["skipped"]} rows skipped')
+        self.stdout.write(self.style.SUCCESS('Dry run finished' if options['dry_run'] else 'Staff imported'))
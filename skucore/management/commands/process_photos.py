@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from skucore.models import Student, StudentOnboardingRequest
+from skucore.photos import needs_processing, process_photo
+
+
+class Command(BaseCommand):
+    help = 'Strip EXIF data and generate renditions for photos that have not been processed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=int, help='Only process this school id')
+        parser.add_argument('--force', action='store_true', help='Reprocess photos that already have renditions')
+
+    def handle(self, *args, **options):
+        for model in (Student, StudentOnboardingRequest):
+            rows = model.objects.exclude(photo='').exclude(photo__isnull=True)
+            if options['school']:
+                rows = rows.filter(school_id=options['school'])
+            processed = 0
+            for instance in rows.only('id', 'photo', 'photo_renditions').iterator():
+                if options['force'] or needs_processing(instance):
+                    process_photo(model._meta.label, instance.pk)
+                    processed += 1
+            self.stdout.write(f'✓ {model._meta.verbose_name_plural}: {processed} photos processed')
+
+        self.stdout.write(self.style.SUCCESS('Photos processed'))
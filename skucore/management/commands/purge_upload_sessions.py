@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from skucore.uploads import purge_stale_sessions
+
+
+class Command(BaseCommand):
+    help = 'Abort idle chunked upload sessions and delete their part files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help='Idle time before a session expires (default: UPLOAD_SESSION_TTL_HOURS)')
+
+    def handle(self, *args, **options):
+        count = purge_stale_sessions(options['hours'])
+        self.stdout.write(f'✓ {count} idle sessions aborted')
+
+        self.stdout.write(self.style.SUCCESS('Upload sessions purged'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from skucore.attendance_index import rebuild_index
+from skucore.models import School
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-student attendance bitmap index from the Attendance table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=int, help='Only rebuild this school id')
+
+    def handle(self, *args, **options):
+        schools = School.objects.all()
+        if options['school']:
+            schools = schools.filter(id=options['school'])
+
+        for school in schools:
+            count = rebuild_index(school.id)
+            self.stdout.write(f'✓ {school.name}: {count} student-year bitmaps')
+
+        self.stdout.write(self.style.SUCCESS('Attendance index rebuilt'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from skucore.attendance import rebuild_daily_summaries
+from skucore.models import School, AttendanceDailySummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild attendance daily roll-ups from the Attendance table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=int, help='Only rebuild this school id')
+        parser.add_argument('--from-date', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to-date', help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        from_date = self.parse(options['from_date'])
+        to_date = self.parse(options['to_date'])
+
+        schools = School.objects.all()
+        if options['school']:
+            schools = schools.filter(id=options['school'])
+
+        for school in schools:
+            rebuild_daily_summaries(school.id, from_date=from_date, to_date=to_date)
+            rows = AttendanceDailySummary.objects.filter(school=school).count()
+            self.stdout.write(f'✓ {school.name}: {rows} roll-up rows')
+
+        self.stdout.write(self.style.SUCCESS('Attendance roll-ups rebuilt'))
+
+    def parse(self, value):
+        if not value:
+            return None
+        date = parse_date(value)
+        if not date:
+            raise CommandError(f'Invalid date: {value}')
+        return date
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from skucore.models import School
+from skucore.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search documents of students, parents and onboarding requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=int, help='Only rebuild this school id')
+
+    def handle(self, *args, **options):
+        if options['school']:
+            school = School.objects.get(id=options['school'])
+            count = rebuild_search_index(school.id)
+            self.stdout.write(f'✓ {school.name}: {count} documents')
+        else:
+            count = rebuild_search_index()
+            self.stdout.write(f'✓ All schools: {count} documents')
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
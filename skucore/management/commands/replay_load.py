@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+from skucore.load_replay import LOGIN_PATH, CollectionError, Replayer, id_pools, load_collection, replay, select_requests, summarize
+from skucore.models import School, UserRole
+from skucore.seeding import CODE_PREFIX
+
+
+class Command(BaseCommand):
+    help = 'Replay the Postman collection concurrently against a running server and report latency per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=str(Path(settings.BASE_DIR) / 'Skulz_API.postman_collection.json'),
+                            help='Postman collection to replay')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load')
+        parser.add_argument('--school', default=f'{CODE_PREFIX}001', help='Code of the school whose ids are used')
+        parser.add_argument('--username', help='User whose token is sent (default: the school\'s first admin)')
+        parser.add_argument('--password', help='Password of that user; enables the login request')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to measure')
+        parser.add_argument('--warmup', type=float, default=0, help='Seconds to run before measuring')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument('--include-writes', action='store_true',
+                            help='Also replay POST/PUT/PATCH/DELETE requests (modifies and deletes data)')
+        parser.add_argument('--only', action='append', help='Only requests whose name or URL contains this (repeatable)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix and ids')
+        parser.add_argument('--json', dest='json_path', help='Also write the report to this JSON file')
+
+    def _user(self, school, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User {username} does not exist')
+        role = UserRole.objects.filter(school=school, role='admin', user__is_active=True).order_by('id').first()
+        if not role:
+            raise CommandError(f'{school.code} has no admin user, pass --username')
+        return role.user
+
+    def handle(self, *args, **options):
+        try:
+            school = School.objects.get(code=options['school'])
+        except School.DoesNotExist:
+            raise CommandError(f'School {options["school"]} does not exist (seed one with seed_scale)')
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive')
+
+        try:
+            selected = select_requests(
+                load_collection(options['collection']),
+                include_writes=options['include_writes'], only=options['only'],
+            )
+        except CollectionError as e:
+            raise CommandError(str(e))
+        if not options['password']:
+            selected = [request for request in selected if not request['url'].endswith(LOGIN_PATH)]
+        if not selected:
+            raise CommandError('No requests selected')
+
+        user = self._user(school, options['username'])
+        token, _ = Token.objects.get_or_create(user=user)
+        pools = id_pools(school)
+        replayer = Replayer(
+            options['base_url'], token.key, pools,
+            credentials=(user.username, options['password']) if options['password'] else None,
+        )
+        self.stdout.write(f'✓ {len(selected)} requests as {user.username} against {options["base_url"]}')
+        self.stdout.write(f'✓ ids from {school.code}: ' + ', '.join(f'{len(ids)} {name}' for name, ids in pools.items()))
+        self.stdout.write(f'✓ {options["concurrency"]} clients for {options["duration"]:g}s'
+                          + (f' after {options["warmup"]:g}s warmup' if options['warmup'] else ''))
+
+        try:
+            result = replay(
+                replayer, selected, concurrency=options['concurrency'], duration=options['duration'],
+                warmup=options['warmup'], seed=options['seed'], timeout=options['timeout'],
+            )
+        except CollectionError as e:
+            raise CommandError(str(e))
+        rows, total = summarize(result)
+
+        width = max(len(row['name']) for row in rows + [total])
+        self.stdout.write(f'\n{"Endpoint":<{width}}  {"Method":<6} {"Count":>7} {"Errors":>6} '
+                          f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>8}')
+        for row in rows + [total]:
+            self.stdout.write(
+                f'{row["name"]:<{width}}  {row["method"]:<6} {row["count"]:>7} {row["errors"]:>6} '
+                f'{row["p50"]:>8} {row["p95"]:>8} {row["p99"]:>8} {row["rps"]:>8}'
+            )
+        failing = {row['name']: row['statuses'] for row in rows if row['errors']}
+        for name, statuses in failing.items():
+            self.stdout.write(self.style.WARNING(f'{name}: {statuses}'))
+
+        if options['json_path']:
+            report = {
+                'base_url': options['base_url'], 'school': school.code, 'concurrency': options['concurrency'],
+                'duration': round(result['elapsed'], 2), 'endpoints': rows, 'total': total,
+            }
+            Path(options['json_path']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f'✓ Report written to {options["json_path"]}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total["count"]} requests, {total["rps"]} req/s, p50 {total["p50"]} ms, p99 {total["p99"]} ms'
+        ))
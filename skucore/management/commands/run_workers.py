@@ -0,0 +1,92 @@
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from skucore import jobs
+
+
+def _init_worker():
+    # Spawned workers start without Django configured; forked ones are a no-op here
+    import django
+    django.setup()
+
+
+def _run(job_id, worker):
+    close_old_connections()
+    try:
+        return jobs.run_job(job_id, worker=worker)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (skucore.jobs) in a thread or process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, help='Worker threads (default JOB_WORKER_THREADS)')
+        parser.add_argument('--processes', type=int, default=0,
+                            help='Use this many worker processes instead of threads')
+        parser.add_argument('--poll', type=float, help='Seconds between polls when idle (default JOB_POLL_INTERVAL)')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        size = processes or options['threads'] or getattr(settings, 'JOB_WORKER_THREADS', 2)
+        poll = options['poll'] or getattr(settings, 'JOB_POLL_INTERVAL', 2.0)
+        worker = jobs.worker_name()
+
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Finishing running jobs, then stopping...')
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        requeued = jobs.requeue_stale()
+        pruned = jobs.prune_finished()
+        self.stdout.write(f'✓ {requeued} stale jobs requeued, {pruned} finished jobs pruned')
+        self.stdout.write(f'✓ Worker {worker} running {size} {"processes" if processes else "threads"}')
+
+        if processes:
+            # Child processes must not inherit this process' open connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=size, initializer=_init_worker)
+        else:
+            pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix='job-worker')
+
+        running = set()
+        done_count = 0
+        last_maintenance = time.monotonic()
+        try:
+            while not stopping.is_set():
+                free = size - len(running)
+                claimed = jobs.claim(worker, free) if free else []
+                for job_id in claimed:
+                    running.add(pool.submit(_run, job_id, worker))
+
+                if not running and not claimed:
+                    if options['burst']:
+                        break
+                    stopping.wait(poll)
+                elif running:
+                    finished, running = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        done_count += 1
+                        if future.exception():
+                            self.stderr.write(f'Worker error: {future.exception()}')
+
+                if time.monotonic() - last_maintenance > 3600:
+                    jobs.requeue_stale()
+                    jobs.prune_finished()
+                    last_maintenance = time.monotonic()
+        finally:
+            pool.shutdown(wait=True)
+            done_count += len(running)
+
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {done_count} jobs'))
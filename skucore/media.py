@@ -0,0 +1,234 @@
+"""
+Delivery of Record files and student photos.
+
+Pages and API responses link to short-lived signed URLs instead of raw
+/media/ paths. A URL names the school, the owning row and the file, and
+is only honoured while that row still belongs to the school and still
+points at the file. Expiry is rounded up to a MEDIA_URL_TTL window, so the
+same file gets the same URL for a while and browsers can reuse it.
+
+Responses carry an ETag (the content hash for content-addressed Record
+files), answer If-None-Match with 304, serve single byte ranges with 206,
+and are marked immutable when the file name changes with its content.
+The type comes from the signed stored name, never from the URL, and only
+images and PDFs are shown inline; anything else (HTML, SVG, ...) is sent
+as an attachment so an uploaded file cannot run in the app's origin.
+With MEDIA_X_ACCEL_PREFIX or MEDIA_X_SENDFILE set, the bytes are handed
+off to nginx/Apache and Django only checks the signature.
+"""
+
+import mimetypes
+import posixpath
+import re
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from .photos import RENDITIONS_ROOT
+from .storage import BLOCK_SIZE, blob_sha256
+
+
+SALT = 'skucore.media'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Types safe to render inline; SVG is an image that can carry script
+INLINE_TYPES = ('application/pdf',)
+UNSAFE_IMAGE_TYPES = ('image/svg+xml',)
+
+# Models whose files can be served, and the fields that may hold them
+SOURCES = {
+    'record': ('skucore.Record', 'file', None),
+    'student': ('skucore.Student', 'photo', 'photo_renditions'),
+    'onboarding': ('skucore.StudentOnboardingRequest', 'photo', 'photo_renditions'),
+}
+
+
+def url_ttl():
+    return getattr(settings, 'MEDIA_URL_TTL', 300)
+
+
+# ============ SIGNED URLS ============
+
+def _source_for(instance):
+    for source, (label, _, _) in SOURCES.items():
+        if instance._meta.label == label:
+            return source
+    raise ValueError(f'{instance._meta.label} files are not served')
+
+
+def signed_url(instance, name=None):
+    """
+    Signed URL of a file of `instance` (a Record, Student or onboarding
+    request): its file/photo, or `name` (e.g. a photo rendition).
+    """
+    source = _source_for(instance)
+    if name is None:
+        name = getattr(instance, SOURCES[source][1]).name
+    ttl = url_ttl()
+    expires = (int(time.time()) // ttl + 2) * ttl  # Valid for one to two windows
+    # Signer rather than dumps(): no signing timestamp, so the token is stable
+    token = signing.Signer(salt=SALT).sign_object(
+        {'s': instance.school_id, 'm': source, 'i': instance.pk, 'n': name, 'e': expires},
+        compress=True,
+    )
+    return reverse('media_file', args=[token, posixpath.basename(name)])
+
+
+def _resolve(token):
+    """(storage, name) for a valid token; raises Http404 or PermissionError"""
+    try:
+        payload = signing.Signer(salt=SALT).unsign_object(token)
+        source, school_id, pk, name, expires = (
+            payload['m'], payload['s'], payload['i'], payload['n'], payload['e']
+        )
+        label, field, renditions_field = SOURCES[source]
+    except (signing.BadSignature, KeyError, TypeError):
+        raise Http404('Invalid media link')
+    if expires < time.time():
+        raise PermissionError('This link has expired; reload the page')
+
+    model = apps.get_model(label)
+    fields = [field] + ([renditions_field] if renditions_field else [])
+    row = model.objects.filter(pk=pk, school_id=school_id).values(*fields).first()
+    if row is None:
+        raise Http404('File not found')
+    allowed = {row[field]}
+    if renditions_field and name.startswith(RENDITIONS_ROOT + '/'):
+        renditions = row[renditions_field] or {}
+        if renditions.get('source') == row[field]:
+            allowed.update(
+                path for entry in renditions.values() if isinstance(entry, dict)
+                for key, path in entry.items() if key not in ('width', 'height')
+            )
+    if not name or name not in allowed:
+        raise Http404('File not found')
+    return model._meta.get_field(field).storage, name
+
+
+# ============ RESPONSES ============
+
+def _etag(name, size, modified):
+    sha256 = blob_sha256(name)
+    if sha256:
+        return quote_etag(sha256)
+    return quote_etag(f'{int(modified.timestamp() * 1e6):x}-{size:x}')
+
+
+def _is_immutable(name):
+    # Content-addressed blobs, and renditions which live in a folder per source file
+    return bool(blob_sha256(name)) or name.startswith(RENDITIONS_ROOT + '/')
+
+
+def _is_inline(content_type):
+    if content_type in UNSAFE_IMAGE_TYPES:
+        return False
+    return content_type.startswith('image/') or content_type in INLINE_TYPES
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to send everything, or False"""
+    match = RANGE.match(header.replace(' ', ''))
+    if not match:
+        return None  # Multiple or malformed ranges: send the whole file
+    first, last = match.groups()
+    if first == '' and last == '':
+        return None
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream(handle, start, length):
+    try:
+        handle.seek(start)
+        while length > 0:
+            block = handle.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        handle.close()
+
+
+def serve(request, token, filename):
+    """Serve a signed media URL with ETag, Range and cache headers"""
+    try:
+        storage, name = _resolve(token)
+    except PermissionError as e:
+        return HttpResponseForbidden(str(e))
+    if filename != posixpath.basename(name) or not storage.exists(name):
+        raise Http404('File not found')
+
+    size = storage.size(name)
+    modified = storage.get_modified_time(name)
+    etag = _etag(name, size, modified)
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (
+            f'private, max-age={IMMUTABLE_MAX_AGE}, immutable' if _is_immutable(name)
+            else f'private, max-age={url_ttl()}'
+        ),
+        'Last-Modified': http_date(modified.timestamp()),
+        'X-Content-Type-Options': 'nosniff',
+    }
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    headers['Content-Disposition'] = content_disposition_header(not _is_inline(content_type), filename)
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        response = HttpResponse(status=304)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    accel_prefix = getattr(settings, 'MEDIA_X_ACCEL_PREFIX', '')
+    if accel_prefix or getattr(settings, 'MEDIA_X_SENDFILE', False):
+        # The front server handles Range itself and keeps the headers set here
+        response = HttpResponse(content_type=content_type)
+        if accel_prefix:
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        else:
+            response['X-Sendfile'] = storage.path(name)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = size
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _stream(storage.open(name, 'rb'), start, end - start + 1),
+            status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+    for key, value in headers.items():
+        response[key] = value
+    return response
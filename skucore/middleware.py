@@ -1,12 +1,14 @@
 from django.shortcuts import redirect
 from django.urls import reverse
-from .models import School, UserSchool
+from . import tenant_cache
+from .permissions import load_capabilities
 
 
 class SchoolContextMiddleware:
     """
     Middleware to ensure school context is available on all requests.
-    Sets request.school based on session data.
+    Sets request.school based on session data, resolved through the
+    process-local tenant cache so warm requests cost no queries.
     Redirects to school selection if no school is selected.
     """
     
@@ -37,32 +39,25 @@ class SchoolContextMiddleware:
             request.school = None
             return self.get_response(request)
 
+        # Role/capability snapshot, cached in the session
+        load_capabilities(request)
+
         # Try session first (works for browser requests)
         school_id = request.session.get('school_id')
         if school_id:
-            try:
-                request.school = School.objects.get(id=school_id)
+            school = tenant_cache.get_school(school_id)
+            if school:
+                request.school = school
                 return self.get_response(request)
-            except School.DoesNotExist:
-                request.session.flush()
+            request.session.flush()
 
         # No session school — look up from UserSchool (covers API/token requests)
-        user_school = UserSchool.objects.filter(
-            user=request.user,
-            is_primary=True,
-            is_active=True
-        ).select_related('school').first()
-
-        if not user_school:
-            user_school = UserSchool.objects.filter(
-                user=request.user,
-                is_active=True
-            ).select_related('school').first()
+        school = tenant_cache.get_user_school(request.user)
 
-        if user_school:
-            request.session['school_id'] = user_school.school.id
-            request.session['school_name'] = user_school.school.name
-            request.school = user_school.school
+        if school:
+            request.session['school_id'] = school.id
+            request.session['school_name'] = school.name
+            request.school = school
         else:
             request.school = None
             # Only redirect browser requests, not API requests
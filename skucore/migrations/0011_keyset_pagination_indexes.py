@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0010_add_subscription_to_default_school'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['school', '-date', '-id'], name='attendance_school_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'last_name', 'first_name', 'id'], name='student_school_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentonboardingrequest',
+            index=models.Index(fields=['school', '-created_at', '-id'], name='onboarding_school_created_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:49
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+STATUSES = ['present', 'absent', 'late', 'excused']
+
+
+def build_summaries(apps, schema_editor):
+    """Roll up existing attendance with one grouped aggregate"""
+    Attendance = apps.get_model('skucore', 'Attendance')
+    AttendanceDailySummary = apps.get_model('skucore', 'AttendanceDailySummary')
+
+    counts = {'total': Count('id')}
+    for status in STATUSES:
+        counts[status] = Count('id', filter=Q(status=status))
+    rows = (
+        Attendance.objects.filter(school__isnull=False)
+        .order_by().values('school', 'date', 'student__grade').annotate(**counts)
+    )
+    AttendanceDailySummary.objects.bulk_create([
+        AttendanceDailySummary(
+            school_id=row['school'],
+            date=row['date'],
+            grade_id=row['student__grade'],
+            total=row['total'],
+            **{status: row[status] for status in STATUSES},
+        )
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0011_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('grade', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_summaries', to='skucore.grade')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='skucore.school')),
+            ],
+            options={
+                'verbose_name_plural': 'Attendance daily summaries',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['school', 'date'], name='attendance_summary_day_idx')],
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
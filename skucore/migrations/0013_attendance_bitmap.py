@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:50
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+STATUSES = ['present', 'absent', 'late', 'excused']
+
+
+def build_bitmaps(apps, schema_editor):
+    """Index existing attendance: one bit per day offset from the academic year start"""
+    Attendance = apps.get_model('skucore', 'Attendance')
+    AttendanceBitmap = apps.get_model('skucore', 'AttendanceBitmap')
+    start_month = getattr(settings, 'ACADEMIC_YEAR_START_MONTH', 9)
+
+    bitmaps = {}
+    rows = Attendance.objects.order_by().values_list('school_id', 'student_id', 'date', 'status')
+    for school_id, student_id, date, status in rows.iterator(chunk_size=5000):
+        if status not in STATUSES:
+            continue
+        year = date.year if date.month >= start_month else date.year - 1
+        offset = (date - datetime.date(year, start_month, 1)).days
+        entry = bitmaps.setdefault((student_id, year), {'school_id': school_id, **dict.fromkeys(STATUSES, 0)})
+        entry[status] |= 1 << offset
+
+    def to_bytes(value):
+        return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+    AttendanceBitmap.objects.bulk_create([
+        AttendanceBitmap(
+            school_id=entry['school_id'],
+            student_id=student_id,
+            academic_year=year,
+            **{status: to_bytes(entry[status]) for status in STATUSES},
+        )
+        for (student_id, year), entry in bitmaps.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0012_attendance_daily_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.PositiveSmallIntegerField()),
+                ('present', models.BinaryField(default=bytes)),
+                ('absent', models.BinaryField(default=bytes)),
+                ('late', models.BinaryField(default=bytes)),
+                ('excused', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='skucore.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='skucore.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'academic_year'], name='attendance_bitmap_year_idx')],
+                'unique_together': {('student', 'academic_year')},
+            },
+        ),
+        migrations.RunPython(build_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0013_attendance_bitmap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChronicAbsence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_date', models.DateField()),
+                ('to_date', models.DateField()),
+                ('days_recorded', models.PositiveIntegerField()),
+                ('days_absent', models.PositiveIntegerField()),
+                ('absence_rate', models.FloatField()),
+                ('threshold', models.FloatField()),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chronic_absences', to='skucore.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chronic_absences', to='skucore.student')),
+            ],
+            options={
+                'ordering': ['-absence_rate'],
+                'unique_together': {('school', 'student')},
+            },
+        ),
+    ]
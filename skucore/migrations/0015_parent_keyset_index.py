@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0014_chronic_absence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['school', 'last_name', 'first_name', 'id'], name='parent_school_name_idx'),
+        ),
+    ]
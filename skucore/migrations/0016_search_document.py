@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# SQLite: FTS5 index over SearchDocument.content, kept in sync by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE skucore_search_fts USING fts5(
+        content, content='skucore_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER skucore_search_fts_ai AFTER INSERT ON skucore_searchdocument BEGIN
+        INSERT INTO skucore_search_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER skucore_search_fts_ad AFTER DELETE ON skucore_searchdocument BEGIN
+        INSERT INTO skucore_search_fts(skucore_search_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER skucore_search_fts_au AFTER UPDATE ON skucore_searchdocument BEGIN
+        INSERT INTO skucore_search_fts(skucore_search_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO skucore_search_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS skucore_search_fts_au",
+    "DROP TRIGGER IF EXISTS skucore_search_fts_ad",
+    "DROP TRIGGER IF EXISTS skucore_search_fts_ai",
+    "DROP TABLE IF EXISTS skucore_search_fts",
+]
+
+# PostgreSQL: trigram index for fuzzy matches, tsvector index for prefix matches.
+# The tsvector expression matches SearchVector('content', config='simple').
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX skucore_search_trgm_idx ON skucore_searchdocument USING gin (content gin_trgm_ops)",
+    "CREATE INDEX skucore_search_tsv_idx ON skucore_searchdocument "
+    "USING gin (to_tsvector('simple'::regconfig, COALESCE(content, '')))",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS skucore_search_tsv_idx",
+    "DROP INDEX IF EXISTS skucore_search_trgm_idx",
+]
+
+
+def run_statements(forward):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        statements = {
+            'sqlite': SQLITE_FORWARD if forward else SQLITE_REVERSE,
+            'postgresql': POSTGRES_FORWARD if forward else POSTGRES_REVERSE,
+        }.get(vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0015_parent_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('parent', 'Parent'), ('onboarding', 'Onboarding Request')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, max_length=255)),
+                ('content', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='skucore.school')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'kind'], name='search_document_school_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(run_statements(forward=True), run_statements(forward=False)),
+    ]
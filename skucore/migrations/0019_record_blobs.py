@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:06
+
+from django.db import migrations, models
+import skucore.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0018_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='record',
+            name='file',
+            field=models.FileField(storage=skucore.storage.record_storage, upload_to='student_records/%Y/%m/'),
+        ),
+        migrations.CreateModel(
+            name='RecordBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='record_blob_gc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:20
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+
+KINDS = {
+    'student': 'Student',
+    'parent': 'Parent',
+    'onboarding': 'StudentOnboardingRequest',
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+def build_documents(apps, schema_editor):
+    """Index existing students, parents and onboarding requests (rows already indexed are kept)"""
+    SearchDocument = apps.get_model('skucore', 'SearchDocument')
+
+    for kind, model_name in KINDS.items():
+        model = apps.get_model('skucore', model_name)
+        batch = []
+        for instance in model.objects.order_by('pk').iterator(chunk_size=2000):
+            name = f"{instance.first_name} {instance.last_name}".strip()
+            phone = instance.phone_number or ''
+            if kind == 'student':
+                subtitle = instance.email
+            elif kind == 'parent':
+                subtitle = f"{instance.get_parent_type_display()} · {instance.email}"
+            else:
+                subtitle = f"Onboarding ({instance.get_status_display()}) · {instance.email}"
+            batch.append(SearchDocument(
+                school_id=instance.school_id,
+                kind=kind,
+                object_id=instance.pk,
+                title=name[:255],
+                subtitle=subtitle[:255],
+                content=normalize(' '.join(filter(None, [name, instance.email, phone, re.sub(r'\D', '', phone)]))),
+            ))
+            if len(batch) >= 1000:
+                SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0020_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:00
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+STATUSES = ['present', 'absent', 'late', 'excused']
+
+
+def rebuild_summaries(apps, schema_editor):
+    """Recompute every roll-up, so no (school, date, grade) is left with two rows before the constraints"""
+    Attendance = apps.get_model('skucore', 'Attendance')
+    AttendanceDailySummary = apps.get_model('skucore', 'AttendanceDailySummary')
+
+    AttendanceDailySummary.objects.all().delete()
+    counts = {'total': Count('id'), **{status: Count('id', filter=Q(status=status)) for status in STATUSES}}
+    rows = (
+        Attendance.objects.filter(school__isnull=False).order_by()
+        .values('school_id', 'date', 'student__grade').annotate(**counts)
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(AttendanceDailySummary(
+            school_id=row['school_id'],
+            date=row['date'],
+            grade_id=row['student__grade'],
+            total=row['total'],
+            **{status: row[status] for status in STATUSES},
+        ))
+        if len(batch) >= 1000:
+            AttendanceDailySummary.objects.bulk_create(batch)
+            batch = []
+    AttendanceDailySummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0022_job_result'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_summaries, migrations.RunPython.noop),
+    ]
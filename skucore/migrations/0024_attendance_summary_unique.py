@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skucore', '0023_merge_attendance_summaries'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='attendancedailysummary',
+            constraint=models.UniqueConstraint(fields=('school', 'date', 'grade'), name='attendance_summary_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedailysummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('grade__isnull', True)), fields=('school', 'date'), name='attendance_summary_unique_no_grade'),
+        ),
+    ]
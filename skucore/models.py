@@ -1,7 +1,11 @@
+import uuid
+
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
 
+from .storage import record_storage
+
 
 # ============ SCHOOL & SUBSCRIPTION MODELS ============
 
@@ -226,6 +230,10 @@ class Parent(models.Model):
     class Meta:
         ordering = ['last_name', 'first_name']
         unique_together = ('school', 'email')
+        indexes = [
+            # Keyset pagination of the portal parent list
+            models.Index(fields=['school', 'last_name', 'first_name', 'id'], name='parent_school_name_idx'),
+        ]
 
     def __str__(self):
         school_name = self.school.name if self.school else "No School"
@@ -242,6 +250,11 @@ class Student(models.Model):
     date_of_birth = models.DateField()
     enrollment_date = models.DateField(auto_now_add=True)
     photo = models.ImageField(upload_to='student_photos/', blank=True, null=True)
+    # Original dimensions, recorded by skucore.photos
+    photo_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    photo_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # Generated by skucore.photos: {'source': name, name: {'webp': path, 'jpeg': path, 'width': w, 'height': h}}
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
     
     # Relationships
     grade = models.ForeignKey(Grade, on_delete=models.SET_NULL, null=True, related_name='students')
@@ -258,6 +271,10 @@ class Student(models.Model):
     class Meta:
         ordering = ['last_name', 'first_name']
         unique_together = ('school', 'email')
+        indexes = [
+            # Keyset pagination of the roster
+            models.Index(fields=['school', 'last_name', 'first_name', 'id'], name='student_school_name_idx'),
+        ]
 
     def __str__(self):
         school_name = self.school.name if self.school else "No School"
@@ -285,6 +302,10 @@ class Attendance(models.Model):
         verbose_name_plural = "Attendance"
         unique_together = ('school', 'student', 'date')
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination and per-date lookups
+            models.Index(fields=['school', '-date', '-id'], name='attendance_school_date_idx'),
+        ]
 
     def __str__(self):
         school_name = self.school.name if self.school else "No School"
@@ -312,6 +333,9 @@ class StudentOnboardingRequest(models.Model):
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     date_of_birth = models.DateField()
     photo = models.ImageField(upload_to='onboarding_photos/', blank=True, null=True)
+    photo_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    photo_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
     
     # Related data
     grade = models.ForeignKey(Grade, on_delete=models.SET_NULL, null=True, blank=True)
@@ -334,6 +358,10 @@ class StudentOnboardingRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of requests
+            models.Index(fields=['school', '-created_at', '-id'], name='onboarding_school_created_idx'),
+        ]
 
     def __str__(self):
         school_name = self.school.name if self.school else "No School"
@@ -354,8 +382,10 @@ class Record(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='records', null=True, blank=True)
     onboarding_request = models.ForeignKey('StudentOnboardingRequest', on_delete=models.CASCADE, related_name='records', null=True, blank=True)
     record_type = models.CharField(max_length=50, choices=RECORD_TYPE_CHOICES)
-    file = models.FileField(upload_to='student_records/%Y/%m/')
+    file = models.FileField(upload_to='student_records/%Y/%m/', storage=record_storage)  # Stored by content hash, see skucore/storage.py
     description = models.TextField(blank=True, null=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)  # Bytes
+    sha256 = models.CharField(max_length=64, blank=True, editable=False)  # Hex digest of the file content
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploaded_records')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -369,4 +399,189 @@ class Record(models.Model):
             return f"{self.student} - {self.get_record_type_display()} ({school_name})"
         elif self.onboarding_request:
             return f"{self.onboarding_request.first_name} {self.onboarding_request.last_name} (Onboarding) - {self.get_record_type_display()} ({school_name})"
-        return f"Record - {self.get_record_type_display()} ({school_name})"
\ No newline at end of file
+        return f"Record - {self.get_record_type_display()} ({school_name})"
+
+# Attendance roll-up: status counts per school, date and grade
+class AttendanceDailySummary(models.Model):
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='attendance_summaries')
+    date = models.DateField()
+    grade = models.ForeignKey(Grade, on_delete=models.SET_NULL, null=True, blank=True, related_name='attendance_summaries')
+    total = models.PositiveIntegerField(default=0)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Attendance daily summaries"
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['school', 'date'], name='attendance_summary_day_idx'),
+        ]
+        # One row per (school, date, grade), kept current with F() deltas; NULLs are
+        # distinct in a plain unique constraint, so the no-grade row needs its own
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'date', 'grade'], name='attendance_summary_unique'),
+            models.UniqueConstraint(
+                fields=['school', 'date'], condition=models.Q(grade__isnull=True),
+                name='attendance_summary_unique_no_grade',
+            ),
+        ]
+
+    def __str__(self):
+        grade_name = self.grade.grade_name if self.grade else "No Grade"
+        return f"{self.date} - {grade_name}: {self.present}/{self.total} present"
+
+
+# Attendance bitmap: one bit per calendar day of an academic year, one lane per status
+class AttendanceBitmap(models.Model):
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='attendance_bitmaps', null=True, blank=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    academic_year = models.PositiveSmallIntegerField()  # Calendar year the academic year starts in
+    present = models.BinaryField(default=bytes)
+    absent = models.BinaryField(default=bytes)
+    late = models.BinaryField(default=bytes)
+    excused = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'academic_year')
+        indexes = [
+            models.Index(fields=['school', 'academic_year'], name='attendance_bitmap_year_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.academic_year}/{self.academic_year + 1}"
+
+
+# Students flagged by the chronic absenteeism job; replaced per school on every run
+class ChronicAbsence(models.Model):
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='chronic_absences')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='chronic_absences')
+    from_date = models.DateField()
+    to_date = models.DateField()
+    days_recorded = models.PositiveIntegerField()
+    days_absent = models.PositiveIntegerField()
+    absence_rate = models.FloatField()
+    threshold = models.FloatField()
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-absence_rate']
+        unique_together = ('school', 'student')
+
+    def __str__(self):
+        return f"{self.student} - {self.absence_rate:.0%} absent ({self.from_date} to {self.to_date})"
+
+
+# Search index: one normalized document per student, parent or onboarding request
+class SearchDocument(models.Model):
+    KIND_CHOICES = [
+        ('student', 'Student'),
+        ('parent', 'Parent'),
+        ('onboarding', 'Onboarding Request'),
+    ]
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='search_documents', null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    content = models.TextField()  # Normalized names, email and phone
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        indexes = [
+            models.Index(fields=['school', 'kind'], name='search_document_school_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+# A content-addressed Record file and the number of Records pointing at it
+class RecordBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)  # Storage name, records/aa/bb/<sha256><ext>
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Last reference change; the GC grace period starts here
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='record_blob_gc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+
+# Resumable upload of one Record file, sent in chunks and assembled on finalize
+class UploadSession(models.Model):
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='upload_sessions')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='upload_sessions', null=True, blank=True)
+    onboarding_request = models.ForeignKey('StudentOnboardingRequest', on_delete=models.CASCADE, related_name='upload_sessions', null=True, blank=True)
+    record_type = models.CharField(max_length=50, choices=Record.RECORD_TYPE_CHOICES)
+    description = models.TextField(blank=True, null=True)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)  # Bytes written so far; the next chunk starts here
+    expected_sha256 = models.CharField(max_length=64, blank=True)  # Optional checksum verified on finalize
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    record = models.OneToOneField(Record, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_session')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='upload_session_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.total_size} bytes, {self.status})"
+
+
+# Background job: a registered task name with JSON arguments, run by manage.py run_workers
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=255)  # Dotted path of a function decorated with skucore.jobs.task
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0)  # Higher runs first
+    run_at = models.DateTimeField()  # Not before; pushed back on every retry
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)  # Worker running the job
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)  # Return value of a succeeded task
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status}, attempt {self.attempts}/{self.max_attempts})"
@@ -0,0 +1,18 @@
+"""
+Onboarding approvals.
+
+move_onboarding_records is a single UPDATE and runs inside the approval
+transaction; it stays registered as a task so jobs queued before that
+change still resolve.
+"""
+
+from .jobs import task
+from .models import Record
+
+
+@task
+def move_onboarding_records(onboarding_id, student_id):
+    """Attach the records of an approved onboarding request to the new student"""
+    records = Record.objects.filter(onboarding_request_id=onboarding_id)
+    # Files are content-addressed, so this only re-points rows; blob references are unchanged
+    return records.update(student_id=student_id, onboarding_request=None)
@@ -1,88 +1,235 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import redirect
+from enum import IntFlag
 from functools import wraps
+import time
+
+
+class Capability(IntFlag):
+    """
+    Role and capability bits. A user's snapshot is a single int holding
+    exactly one role bit plus the capability bits that role grants.
+    """
+    TEACHER = 1 << 0
+    OPERATOR = 1 << 1
+    READONLY = 1 << 2
+    ADMIN = 1 << 3
+    PRINCIPAL = 1 << 4
+    VICE_PRINCIPAL = 1 << 5
+
+    INITIATE_ONBOARDING = 1 << 8
+    APPROVE_ONBOARDING = 1 << 9
+    EDIT_STUDENTS = 1 << 10
+    DELETE_STUDENTS = 1 << 11
+    VIEW_ALL_DATA = 1 << 12
+
+
+ROLE_FLAGS = {
+    'teacher': Capability.TEACHER,
+    'operator': Capability.OPERATOR,
+    'readonly': Capability.READONLY,
+    'admin': Capability.ADMIN,
+    'principal': Capability.PRINCIPAL,
+    'vice_principal': Capability.VICE_PRINCIPAL,
+}
+
+ROLE_CAPABILITIES = {
+    'teacher': (Capability.TEACHER | Capability.INITIATE_ONBOARDING
+                | Capability.EDIT_STUDENTS | Capability.VIEW_ALL_DATA),
+    'operator': (Capability.OPERATOR | Capability.INITIATE_ONBOARDING
+                 | Capability.EDIT_STUDENTS | Capability.VIEW_ALL_DATA),
+    'readonly': Capability.READONLY,
+    'admin': (Capability.ADMIN | Capability.APPROVE_ONBOARDING | Capability.EDIT_STUDENTS
+              | Capability.DELETE_STUDENTS | Capability.VIEW_ALL_DATA),
+    'principal': (Capability.PRINCIPAL | Capability.APPROVE_ONBOARDING | Capability.EDIT_STUDENTS
+                  | Capability.DELETE_STUDENTS | Capability.VIEW_ALL_DATA),
+    'vice_principal': (Capability.VICE_PRINCIPAL | Capability.APPROVE_ONBOARDING
+                       | Capability.EDIT_STUDENTS | Capability.DELETE_STUDENTS
+                       | Capability.VIEW_ALL_DATA),
+}
+
+SESSION_KEY = 'capabilities'
+
+
+def capabilities_for_role(role):
+    """Capability mask granted by a role name"""
+    return ROLE_CAPABILITIES.get(role, Capability(0))
+
+
+def role_from_capabilities(mask):
+    """Role name encoded in a capability mask"""
+    for role, flag in ROLE_FLAGS.items():
+        if mask & flag:
+            return role
+    return None
+
+
+def _role_version_key(user_id):
+    return f'skucore:role-version:{user_id}'
+
+
+def get_role_version(user_id):
+    return cache.get(_role_version_key(user_id), 0)
+
+
+def bump_role_version(user_id):
+    """
+    Invalidate capability snapshots cached in sessions and token tenants for
+    this user. The version lives in the Django cache, so with a shared cache
+    (REDIS_URL) the change reaches every worker on its next request.
+    """
+    key = _role_version_key(user_id)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def compute_capabilities(user):
+    """Build the capability mask from the database"""
+    from .models import UserRole
+    role = UserRole.objects.filter(user=user).values_list('role', flat=True).first()
+    return capabilities_for_role(role)
+
+
+def attach_capabilities(request, mask, user=None):
+    """Store a snapshot on the request (and its user, for user-based helpers)"""
+    mask = Capability(mask)
+    request.capabilities = mask
+    request.role = role_from_capabilities(mask)
+    (user or request.user)._capabilities = mask
+
+
+def load_capabilities(request):
+    """
+    Attach the session user's capability snapshot to the request, reusing the
+    copy cached in the session while it is fresh. A snapshot is stale once
+    the user's role version changes or after CAPABILITY_SNAPSHOT_TTL seconds.
+    """
+    user = request.user
+    version = get_role_version(user.id)
+    snapshot = request.session.get(SESSION_KEY)
+    if (snapshot and snapshot.get('user') == user.id
+            and snapshot.get('version') == version
+            and snapshot.get('expires', 0) > time.time()):
+        mask = snapshot['mask']
+    else:
+        mask = compute_capabilities(user)
+        request.session[SESSION_KEY] = {
+            'user': user.id,
+            'mask': int(mask),
+            'version': version,
+            'expires': time.time() + getattr(settings, 'CAPABILITY_SNAPSHOT_TTL', 300),
+        }
+    attach_capabilities(request, mask)
+
+
+def get_user_capabilities(user):
+    """Capability mask of a user; computed at most once per user object"""
+    if not user.is_authenticated:
+        return Capability(0)
+    mask = getattr(user, '_capabilities', None)
+    if mask is None:
+        mask = compute_capabilities(user)
+        user._capabilities = mask
+    return mask
+
+
+def get_request_capabilities(request):
+    """Capability snapshot attached at authentication time"""
+    mask = getattr(request, 'capabilities', None)
+    if mask is None:
+        mask = get_user_capabilities(request.user)
+    return mask
+
+
+def has_capability(user, capability):
+    return bool(get_user_capabilities(user) & capability)
 
 
 def get_user_role(user):
     """Get the role of a user"""
     if not user.is_authenticated:
         return None
-    try:
-        return user.user_role.role
-    except:
-        return None
+    return role_from_capabilities(get_user_capabilities(user))
 
 
 def user_is_teacher(user):
     """Check if user is a teacher"""
-    return get_user_role(user) == 'teacher'
+    return has_capability(user, Capability.TEACHER)
 
 
 def user_is_operator(user):
     """Check if user is an operator"""
-    return get_user_role(user) == 'operator'
+    return has_capability(user, Capability.OPERATOR)
 
 
 def user_is_readonly(user):
     """Check if user is read-only"""
-    return get_user_role(user) == 'readonly'
+    return has_capability(user, Capability.READONLY)
 
 
 def user_is_admin(user):
     """Check if user is administrator"""
-    return get_user_role(user) == 'admin'
+    return has_capability(user, Capability.ADMIN)
 
 
 def user_is_principal(user):
     """Check if user is principal"""
-    return get_user_role(user) == 'principal'
+    return has_capability(user, Capability.PRINCIPAL)
 
 
 def user_is_vice_principal(user):
     """Check if user is vice principal"""
-    return get_user_role(user) == 'vice_principal'
+    return has_capability(user, Capability.VICE_PRINCIPAL)
 
 
 def can_initiate_onboarding(user):
     """Check if user can initiate student onboarding (Teacher or Operator)"""
-    role = get_user_role(user)
-    return role in ['teacher', 'operator']
+    return has_capability(user, Capability.INITIATE_ONBOARDING)
 
 
 def can_approve_onboarding(user):
     """Check if user can approve student onboarding (Principal or Vice Principal)"""
-    role = get_user_role(user)
-    return role in ['principal', 'vice_principal', 'admin']
+    return has_capability(user, Capability.APPROVE_ONBOARDING)
 
 
 def can_edit_students(user):
     """Check if user can edit student records (Operator, Teacher, Admin, Principal, VP)"""
-    role = get_user_role(user)
-    return role in ['operator', 'teacher', 'admin', 'principal', 'vice_principal']
+    return has_capability(user, Capability.EDIT_STUDENTS)
 
 
 def can_delete_students(user):
     """Check if user can delete student records (Admin, Principal, VP)"""
-    role = get_user_role(user)
-    return role in ['admin', 'principal', 'vice_principal']
+    return has_capability(user, Capability.DELETE_STUDENTS)
 
 
 def can_view_all_data(user):
     """Check if user can view all data (everyone except readonly)"""
-    role = get_user_role(user)
-    return role in ['teacher', 'operator', 'admin', 'principal', 'vice_principal']
+    return has_capability(user, Capability.VIEW_ALL_DATA)
+
+
+def _role_mask(roles):
+    mask = Capability(0)
+    for role in roles:
+        mask |= ROLE_FLAGS.get(role, Capability(0))
+    return mask
 
 
 # Decorators
 def role_required(*allowed_roles):
     """Decorator to check if user has one of the allowed roles"""
+    allowed = _role_mask(allowed_roles)
+
     def decorator(view_func):
         @wraps(view_func)
         @login_required
         def wrapper(request, *args, **kwargs):
-            user_role = get_user_role(request.user)
-            if user_role not in allowed_roles:
+            if not get_request_capabilities(request) & allowed:
                 raise PermissionDenied("You do not have permission to access this page.")
             return view_func(request, *args, **kwargs)
         return wrapper
@@ -119,7 +266,7 @@ def can_edit_student_required(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
-        if not can_edit_students(request.user):
+        if not get_request_capabilities(request) & Capability.EDIT_STUDENTS:
             raise PermissionDenied("You do not have permission to edit student records.")
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -130,7 +277,7 @@ def can_approve_onboarding_required(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
-        if not can_approve_onboarding(request.user):
+        if not get_request_capabilities(request) & Capability.APPROVE_ONBOARDING:
             raise PermissionDenied("You do not have permission to approve student onboarding.")
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -145,8 +292,7 @@ class RoleRequiredMixin:
         if not request.user.is_authenticated:
             return redirect('login')
         
-        user_role = get_user_role(request.user)
-        if user_role not in self.allowed_roles:
+        if not get_request_capabilities(request) & _role_mask(self.allowed_roles):
             raise PermissionDenied("You do not have permission to access this page.")
         
         return super().dispatch(request, *args, **kwargs)
@@ -178,3 +324,4 @@ class CanEditStudentMixin(RoleRequiredMixin):
 
 class CanApproveOnboardingMixin(RoleRequiredMixin):
     allowed_roles = ['principal', 'vice_principal', 'admin']
+
@@ -0,0 +1,171 @@
+"""
+Photo processing for Student.photo and StudentOnboardingRequest.photo.
+
+After an upload is saved, a background job (skucore.jobs):
+- applies the EXIF orientation and rewrites the original without EXIF
+  metadata (camera, GPS), when it has any
+- records the original width and height
+- writes fixed-size WebP and JPEG renditions (see PHOTO_RENDITIONS)
+
+The rendition paths are stored in the row's photo_renditions JSON field,
+so serializers and templates can point at small files without extra
+queries. Rows are updated with queryset.update() to avoid re-triggering
+the post_save handlers.
+"""
+
+import hashlib
+import logging
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import jobs
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, mode); 'crop' fills the box, 'fit' keeps the aspect ratio
+DEFAULT_RENDITIONS = {
+    'avatar': (64, 64, 'crop'),
+    'thumbnail': (160, 160, 'crop'),
+    'detail': (640, 640, 'fit'),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+RENDITIONS_ROOT = 'photo_renditions'
+
+
+def rendition_specs():
+    return getattr(settings, 'PHOTO_RENDITIONS', DEFAULT_RENDITIONS)
+
+
+def rendition_url(instance, name, fmt='jpeg'):
+    """Signed URL of one rendition, or None if it has not been generated yet"""
+    from .media import signed_url
+    renditions = instance.photo_renditions or {}
+    entry = renditions.get(name)
+    if not entry or renditions.get('source') != instance.photo.name:
+        return None
+    return signed_url(instance, entry[fmt])
+
+
+# ============ SCHEDULING ============
+
+def needs_processing(instance):
+    renditions = instance.photo_renditions or {}
+    if not instance.photo:
+        return bool(renditions)
+    return renditions.get('source') != instance.photo.name
+
+
+def schedule_processing(instance):
+    """Queue the photo of a saved row for processing"""
+    jobs.enqueue(process_photo, instance._meta.label, instance.pk)
+
+
+# ============ PROCESSING ============
+
+def _render(image, width, height, mode):
+    if mode == 'crop':
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    image = image.copy()
+    image.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return image
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _strip_metadata(field, image, source_format):
+    """Rewrite the original in place without EXIF; orientation is already applied"""
+    buffer = BytesIO()
+    options = {'quality': 90} if source_format in ('JPEG', 'WEBP') else {}
+    if source_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    image.save(buffer, source_format, **options)
+    name = field.name
+    field.storage.delete(name)
+    saved = field.storage.save(name, ContentFile(buffer.getvalue()))
+    if saved != name:  # Storage picked another name; keep using the original one
+        field.storage.delete(saved)
+        raise RuntimeError(f'Could not rewrite {name} in place')
+
+
+@jobs.task
+def delete_renditions(renditions, storage=None):
+    storage = storage or default_storage
+    for name, entry in (renditions or {}).items():
+        if isinstance(entry, dict):
+            for fmt in FORMATS:
+                if entry.get(fmt):
+                    storage.delete(entry[fmt])
+
+
+@jobs.task(max_attempts=3)
+def process_photo(label, pk):
+    """Strip EXIF, record dimensions and regenerate renditions for one row"""
+    model = apps.get_model(label)
+    instance = model.objects.filter(pk=pk).only('id', 'photo', 'photo_renditions').first()
+    if instance is None:
+        return
+    field = instance.photo
+    old_renditions = instance.photo_renditions or {}
+
+    if not field:
+        delete_renditions(old_renditions, field.storage)
+        model.objects.filter(pk=pk).update(photo_renditions={}, photo_width=None, photo_height=None)
+        return
+
+    source = field.name
+    try:
+        with field.storage.open(source, 'rb') as handle:
+            original = Image.open(handle)
+            original.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError):
+        logger.warning('Cannot read photo %s of %s %s', source, label, pk)
+        return
+
+    source_format = original.format
+    has_metadata = bool(original.getexif()) or 'exif' in original.info
+    image = ImageOps.exif_transpose(original)
+    if has_metadata and source_format in ('JPEG', 'PNG', 'WEBP'):
+        _strip_metadata(field, image, source_format)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    # A folder per source file, so a newer upload never overwrites files still in use
+    digest = hashlib.sha1(source.encode()).hexdigest()[:12]
+    folder = posixpath.join(RENDITIONS_ROOT, model._meta.model_name, str(pk), digest)
+    renditions = {'source': source}
+    for name, (width, height, mode) in rendition_specs().items():
+        rendered = _render(image, width, height, mode)
+        entry = {'width': rendered.width, 'height': rendered.height}
+        for fmt in FORMATS:
+            path = posixpath.join(folder, f'{name}.{fmt}')
+            field.storage.delete(path)  # Left over from an earlier run on the same source
+            entry[fmt] = field.storage.save(path, ContentFile(_encode(rendered, fmt)))
+        renditions[name] = entry
+
+    # Only publish if the photo was not replaced while we worked
+    updated = model.objects.filter(pk=pk, photo=source).update(
+        photo_renditions=renditions, photo_width=image.width, photo_height=image.height,
+    )
+    if not updated:
+        delete_renditions(renditions, field.storage)
+    elif old_renditions.get('source') != source:
+        delete_renditions(old_renditions, field.storage)
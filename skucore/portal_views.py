@@ -4,9 +4,14 @@ from django.contrib.auth import authenticate, login
 from django.contrib import messages
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.views import LoginView as DjangoLoginView
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
 from datetime import datetime
 
 from .models import (
@@ -19,8 +24,11 @@ from .permissions import (
     get_user_role, can_initiate_onboarding, can_approve_onboarding,
     can_edit_students, user_is_readonly, user_is_operator, user_is_teacher,
     principal_required, vice_principal_required, admin_required,
-    role_required, can_approve_onboarding_required
+    role_required, can_approve_onboarding_required, can_view_all_data
 )
+from .pagination import KeysetPagination
+from .school_stats import get_school_stats
+from .onboarding import move_onboarding_records
 
 
 # ============ AUTHENTICATION VIEWS ============
@@ -133,7 +141,10 @@ def create_parent_inline(request):
     
     form = ParentForm(request.POST)
     if form.is_valid():
-        parent = form.save()
+        parent = form.save(commit=False)
+        # Scope to the school so the onboarding form's parents field accepts it
+        parent.school = request.school
+        parent.save()
         return JsonResponse({
             'success': True,
             'parent': {
@@ -160,7 +171,6 @@ def teacher_portal(request):
     context = {
         'portal_name': 'Teacher Portal',
         'role': 'Teacher',
-        'students': Student.objects.filter(is_active=True, school=request.school),
         'pending_onboarding': StudentOnboardingRequest.objects.filter(
             requested_by=request.user,
             school=request.school,
@@ -182,14 +192,16 @@ def operator_portal(request):
     if not user_is_operator(request.user):
         raise PermissionDenied("You do not have access to the operator portal.")
     
+    stats = get_school_stats(request.school)
     context = {
         'portal_name': 'Operator Portal',
         'role': 'Operator',
-        'total_students': Student.objects.filter(school=request.school).count(),
-        'active_students': Student.objects.filter(is_active=True, school=request.school).count(),
-        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school),
-        'my_requests': StudentOnboardingRequest.objects.filter(requested_by=request.user, school=request.school),
-        'recent_requests': StudentOnboardingRequest.objects.filter(school=request.school)[:10],
+        'total_students': stats['total_students'],
+        'active_students': stats['active_students'],
+        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school).select_related('requested_by'),
+        'pending_count': stats['pending_onboarding'],
+        'my_requests': StudentOnboardingRequest.objects.filter(requested_by=request.user, school=request.school).select_related('requested_by'),
+        'recent_requests': StudentOnboardingRequest.objects.filter(school=request.school).select_related('requested_by')[:10],
     }
     return render(request, 'core/portals/operator_portal.html', context)
 
@@ -200,12 +212,13 @@ def readonly_portal(request):
     if not user_is_readonly(request.user):
         raise PermissionDenied("You do not have access to the read-only portal.")
     
+    stats = get_school_stats(request.school)
     context = {
         'portal_name': 'Read-Only Portal',
         'role': 'Read-Only User',
-        'students': Student.objects.filter(school=request.school),
-        'parents': Parent.objects.filter(school=request.school),
-        'attendance': Attendance.objects.filter(school=request.school).order_by('-date')[:50],
+        'total_students': stats['total_students'],
+        'total_parents': stats['total_parents'],
+        'attendance': Attendance.objects.filter(school=request.school).select_related('student').order_by('-date', '-id')[:10],
     }
     return render(request, 'core/portals/readonly_portal.html', context)
 
@@ -216,14 +229,16 @@ def admin_portal(request):
     if not (request.user.is_superuser or get_user_role(request.user) == 'admin'):
         raise PermissionDenied("You do not have access to the admin portal.")
     
+    stats = get_school_stats(request.school)
     context = {
         'portal_name': 'Administrator Portal',
         'role': 'Administrator',
-        'total_users': UserRole.objects.filter(school=request.school).count(),
-        'total_students': Student.objects.filter(school=request.school).count(),
-        'total_parents': Parent.objects.filter(school=request.school).count(),
-        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school),
-        'recent_onboarding': StudentOnboardingRequest.objects.filter(school=request.school)[:10],
+        'total_users': stats['total_users'],
+        'total_students': stats['total_students'],
+        'total_parents': stats['total_parents'],
+        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school).select_related('requested_by'),
+        'pending_count': stats['pending_onboarding'],
+        'recent_onboarding': StudentOnboardingRequest.objects.filter(school=request.school).select_related('requested_by')[:10],
     }
     return render(request, 'core/portals/admin_portal.html', context)
 
@@ -231,13 +246,15 @@ def admin_portal(request):
 @principal_required
 def principal_portal(request):
     """Principal Portal - approve requests, manage school-wide operations"""
+    stats = get_school_stats(request.school)
     context = {
         'portal_name': 'Principal Portal',
         'role': 'Principal',
-        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school),
-        'total_students': Student.objects.filter(school=request.school).count(),
-        'active_students': Student.objects.filter(is_active=True, school=request.school).count(),
-        'recent_approvals': StudentOnboardingRequest.objects.filter(
+        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school).select_related('requested_by'),
+        'pending_count': stats['pending_onboarding'],
+        'total_students': stats['total_students'],
+        'active_students': stats['active_students'],
+        'recent_approvals': StudentOnboardingRequest.objects.select_related('requested_by').filter(
             approved_by=request.user,
             school=request.school
         )[:10],
@@ -248,13 +265,15 @@ def principal_portal(request):
 @role_required('vice_principal')
 def vice_principal_portal(request):
     """Vice Principal Portal - approve requests, manage operations"""
+    stats = get_school_stats(request.school)
     context = {
         'portal_name': 'Vice Principal Portal',
         'role': 'Vice Principal',
-        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school),
-        'total_students': Student.objects.filter(school=request.school).count(),
-        'active_students': Student.objects.filter(is_active=True, school=request.school).count(),
-        'recent_approvals': StudentOnboardingRequest.objects.filter(
+        'pending_onboarding': StudentOnboardingRequest.objects.filter(status='pending', school=request.school).select_related('requested_by'),
+        'pending_count': stats['pending_onboarding'],
+        'total_students': stats['total_students'],
+        'active_students': stats['active_students'],
+        'recent_approvals': StudentOnboardingRequest.objects.select_related('requested_by').filter(
             approved_by=request.user,
             school=request.school
         )[:10],
@@ -262,6 +281,98 @@ def vice_principal_portal(request):
     return render(request, 'core/portals/vice_principal_portal.html', context)
 
 
+# ============ PORTAL LIST PARTIALS ============
+# Student and parent tables in the portals are filled page by page from
+# these endpoints (infinite scroll). Pages use keyset pagination, so each
+# request reads at most one page of rows however large the school is.
+
+def _portal_list_page(request, queryset, ordering, template, serialize):
+    """
+    One keyset page of `queryset` as HTML table rows (default) or JSON
+    (?format=json). The HTML fragment ends with a sentinel row carrying
+    the next page URL.
+    """
+    paginator = KeysetPagination(ordering)
+    try:
+        # KeysetPagination reads DRF-style query_params and builds absolute links
+        rows = paginator.paginate_queryset(queryset, Request(request))
+    except NotFound as e:
+        raise Http404(str(e.detail))
+    next_url = paginator.get_next_link()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': [serialize(row) for row in rows], 'next': next_url})
+    html = render_to_string(template, {'rows': rows, 'next_url': next_url}, request=request)
+    return HttpResponse(html)
+
+
+def _search(queryset, request, fields):
+    term = request.GET.get('q', '').strip()
+    if term:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+@login_required
+def portal_student_rows(request):
+    """
+    GET /portal/students/rows/?q=&grade=&active=1[&cursor=][&format=json]
+    A page of the school's students for the portal tables
+    """
+    if not (can_view_all_data(request.user) or user_is_readonly(request.user)):
+        raise PermissionDenied("You do not have access to student data.")
+
+    students = Student.objects.filter(school=request.school).select_related('grade').only(
+        'id', 'first_name', 'last_name', 'email', 'is_active', 'grade__grade_name'
+    )
+    students = _search(students, request, ['first_name', 'last_name', 'email'])
+    if request.GET.get('grade', '').isdigit():
+        students = students.filter(grade_id=request.GET['grade'])
+    if request.GET.get('active') == '1':
+        students = students.filter(is_active=True)
+
+    return _portal_list_page(
+        request, students, ('last_name', 'first_name', 'id'),
+        'core/portals/partials/student_rows.html',
+        lambda student: {
+            'id': student.id,
+            'name': f"{student.first_name} {student.last_name}",
+            'email': student.email,
+            'grade': student.grade.grade_name if student.grade else None,
+            'is_active': student.is_active,
+        },
+    )
+
+
+@login_required
+def portal_parent_rows(request):
+    """
+    GET /portal/parents/rows/?q=[&cursor=][&format=json]
+    A page of the school's parents for the portal tables
+    """
+    if not (can_view_all_data(request.user) or user_is_readonly(request.user)):
+        raise PermissionDenied("You do not have access to parent data.")
+
+    parents = Parent.objects.filter(school=request.school).only(
+        'id', 'first_name', 'last_name', 'parent_type', 'email', 'phone_number'
+    )
+    parents = _search(parents, request, ['first_name', 'last_name', 'email', 'phone_number'])
+
+    return _portal_list_page(
+        request, parents, ('last_name', 'first_name', 'id'),
+        'core/portals/partials/parent_rows.html',
+        lambda parent: {
+            'id': parent.id,
+            'name': f"{parent.first_name} {parent.last_name}",
+            'parent_type': parent.parent_type,
+            'email': parent.email,
+            'phone_number': parent.phone_number,
+        },
+    )
+
+
 # ============ ONBOARDING REQUEST VIEWS ============
 
 @login_required
@@ -271,10 +382,10 @@ def onboarding_request_list(request):
     
     if can_approve_onboarding(request.user):
         # Approvers see all pending requests for their school
-        requests = StudentOnboardingRequest.objects.filter(status='pending', school=request.school)
+        requests = StudentOnboardingRequest.objects.filter(status='pending', school=request.school).select_related('requested_by')
     elif can_initiate_onboarding(request.user):
         # Requesters see their own requests for their school
-        requests = StudentOnboardingRequest.objects.filter(requested_by=request.user, school=request.school)
+        requests = StudentOnboardingRequest.objects.filter(requested_by=request.user, school=request.school).select_related('requested_by')
     else:
         raise PermissionDenied("You do not have permission to view onboarding requests.")
     
@@ -410,39 +521,37 @@ def onboarding_request_approve(request, pk):
             status = form.cleaned_data['status']
             
             if status == 'approved':
-                # Create the student record
-                student = Student.objects.create(
-                    school=onboarding.school,
-                    first_name=onboarding.first_name,
-                    last_name=onboarding.last_name,
-                    email=onboarding.email,
-                    phone_number=onboarding.phone_number,
-                    date_of_birth=onboarding.date_of_birth,
-                    grade=onboarding.grade,
-                    address=onboarding.address,
-                    bus=onboarding.bus,
-                    photo=onboarding.photo,
-                    is_active=True,
-                )
-                
-                # Add parents and subjects
-                for parent in onboarding.parents.all():
-                    student.parents.add(parent)
-                for subject in onboarding.subjects.all():
-                    student.subjects.add(subject)
-                
-                # Move records from onboarding request to student
-                for record in onboarding.records.all():
-                    record.student = student
-                    record.onboarding_request = None
-                    record.save()
-                
-                # Update onboarding request
-                onboarding.status = 'completed'
-                onboarding.approved_by = request.user
-                onboarding.approved_at = timezone.now()
-                onboarding.created_student = student
-                onboarding.save()
+                with transaction.atomic():
+                    # Create the student record
+                    student = Student.objects.create(
+                        school=onboarding.school,
+                        first_name=onboarding.first_name,
+                        last_name=onboarding.last_name,
+                        email=onboarding.email,
+                        phone_number=onboarding.phone_number,
+                        date_of_birth=onboarding.date_of_birth,
+                        grade=onboarding.grade,
+                        address=onboarding.address,
+                        bus=onboarding.bus,
+                        photo=onboarding.photo,
+                        is_active=True,
+                    )
+
+                    # Add parents and subjects
+                    for parent in onboarding.parents.all():
+                        student.parents.add(parent)
+                    for subject in onboarding.subjects.all():
+                        student.subjects.add(subject)
+
+                    # Move records from onboarding request to student (one UPDATE)
+                    move_onboarding_records(onboarding.id, student.id)
+
+                    # Update onboarding request
+                    onboarding.status = 'completed'
+                    onboarding.approved_by = request.user
+                    onboarding.approved_at = timezone.now()
+                    onboarding.created_student = student
+                    onboarding.save()
                 
                 messages.success(request, f'Student {onboarding.first_name} {onboarding.last_name} has been approved and created!')
             
@@ -480,7 +589,9 @@ def onboarding_pending_approvals(request):
     if not can_approve_onboarding(request.user):
         raise PermissionDenied("You do not have permission to approve onboarding requests.")
     
-    pending = StudentOnboardingRequest.objects.filter(status='pending', school=request.school)
+    pending = StudentOnboardingRequest.objects.filter(status='pending', school=request.school).select_related(
+        'requested_by', 'grade__school'
+    )
     
     context = {
         'pending_requests': pending,
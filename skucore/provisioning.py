@@ -0,0 +1,102 @@
+"""
+Set-based provisioning of UserSchool memberships.
+
+Every user gets a membership in every active school. The missing
+(user, school) pairs are found with one anti-join over users x active
+schools and written with bulk_create(ignore_conflicts=True) in batches,
+so the cost no longer grows with one round-trip per pair. bulk_create and
+update() send no signals, so the affected users' tenant and token cache
+entries are dropped here.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from . import tenant_cache
+from .authentication import invalidate_users_tokens
+from .models import School, UserSchool
+
+
+BATCH_SIZE = 1000
+
+
+def _missing_pairs(user_ids=None):
+    """Yield (user_id, school_id) for active schools the users have no membership in"""
+    user_table = connection.ops.quote_name(User._meta.db_table)
+    school_table = connection.ops.quote_name(School._meta.db_table)
+    membership_table = connection.ops.quote_name(UserSchool._meta.db_table)
+    sql = f"""
+        SELECT u.id, s.id
+        FROM {user_table} u CROSS JOIN {school_table} s
+        WHERE s.is_active = %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {membership_table} us
+              WHERE us.user_id = u.id AND us.school_id = s.id
+          )
+    """
+    params = [True]
+    if user_ids is not None:
+        if not user_ids:
+            return
+        sql += f" AND u.id IN ({', '.join(['%s'] * len(user_ids))})"
+        params += list(user_ids)
+    sql += " ORDER BY u.id, s.name"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+
+def provision_user_schools(user_ids=None, set_primary=False, reactivate=False):
+    """
+    Give users (all, or `user_ids`) a membership in every active school.
+
+    set_primary: users left without a primary membership get their first
+    active school (by name) as primary.
+    reactivate: inactive memberships in active schools are switched back on.
+
+    Returns {'created': n, 'reactivated': n, 'primary': n}.
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+    created = reactivated = primary = 0
+    touched = set()
+
+    with transaction.atomic():
+        batch = []
+        for user_id, school_id in _missing_pairs(user_ids):
+            batch.append(UserSchool(user_id=user_id, school_id=school_id, is_active=True))
+            touched.add(user_id)
+            if len(batch) >= BATCH_SIZE:
+                created += len(UserSchool.objects.bulk_create(batch, ignore_conflicts=True))
+                batch = []
+        created += len(UserSchool.objects.bulk_create(batch, ignore_conflicts=True))
+
+        memberships = UserSchool.objects.filter(school__is_active=True)
+        if user_ids is not None:
+            memberships = memberships.filter(user_id__in=user_ids)
+
+        if reactivate:
+            inactive = memberships.filter(is_active=False)
+            touched.update(inactive.values_list('user_id', flat=True))
+            reactivated = inactive.update(is_active=True)
+
+        if set_primary:
+            has_primary = UserSchool.objects.filter(user_id=OuterRef('user_id'), is_primary=True)
+            first_school = (
+                UserSchool.objects.filter(user_id=OuterRef('user_id'), school__is_active=True)
+                .order_by('school__name').values('id')[:1]
+            )
+            candidates = memberships.filter(~Exists(has_primary)).filter(id=first_school)
+            ids = list(candidates.values_list('id', 'user_id'))
+            primary = UserSchool.objects.filter(id__in=[membership_id for membership_id, _ in ids]).update(is_primary=True)
+            touched.update(user_id for _, user_id in ids)
+
+    if touched:
+        tenant_cache.invalidate_users(touched)
+        invalidate_users_tokens(touched)
+    return {'created': created, 'reactivated': reactivated, 'primary': primary}
@@ -0,0 +1,90 @@
+"""
+Per-school counters for the dashboard and the role portals.
+
+All counters are computed in one SELECT over School with a correlated
+COUNT subquery per table (conditional aggregates for the filtered counts),
+then cached in the Django cache under a per-school generation number.
+The signal handlers in skucore.signals bump the generation whenever a
+counted row is written, so a warm dashboard costs no queries. The bump
+runs after commit, and reaches every worker when the cache is shared
+(REDIS_URL).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import (
+    School, Student, Parent, Grade, Subject, Bus, StudentOnboardingRequest, UserRole
+)
+
+
+STAT_NAMES = [
+    'total_students', 'active_students', 'total_parents', 'total_grades',
+    'total_subjects', 'total_buses', 'pending_onboarding', 'total_users',
+]
+
+
+def _generation_key(school_id):
+    return f'skucore:school-stats-generation:{school_id}'
+
+
+def _stats_key(school_id):
+    generation = cache.get(_generation_key(school_id), 0)
+    return f'skucore:school-stats:{school_id}:{generation}'
+
+
+def bump_stats_generation(school_id):
+    """Invalidate the cached counters of a school once the current transaction commits"""
+    if school_id:
+        # Bumping earlier would let another worker cache counts that miss the write
+        transaction.on_commit(lambda: _bump(school_id))
+
+
+def _bump(school_id):
+    key = _generation_key(school_id)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def _count(model, condition=None):
+    """Correlated COUNT of `model` rows of the outer school, optionally conditional"""
+    rows = (
+        model.objects.filter(school=OuterRef('pk'))
+        .order_by().values('school')
+        .annotate(n=Count('id', filter=condition))
+        .values('n')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def compute_school_stats(school_id):
+    """All counters of one school in a single query"""
+    row = School.objects.filter(id=school_id).annotate(
+        total_students=_count(Student),
+        active_students=_count(Student, Q(is_active=True)),
+        total_parents=_count(Parent),
+        total_grades=_count(Grade),
+        total_subjects=_count(Subject),
+        total_buses=_count(Bus),
+        pending_onboarding=_count(StudentOnboardingRequest, Q(status='pending')),
+        total_users=_count(UserRole),
+    ).values(*STAT_NAMES).first()
+    return row or dict.fromkeys(STAT_NAMES, 0)
+
+
+def get_school_stats(school):
+    """Cached counters for a school (all zero when there is no school)"""
+    if school is None:
+        return dict.fromkeys(STAT_NAMES, 0)
+    key = _stats_key(school.id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_school_stats(school.id)
+        cache.set(key, stats, getattr(settings, 'SCHOOL_STATS_CACHE_TTL', 300))
+    return stats
@@ -0,0 +1,194 @@
+"""
+Search over students, parents and onboarding requests.
+
+Every searchable row has one SearchDocument holding a normalized copy of
+its names, email and phone number. The signal handlers in skucore.signals
+keep the documents in sync. Matching is delegated to the database:
+
+- SQLite: an FTS5 table (created by migration 0016) ranked with bm25()
+- PostgreSQL: tsvector prefix matching ranked with ts_rank, plus the
+  pg_trgm % operator for misspelled names (both served by the GIN indexes
+  of migration 0016; similarity() only ranks)
+- anything else: icontains per term over the normalized content
+
+Every query term is a prefix, so "jo sm" finds "John Smith".
+"""
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchDocument, Student, Parent, StudentOnboardingRequest
+
+
+KINDS = {
+    'student': Student,
+    'parent': Parent,
+    'onboarding': StudentOnboardingRequest,
+}
+FTS_TABLE = 'skucore_search_fts'
+MAX_TERMS = 8
+
+
+def kind_for(instance):
+    for kind, model in KINDS.items():
+        if isinstance(instance, model):
+            return kind
+    return None
+
+
+# ============ NORMALIZATION ============
+
+def normalize(text):
+    """Lowercase, strip accents and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+def terms(query):
+    """Word terms of a search query, normalized like the documents"""
+    return re.findall(r'\w+', normalize(query))[:MAX_TERMS]
+
+
+def build_document(kind, instance):
+    """Unsaved SearchDocument for a Student, Parent or StudentOnboardingRequest"""
+    name = f"{instance.first_name} {instance.last_name}".strip()
+    phone = instance.phone_number or ''
+    digits = re.sub(r'\D', '', phone)
+    if kind == 'student':
+        subtitle = instance.email
+    elif kind == 'parent':
+        subtitle = f"{instance.get_parent_type_display()} · {instance.email}"
+    else:
+        subtitle = f"Onboarding ({instance.get_status_display()}) · {instance.email}"
+    return SearchDocument(
+        school_id=instance.school_id,
+        kind=kind,
+        object_id=instance.pk,
+        title=name[:255],
+        subtitle=subtitle[:255],
+        content=normalize(' '.join(filter(None, [name, instance.email, phone, digits]))),
+    )
+
+
+# ============ MAINTENANCE ============
+
+def index_instance(instance):
+    kind = kind_for(instance)
+    if kind is None:
+        return
+    document = build_document(kind, instance)
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk,
+        defaults={field: getattr(document, field) for field in ('school_id', 'title', 'subtitle', 'content')},
+    )
+
+
+def remove_instance(instance):
+    kind = kind_for(instance)
+    if kind is not None:
+        SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild_search_index(school_id=None):
+    """Recreate every SearchDocument (of one school, or all). Returns the count."""
+    documents = SearchDocument.objects.all()
+    if school_id:
+        documents = documents.filter(school_id=school_id)
+    documents.delete()
+
+    created = 0
+    for kind, model in KINDS.items():
+        rows = model.objects.all()
+        if school_id:
+            rows = rows.filter(school_id=school_id)
+        batch = []
+        for instance in rows.iterator(chunk_size=2000):
+            batch.append(build_document(kind, instance))
+            if len(batch) >= 1000:
+                SearchDocument.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+# ============ QUERIES ============
+
+def search(school, query, kinds=None, limit=20):
+    """
+    Ranked matches for `query` within one school.
+    Returns a list of {'type', 'id', 'title', 'subtitle', 'score'}.
+    """
+    words = terms(query)
+    if not words or school is None:
+        return []
+    documents = SearchDocument.objects.filter(school=school)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+
+    if connection.vendor == 'sqlite':
+        ranked = _search_sqlite(documents, words, limit)
+    elif connection.vendor == 'postgresql':
+        ranked = _search_postgres(documents, words, limit)
+    else:
+        ranked = _search_fallback(documents, words, limit)
+
+    return [
+        {
+            'type': document.kind,
+            'id': document.object_id,
+            'title': document.title,
+            'subtitle': document.subtitle,
+            'score': round(score, 6),
+        }
+        for document, score in ranked
+    ]
+
+
+def _search_sqlite(documents, words, limit):
+    # bm25() is lower for better matches; negate it so higher is better
+    match = ' '.join(f'"{word}"*' for word in words)
+    documents = documents.extra(
+        select={'score': f'-bm25({FTS_TABLE})'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = skucore_searchdocument.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        order_by=['-score'],
+    )
+    return [(document, document.score) for document in documents[:limit]]
+
+
+def _search_postgres(documents, words, limit):
+    from django.contrib.postgres.lookups import TrigramSimilar
+    from django.contrib.postgres.search import (
+        SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+    )
+    from django.db.models import F, Value
+    from django.db.models.functions import Greatest
+
+    vector = SearchVector('content', config='simple')
+    prefix_query = SearchQuery(' & '.join(f'{word}:*' for word in words), config='simple', search_type='raw')
+    text = ' '.join(words)
+    documents = documents.annotate(
+        document=vector,
+        rank=SearchRank(vector, prefix_query),
+        similarity=TrigramSimilarity('content', text),
+    ).filter(
+        # content % text (pg_trgm.similarity_threshold, 0.3 by default) can use
+        # skucore_search_trgm_idx; a similarity() > x comparison cannot
+        Q(document=prefix_query) | Q(TrigramSimilar(F('content'), Value(text)))
+    ).annotate(
+        score=Greatest('rank', 'similarity')
+    ).order_by('-score')
+    return [(document, document.score) for document in documents[:limit]]
+
+
+def _search_fallback(documents, words, limit):
+    for word in words:
+        documents = documents.filter(content__icontains=word)
+    return [(document, 1.0) for document in documents.order_by('title')[:limit]]
@@ -0,0 +1,330 @@
+"""
+Synthetic tenant data for load and scale testing.
+
+seed_school() creates one school with everything the app shows - grades,
+subjects, routes and buses, families (addresses, parents, students with
+subjects and a bus), staff accounts, years of daily attendance,
+onboarding requests and Record stubs - with bulk_create in large batches
+(attendance, the one table that reaches millions of rows, with a plain
+executemany).
+Every value comes from a random.Random seeded with (seed, school number),
+so the same seed and end date always produce the same rows, and a school
+can be added later without changing the others.
+
+bulk_create sends no signals, so the derived tables are rebuilt once per
+school at the end (attendance roll-ups and bitmaps, search documents,
+blob reference counts) and the cached counters are invalidated.
+"""
+
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .attendance import rebuild_daily_summaries
+from .attendance_index import rebuild_index
+from .models import (
+    Address, Attendance, Bus, Grade, Parent, Record, RecordBlob, Route, School, Student,
+    StudentOnboardingRequest, Subject, Subscription, UserRole, UserSchool,
+)
+from .provisioning import provision_user_schools
+from .school_stats import bump_stats_generation
+from .search import rebuild_search_index
+from .storage import add_reference, blob_sha256, record_storage
+
+
+CODE_PREFIX = 'SCALE'
+BATCH_SIZE = 5000
+
+FIRST_NAMES = [
+    'Aarav', 'Abigail', 'Aiden', 'Amelia', 'Ananya', 'Benjamin', 'Charlotte', 'Chloe',
+    'Daniel', 'Elijah', 'Emily', 'Emma', 'Ethan', 'Fatima', 'Gabriel', 'Grace',
+    'Hannah', 'Harper', 'Isaac', 'Isabella', 'Jack', 'James', 'Jin', 'Leo',
+    'Liam', 'Lucas', 'Maya', 'Mia', 'Mohammed', 'Noah', 'Olivia', 'Oliver',
+    'Priya', 'Rohan', 'Sofia', 'Sophie', 'Theo', 'William', 'Yusuf', 'Zoe',
+]
+LAST_NAMES = [
+    'Anderson', 'Brown', 'Campbell', 'Chen', 'Clark', 'Das', 'Davis', 'Dubois',
+    'Garcia', 'Gill', 'Green', 'Hall', 'Johnson', 'Khan', 'Kim', 'Lee',
+    'Martin', 'Miller', 'Moore', 'Nguyen', 'Patel', 'Roy', 'Scott', 'Sharma',
+    'Singh', 'Smith', 'Taylor', 'Thomas', 'Tremblay', 'Walker', 'White', 'Wilson',
+]
+CITIES = [
+    ('Toronto', 'Ontario'), ('Ottawa', 'Ontario'), ('Montreal', 'Quebec'),
+    ('Vancouver', 'British Columbia'), ('Calgary', 'Alberta'), ('Winnipeg', 'Manitoba'),
+    ('Halifax', 'Nova Scotia'), ('Regina', 'Saskatchewan'),
+]
+STREETS = ['Maple', 'Oak', 'Pine', 'Cedar', 'Elm', 'Birch', 'Main', 'King', 'Queen', 'Church']
+SUBJECTS = [
+    'Mathematics', 'English', 'French', 'Science', 'History', 'Geography',
+    'Art', 'Music', 'Physical Education', 'Computer Science',
+]
+STAFF_ROLES = ['admin', 'principal', 'vice_principal', 'operator', 'readonly']
+# Cumulative status weights; a per-student absence factor scales the non-present share
+STATUS_WEIGHTS = [('absent', 0.05), ('late', 0.025), ('excused', 0.01)]
+ATTENDANCE_COLUMNS = ['school', 'student', 'date', 'status', 'remarks', 'recorded_by', 'created_at']
+STUB_RECORD_TYPES = ['birth_certificate', 'vaccination', 'medical_report', 'previous_school', 'identity_proof']
+
+
+def school_days(end_date, years):
+    """Weekdays of the last `years` years, without July, August and the winter break"""
+    day = end_date - timedelta(days=365 * years)
+    days = []
+    while day <= end_date:
+        winter_break = (day.month == 12 and day.day >= 23) or (day.month == 1 and day.day <= 2)
+        if day.weekday() < 5 and day.month not in (7, 8) and not winter_break:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _bulk(model, objects):
+    """bulk_create in BATCH_SIZE batches; primary keys are set on the objects"""
+    for start in range(0, len(objects), BATCH_SIZE):
+        model.objects.bulk_create(objects[start:start + BATCH_SIZE])
+    return objects
+
+
+def _attendance_writer():
+    """
+    executemany() for Attendance rows given as value tuples. Building a
+    model instance per row costs more than the insert itself, and this is
+    the table that reaches millions of rows.
+    """
+    quote = connection.ops.quote_name
+    fields = [Attendance._meta.get_field(name) for name in ATTENDANCE_COLUMNS]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(Attendance._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+    def write(rows):
+        if rows:
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+    return write
+
+
+def _phone(rng):
+    return f'+1-{rng.randint(200, 989)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}'
+
+
+def _address(rng):
+    city, state = rng.choice(CITIES)
+    return Address(
+        street_address=f'{rng.randint(1, 9999)} {rng.choice(STREETS)} Street',
+        city=city, state=state,
+        postal_code=f'{rng.choice("ABCEGHJKLMNPRSTVXY")}{rng.randint(0, 9)}{rng.choice("ABCEGHJKLMNPRSTVWXYZ")} '
+                    f'{rng.randint(0, 9)}{rng.choice("ABCEGHJKLMNPRSTVWXYZ")}{rng.randint(0, 9)}',
+    )
+
+
+def _stub_files():
+    """Storage names of one small stub file per record type (stored once, shared by every stub)"""
+    storage = record_storage()
+    return {
+        record_type: storage.save(
+            f'{record_type}.pdf',
+            ContentFile(b'%PDF-1.4\n% skulz seed_scale stub: ' + record_type.encode() + b'\n%%EOF\n'),
+        )
+        for record_type in STUB_RECORD_TYPES
+    }
+
+
+def seed_school(number, students, years=2, seed=0, end_date=None, password_hash=None, log=None):
+    """
+    Create school `number` (SCALE001, ...) with about `students` students
+    and `years` years of attendance ending at `end_date` (today). Returns a
+    dict of row counts, or None if the school already exists.
+    """
+    log = log or (lambda message: None)
+    end_date = end_date or date.today()
+    code = f'{CODE_PREFIX}{number:03d}'
+    if School.objects.filter(code=code).exists():
+        return None
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise RuntimeError('seed_scale needs a database that returns ids from bulk inserts')
+
+    rng = random.Random(f'{seed}:{number}')
+    domain = f'{code.lower()}.example.com'
+    password_hash = password_hash or make_password(None)
+    counts = {}
+
+    with transaction.atomic():
+        city, state = rng.choice(CITIES)
+        school = School.objects.create(
+            name=f'Scale School {number:03d}', code=code, email=f'office@{domain}',
+            phone_number=_phone(rng), street_address=f'{rng.randint(1, 999)} School Road',
+            city=city, state=state, postal_code='A1A 1A1', principal_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        )
+        Subscription.objects.create(school=school, plan='enterprise', status='active', max_students=0, max_users=1000)
+
+        grades = _bulk(Grade, [Grade(school=school, grade_name='Kindergarten')] + [
+            Grade(school=school, grade_name=f'Grade {n}') for n in range(1, 13)
+        ])
+        subjects = _bulk(Subject, [Subject(school=school, subject_name=name) for name in SUBJECTS])
+        route_count = max(1, students // 250)
+        routes = _bulk(Route, [
+            Route(
+                school=school, route_name=f'Route {n + 1}', start_location=f'{rng.choice(STREETS)} Depot',
+                end_location=school.name, stops=', '.join(rng.sample(STREETS, 4)),
+            )
+            for n in range(route_count)
+        ])
+        buses = _bulk(Bus, [
+            Bus(
+                school=school, bus_number=f'{code}-B{n + 1:03d}', capacity=rng.choice([48, 60, 72]),
+                route=routes[n % route_count], driver_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                driver_phone=_phone(rng),
+            )
+            for n in range(route_count * 2)
+        ])
+        counts.update(grades=len(grades), subjects=len(subjects), routes=len(routes), buses=len(buses))
+
+        # Staff: a few office accounts plus a teacher per grade
+        staff_roles = STAFF_ROLES + ['teacher'] * len(grades)
+        staff = _bulk(User, [
+            User(
+                username=f'{code.lower()}.{role}.{n}', email=f'{role}.{n}@{domain}', password=password_hash,
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+            )
+            for n, role in enumerate(staff_roles)
+        ])
+        _bulk(UserRole, [
+            UserRole(user=user, school=school, role=role, department='Teaching' if role == 'teacher' else 'Office')
+            for user, role in zip(staff, staff_roles)
+        ])
+        _bulk(UserSchool, [UserSchool(user=user, school=school, is_primary=True) for user in staff])
+        counts['staff'] = len(staff)
+
+        # Families share a last name and an address; some have two or three children
+        addresses, parents, family_of = [], [], []
+        student_rows = []
+        while len(student_rows) < students:
+            family = len(addresses)
+            last_name = rng.choice(LAST_NAMES)
+            addresses.append(_address(rng))
+            for parent_type in rng.choice([['mother', 'father'], ['mother'], ['father'], ['guardian'], ['mother', 'father']]):
+                parents.append((family, Parent(
+                    school=school, first_name=rng.choice(FIRST_NAMES), last_name=last_name,
+                    parent_type=parent_type, email=f'{parent_type}.{family}@families.{domain}',
+                    phone_number=_phone(rng),
+                )))
+            for _ in range(rng.choice([1, 1, 1, 2, 2, 3])):
+                if len(student_rows) >= students:
+                    break
+                grade_number = rng.randrange(len(grades))
+                birth_year = end_date.year - 5 - grade_number
+                student_rows.append(Student(
+                    school=school, first_name=rng.choice(FIRST_NAMES), last_name=last_name,
+                    email=f'student.{len(student_rows)}@{domain}', phone_number=None,
+                    date_of_birth=date(birth_year, rng.randint(1, 12), rng.randint(1, 28)),
+                    grade=grades[grade_number], bus=rng.choice(buses) if rng.random() < 0.6 else None,
+                    is_active=rng.random() < 0.97,
+                ))
+                family_of.append(family)
+
+        _bulk(Address, addresses)
+        for family, parent in parents:
+            parent.address = addresses[family]
+        _bulk(Parent, [parent for _, parent in parents])
+        for student, family in zip(student_rows, family_of):
+            student.address = addresses[family]
+        _bulk(Student, student_rows)
+
+        parents_of = {}
+        for family, parent in parents:
+            parents_of.setdefault(family, []).append(parent.id)
+        _bulk(Student.parents.through, [
+            Student.parents.through(student_id=student.id, parent_id=parent_id)
+            for student, family in zip(student_rows, family_of) for parent_id in parents_of[family]
+        ])
+        _bulk(Student.subjects.through, [
+            Student.subjects.through(student_id=student.id, subject_id=subject.id)
+            for student in student_rows for subject in rng.sample(subjects, 6)
+        ])
+        counts.update(addresses=len(addresses), parents=len(parents), students=len(student_rows))
+        log(f'  {code}: {len(student_rows)} students, {len(parents)} parents')
+
+        # Attendance, written as it is generated to keep memory flat
+        days = school_days(end_date, years)
+        db_days = [connection.ops.adapt_datefield_value(day) for day in days]
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        recorded_by = [user.username for user, role in zip(staff, staff_roles) if role == 'teacher']
+        write = _attendance_writer()
+        attendance = []
+        attendance_count = 0
+        for student in student_rows:
+            factor = rng.choice([0.5, 1, 1, 1, 1.5, 3])  # A few students are chronically absent
+            thresholds = []
+            total = 0
+            for status, weight in STATUS_WEIGHTS:
+                total += weight * factor
+                thresholds.append((total, status))
+            teacher = recorded_by[student.grade_id % len(recorded_by)]
+            for day in db_days:
+                roll = rng.random()
+                status = 'present'
+                for limit, marked in thresholds:
+                    if roll < limit:
+                        status = marked
+                        break
+                attendance.append((school.id, student.id, day, status, None, teacher, created_at))
+            if len(attendance) >= BATCH_SIZE:
+                write(attendance)
+                attendance_count += len(attendance)
+                attendance = []
+        write(attendance)
+        attendance_count += len(attendance)
+        counts['attendance'] = attendance_count
+        log(f'  {code}: {attendance_count} attendance rows over {len(days)} school days')
+
+        # Onboarding requests and Record stubs sharing one stored file per type
+        stubs = _stub_files()
+        requesters = [user for user, role in zip(staff, staff_roles) if role in ('operator', 'teacher')]
+        onboarding = _bulk(StudentOnboardingRequest, [
+            StudentOnboardingRequest(
+                school=school, requested_by=rng.choice(requesters),
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                email=f'applicant.{n}@{domain}', date_of_birth=date(end_date.year - rng.randint(5, 17), rng.randint(1, 12), rng.randint(1, 28)),
+                grade=rng.choice(grades), status=rng.choice(['pending', 'pending', 'approved', 'rejected']),
+            )
+            for n in range(max(1, students // 20))
+        ])
+        stub_sizes = {record_type: record_storage().size(name) for record_type, name in stubs.items()}
+        records = [
+            Record(
+                school=school, student=student, record_type=record_type, file=stubs[record_type],
+                description='Seeded stub', size=stub_sizes[record_type], sha256=blob_sha256(stubs[record_type]),
+                uploaded_by=rng.choice(requesters),
+            )
+            for student in student_rows if rng.random() < 0.5
+            for record_type in rng.sample(STUB_RECORD_TYPES, rng.randint(1, 3))
+        ] + [
+            Record(
+                school=school, onboarding_request=request, record_type='birth_certificate',
+                file=stubs['birth_certificate'], size=stub_sizes['birth_certificate'],
+                sha256=blob_sha256(stubs['birth_certificate']), uploaded_by=request.requested_by,
+            )
+            for request in onboarding
+        ]
+        _bulk(Record, records)
+        for name, references in Counter(record.file.name for record in records).items():
+            add_reference(name)
+            RecordBlob.objects.filter(name=name).update(ref_count=F('ref_count') + references - 1)
+        counts.update(onboarding_requests=len(onboarding), records=len(records))
+
+    # Memberships in the other schools, as the User signal would have created
+    provision_user_schools([user.id for user in staff], set_primary=True)
+    rebuild_daily_summaries(school.id)
+    rebuild_index(school.id)
+    rebuild_search_index(school.id)
+    bump_stats_generation(school.id)
+    return counts
@@ -3,38 +3,89 @@ from django.contrib.auth.models import User
 from .models import (
     Address, Grade, Subject, Route, Bus, Parent,
     Student, Attendance, Record, StudentOnboardingRequest,
-    School, UserRole
+    School, UserRole, UploadSession
 )
+from .media import signed_url
+from .photos import FORMATS, rendition_url
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for model serializers.
+
+    Pass fields=[...] to keep only those fields and/or expand=[...] to add
+    heavy nested fields listed in Meta.expandable_fields. With expand alone
+    the representation is the lean one: every non-expandable field plus the
+    requested expansions. With neither, the full representation is kept.
+
+    Meta.select_related_fields / Meta.prefetch_related_fields map field names
+    to the lookups needed to render them, so querysets only join and
+    prefetch what will actually be serialized (see setup_eager_loading).
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = self.resolve_field_names(fields, expand)
+        if keep is not None:
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+    @classmethod
+    def resolve_field_names(cls, fields=None, expand=None):
+        """Names of the fields to render, or None for all of them"""
+        if fields is None and expand is None:
+            return None
+        all_fields = set(cls.Meta.fields)
+        expandable = set(getattr(cls.Meta, 'expandable_fields', ()))
+        names = set(fields) if fields is not None else all_fields - expandable
+        if expand:
+            names |= set(expand) & expandable
+        return names & all_fields
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, field_names=None):
+        """Apply the select/prefetch lookups needed to render field_names"""
+        if field_names is None:
+            field_names = cls.Meta.fields
+        select = {lookup for name, lookup in getattr(cls.Meta, 'select_related_fields', {}).items()
+                  if name in field_names}
+        prefetch = {lookup for name, lookup in getattr(cls.Meta, 'prefetch_related_fields', {}).items()
+                    if name in field_names}
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return queryset
+
+
+class AddressSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Address
         fields = ['id', 'street_address', 'city', 'state', 'postal_code', 'country']
 
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Grade
         fields = ['id', 'grade_name', 'description', 'school', 'created_at']
         read_only_fields = ['id', 'created_at', 'school']
 
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Subject
         fields = ['id', 'subject_name', 'description', 'school', 'created_at']
         read_only_fields = ['id', 'created_at', 'school']
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ['id', 'route_name', 'start_location', 'end_location', 'stops', 'school', 'created_at']
         read_only_fields = ['id', 'created_at', 'school']
 
 
-class BusSerializer(serializers.ModelSerializer):
+class BusSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     route_detail = RouteSerializer(source='route', read_only=True)
     route = serializers.PrimaryKeyRelatedField(queryset=Route.objects.all())
 
@@ -45,9 +96,11 @@ class BusSerializer(serializers.ModelSerializer):
             'route', 'route_detail', 'school', 'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'school']
+        expandable_fields = ['route_detail']
+        select_related_fields = {'route_detail': 'route'}
 
 
-class ParentSerializer(serializers.ModelSerializer):
+class ParentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     address_detail = AddressSerializer(source='address', read_only=True)
     address = serializers.PrimaryKeyRelatedField(
         queryset=Address.objects.all(), required=False, allow_null=True
@@ -61,26 +114,75 @@ class ParentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'school']
+        expandable_fields = ['address_detail']
+        select_related_fields = {'address_detail': 'address'}
+
 
+class SignedFileField(serializers.FileField):
+    """FileField that links to a signed, short-lived media URL (see skucore.media)"""
 
-class RecordSerializer(serializers.ModelSerializer):
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = signed_url(value.instance, value.name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class SignedImageField(SignedFileField, serializers.ImageField):
+    pass
+
+
+class RecordSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
+    file = SignedFileField()
 
     class Meta:
         model = Record
         fields = [
-            'id', 'record_type', 'file', 'description',
+            'id', 'record_type', 'file', 'description', 'size', 'sha256',
             'uploaded_by', 'uploaded_by_username', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at', 'uploaded_by']
+        read_only_fields = ['id', 'size', 'sha256', 'created_at', 'uploaded_by']
+        select_related_fields = {'uploaded_by_username': 'uploaded_by'}
+
+
+class PhotoRenditionsField(serializers.Field):
+    """
+    Read-only URLs of the generated photo renditions:
+    {"thumbnail": {"webp": url, "jpeg": url, "width": 160, "height": 160}, ...}
+    Empty until processing has finished for the current photo.
+    """
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        renditions = instance.photo_renditions or {}
+        if not instance.photo or renditions.get('source') != instance.photo.name:
+            return {}
+        request = self.context.get('request')
+        data = {}
+        for name, entry in renditions.items():
+            if not isinstance(entry, dict):
+                continue
+            data[name] = {'width': entry['width'], 'height': entry['height']}
+            for fmt in FORMATS:
+                url = rendition_url(instance, name, fmt)
+                data[name][fmt] = request.build_absolute_uri(url) if request else url
+        return data
 
 
-class StudentSerializer(serializers.ModelSerializer):
+
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     grade_detail = GradeSerializer(source='grade', read_only=True)
     bus_detail = BusSerializer(source='bus', read_only=True)
     parents_detail = ParentSerializer(source='parents', many=True, read_only=True)
     subjects_detail = SubjectSerializer(source='subjects', many=True, read_only=True)
     records = RecordSerializer(many=True, read_only=True)
+    photo = SignedImageField(required=False, allow_null=True)
+    photo_renditions = PhotoRenditionsField()
 
     grade = serializers.PrimaryKeyRelatedField(
         queryset=Grade.objects.all(), required=False, allow_null=True
@@ -99,17 +201,32 @@ class StudentSerializer(serializers.ModelSerializer):
         model = Student
         fields = [
             'id', 'first_name', 'last_name', 'email', 'phone_number',
-            'date_of_birth', 'enrollment_date', 'photo', 'is_active',
+            'date_of_birth', 'enrollment_date', 'photo', 'photo_width', 'photo_height',
+            'photo_renditions', 'is_active',
             'grade', 'grade_detail',
             'bus', 'bus_detail',
             'parents', 'parents_detail',
             'subjects', 'subjects_detail',
             'records', 'school', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'enrollment_date', 'created_at', 'updated_at', 'school']
+        read_only_fields = [
+            'id', 'enrollment_date', 'photo_width', 'photo_height', 'created_at', 'updated_at', 'school'
+        ]
+        expandable_fields = ['grade_detail', 'bus_detail', 'parents_detail', 'subjects_detail', 'records']
+        select_related_fields = {
+            'grade_detail': 'grade',
+            'bus_detail': 'bus__route',
+        }
+        prefetch_related_fields = {
+            'parents': 'parents',
+            'parents_detail': 'parents__address',
+            'subjects': 'subjects',
+            'subjects_detail': 'subjects',
+            'records': 'records__uploaded_by',
+        }
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
     student = serializers.PrimaryKeyRelatedField(queryset=Student.objects.all())
 
@@ -123,9 +240,22 @@ class AttendanceSerializer(serializers.ModelSerializer):
             'remarks', 'recorded_by', 'school', 'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'school']
+        select_related_fields = {'student_name': 'student'}
+
 
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    """
+    One row of a bulk attendance submission. The student is a plain id;
+    it is checked against the tenant for the whole batch in one query.
+    """
+    student = serializers.IntegerField()
+    date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Attendance.ATTENDANCE_CHOICES)
+    remarks = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    recorded_by = serializers.CharField(required=False, allow_blank=True, max_length=100)
 
-class StudentOnboardingSerializer(serializers.ModelSerializer):
+
+class StudentOnboardingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     requested_by_username = serializers.CharField(source='requested_by.username', read_only=True)
     approved_by_username = serializers.CharField(source='approved_by.username', read_only=True, allow_null=True)
     # grade is mandatory - explicitly declared to enforce required=True
@@ -134,24 +264,65 @@ class StudentOnboardingSerializer(serializers.ModelSerializer):
         required=True,
         allow_null=False
     )
+    photo = SignedImageField(required=False, allow_null=True)
+    photo_renditions = PhotoRenditionsField()
 
     class Meta:
         model = StudentOnboardingRequest
         fields = [
             'id', 'first_name', 'last_name', 'email', 'phone_number',
-            'date_of_birth', 'photo', 'grade', 'bus', 'status',
+            'date_of_birth', 'photo', 'photo_width', 'photo_height', 'photo_renditions',
+            'grade', 'bus', 'status',
             'requested_by', 'requested_by_username',
             'approved_by', 'approved_by_username',
             'rejection_reason', 'school', 'created_at', 'approved_at'
         ]
         read_only_fields = [
-            'id', 'requested_by', 'approved_by', 'status',
+            'id', 'requested_by', 'approved_by', 'status', 'photo_width', 'photo_height',
             'created_at', 'approved_at', 'school'
         ]
+        select_related_fields = {
+            'requested_by_username': 'requested_by',
+            'approved_by_username': 'approved_by',
+        }
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_staff']
         read_only_fields = ['id']
+
+
+class UploadSessionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    student = serializers.PrimaryKeyRelatedField(
+        queryset=Student.objects.all(), required=False, allow_null=True
+    )
+    onboarding_request = serializers.PrimaryKeyRelatedField(
+        queryset=StudentOnboardingRequest.objects.all(), required=False, allow_null=True
+    )
+    total_size = serializers.IntegerField(min_value=0)
+    expected_sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+    record = RecordSerializer(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'student', 'onboarding_request', 'record_type', 'description',
+            'filename', 'total_size', 'received', 'expected_sha256', 'status',
+            'record', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'received', 'status', 'record', 'created_at', 'updated_at']
+        select_related_fields = {'record': 'record__uploaded_by'}
+
+    def validate_filename(self, value):
+        # Keep only the base name; the storage backend picks the folder
+        name = value.replace('\\', '/').rsplit('/', 1)[-1].strip()
+        if not name:
+            raise serializers.ValidationError('A file name is required.')
+        return name
+
+    def validate(self, attrs):
+        if bool(attrs.get('student')) == bool(attrs.get('onboarding_request')):
+            raise serializers.ValidationError('Give exactly one of student or onboarding_request.')
+        return attrs
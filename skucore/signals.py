@@ -1,7 +1,22 @@
-from django.db.models.signals import post_save
+from collections import Counter, defaultdict
+
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserSchool, School
+from rest_framework.authtoken.models import Token
+from .models import (
+    UserSchool, School, UserRole, Attendance, Student,
+    Parent, Grade, Subject, Bus, StudentOnboardingRequest, Record
+)
+from .attendance import apply_summary_deltas, attendance_deltas, fold_grade_summaries
+from .attendance_index import index_attendance
+from . import tenant_cache
+from .authentication import invalidate_user_tokens, invalidate_token
+from .permissions import bump_role_version
+from .school_stats import bump_stats_generation
+from . import jobs, photos, search, storage
+from .provisioning import provision_user_schools
 
 
 @receiver(post_save, sender=User)
@@ -11,17 +26,182 @@ def create_user_school_for_new_user(sender, instance, created, **kwargs):
     for all active schools and set the first one as primary
     """
     if created:
-        # Get all active schools
-        active_schools = School.objects.filter(is_active=True)
-        
-        if active_schools.exists():
-            # Create UserSchool for each active school
-            for school in active_schools:
-                # Check if UserSchool already exists
-                if not UserSchool.objects.filter(user=instance, school=school).exists():
-                    UserSchool.objects.create(
-                        user=instance,
-                        school=school,
-                        is_primary=(school == active_schools.first()),
-                        is_active=True
-                    )
+        provision_user_schools([instance.id], set_primary=True)
+
+
+@receiver([post_save, post_delete], sender=School)
+def invalidate_school_cache(sender, instance, **kwargs):
+    """Drop a changed or deleted school from the tenant cache"""
+    tenant_cache.invalidate_school(instance.id)
+
+
+@receiver([post_save, post_delete], sender=UserSchool)
+def invalidate_user_school_cache(sender, instance, **kwargs):
+    """Re-resolve the user's primary school after a membership change"""
+    tenant_cache.invalidate_user(instance.user_id)
+    invalidate_user_tokens(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=UserRole)
+def invalidate_role_snapshots(sender, instance, **kwargs):
+    """Cached API tokens and session snapshots carry the user's capabilities"""
+    invalidate_user_tokens(instance.user_id)
+    bump_role_version(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Parent)
+@receiver([post_save, post_delete], sender=Grade)
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Bus)
+@receiver([post_save, post_delete], sender=StudentOnboardingRequest)
+@receiver([post_save, post_delete], sender=UserRole)
+def invalidate_school_stats(sender, instance, **kwargs):
+    """Counted rows changed; drop the school's cached dashboard counters"""
+    bump_stats_generation(instance.school_id)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Parent)
+@receiver(post_save, sender=StudentOnboardingRequest)
+def update_search_document(sender, instance, **kwargs):
+    search.index_instance(instance)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Parent)
+@receiver(post_delete, sender=StudentOnboardingRequest)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=StudentOnboardingRequest)
+def process_uploaded_photo(sender, instance, **kwargs):
+    """New, replaced or cleared photo: (re)build renditions in the background"""
+    if photos.needs_processing(instance):
+        photos.schedule_processing(instance)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=StudentOnboardingRequest)
+def delete_photo_renditions(sender, instance, **kwargs):
+    if instance.photo_renditions:
+        jobs.enqueue(photos.delete_renditions, instance.photo_renditions)
+
+
+@receiver(pre_save, sender=Record)
+def remember_previous_record_file(sender, instance, **kwargs):
+    instance._previous_file = None
+    if instance.pk:
+        instance._previous_file = Record.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+
+
+@receiver(post_save, sender=Record)
+def count_record_file_reference(sender, instance, created, **kwargs):
+    """Move the blob reference to the new file and record its hash and size"""
+    name = instance.file.name
+    previous = getattr(instance, '_previous_file', None)
+    if not created and previous == name:
+        return
+    storage.add_reference(name)
+    if previous:
+        storage.remove_reference(previous)
+    sha256 = storage.blob_sha256(name)
+    if sha256 and instance.sha256 != sha256:
+        # The file is only committed to storage during save(), so fill these in afterwards
+        instance.sha256, instance.size = sha256, instance.file.size
+        Record.objects.filter(pk=instance.pk).update(sha256=instance.sha256, size=instance.size)
+
+
+@receiver(post_delete, sender=Record)
+def release_record_file_reference(sender, instance, **kwargs):
+    storage.remove_reference(instance.file.name)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Logging out deletes the token; drop its cached tenant too"""
+    invalidate_token(instance.key)
+
+
+def _deletion_origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _grade_of(student_id):
+    return Student.objects.filter(pk=student_id).values_list('grade_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_attendance(sender, instance, **kwargs):
+    """An update may move the row to another day, student or status; its old mark comes off the roll-ups"""
+    instance._previous = None
+    if instance.pk:
+        instance._previous = Attendance.objects.filter(pk=instance.pk).values_list(
+            'school_id', 'student_id', 'date', 'status', 'student__grade_id'
+        ).first()
+
+
+@receiver(post_save, sender=Attendance)
+def refresh_indexes_on_attendance_save(sender, instance, **kwargs):
+    deltas = defaultdict(Counter)
+    clears = []
+    previous = getattr(instance, '_previous', None)
+    grade_id = None
+    if previous:
+        school_id, student_id, date, status, grade_id = previous
+        deltas[(school_id, date, grade_id)][status] -= 1
+        clears.append((student_id, date))
+    if not previous or previous[1] != instance.student_id:
+        grade_id = _grade_of(instance.student_id)
+    deltas[(instance.school_id, instance.date, grade_id)][instance.status] += 1
+    apply_summary_deltas(deltas)
+    index_attendance(
+        marks=[(instance.school_id, instance.student_id, instance.date, instance.status)],
+        clears=clears,
+    )
+
+
+@receiver(post_delete, sender=Attendance)
+def refresh_indexes_on_attendance_delete(sender, instance, origin=None, **kwargs):
+    # Student deletions cascade here row by row; they are counted off in bulk below
+    # (and the student's bitmaps cascade away with it)
+    if _deletion_origin_model(origin) in (Student, School):
+        return
+    apply_summary_deltas({(instance.school_id, instance.date, _grade_of(instance.student_id)): {instance.status: -1}})
+    index_attendance(clears=[(instance.student_id, instance.date)])
+
+
+@receiver(pre_save, sender=Student)
+def remember_previous_grade(sender, instance, **kwargs):
+    instance._previous_grade = None
+    if instance.pk:
+        instance._previous_grade = Student.objects.filter(pk=instance.pk).values_list('grade_id', flat=True).first()
+
+
+@receiver(post_save, sender=Student)
+def move_summaries_on_grade_change(sender, instance, created, **kwargs):
+    """The student's marks are counted under their grade; move them along with it"""
+    previous = getattr(instance, '_previous_grade', None)
+    if created or previous == instance.grade_id:
+        return
+    attendance = instance.attendance_records.all()
+    deltas = attendance_deltas(attendance, previous, -1)
+    deltas.update(attendance_deltas(attendance, instance.grade_id, 1))
+    apply_summary_deltas(deltas)
+
+
+@receiver(pre_delete, sender=Student)
+def remember_student_attendance(sender, instance, **kwargs):
+    instance._attendance_deltas = attendance_deltas(instance.attendance_records.all(), instance.grade_id, -1)
+
+
+@receiver(post_delete, sender=Student)
+def refresh_summary_on_student_delete(sender, instance, **kwargs):
+    apply_summary_deltas(getattr(instance, '_attendance_deltas', {}))
+
+
+@receiver(pre_delete, sender=Grade)
+def fold_summaries_on_grade_delete(sender, instance, **kwargs):
+    fold_grade_summaries(instance.id)
@@ -0,0 +1,204 @@
+"""
+Bulk onboarding of staff accounts from CSV.
+
+    username,email,first_name,last_name,role,department,password
+
+The file is read as a stream, a batch of rows at a time. Each batch is
+validated (required columns, role, duplicate and existing usernames,
+email, password rules), its passwords are hashed in a thread pool - the
+PBKDF2 hasher releases the GIL, and hashing is by far the slowest part of
+creating a user - and the valid rows are written with one bulk_create per
+table: users, roles, and memberships of the importing school (primary)
+plus every other active school. bulk_create sends no post_save, so the
+per-user signal work is skipped.
+
+Invalid rows are skipped and reported with their line number; the rest of
+the file is imported. Everything runs in one transaction, so a database
+error leaves no partial import behind.
+
+The API queues imports as a job (queue_import), so a large file never
+holds a request worker; the result is kept on the job for the client to
+poll. The CSV holds plaintext passwords, so it is not put in the job's
+arguments: it waits in a private file under STAFF_IMPORT_DIR that the job
+deletes once it has run.
+"""
+
+import csv
+import io
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from . import jobs
+from .models import School, UserRole, UserSchool
+from .provisioning import provision_user_schools
+from .school_stats import bump_stats_generation
+
+
+COLUMNS = ['username', 'email', 'first_name', 'last_name', 'role', 'department', 'password']
+REQUIRED_COLUMNS = ['username', 'role']
+ROLES = {value for value, _ in UserRole.ROLE_CHOICES}
+BATCH_SIZE = 500
+
+
+class StaffImportError(ValueError):
+    """The file itself cannot be imported (as opposed to a bad row)"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def import_dir():
+    return _setting('STAFF_IMPORT_DIR', os.path.join(settings.BASE_DIR, 'staff_imports'))
+
+
+def read_csv(file):
+    """Rows of a CSV upload (bytes or text file object) as dicts, with the header checked"""
+    if isinstance(file.read(0), bytes):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(file)
+    header = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise StaffImportError(f'Missing column(s): {", ".join(missing)}')
+    reader.fieldnames = header
+    return reader
+
+
+def _clean(row):
+    return {name: (row.get(name) or '').strip() for name in COLUMNS}
+
+
+def _validate(batch, seen):
+    """Split (line, row) pairs into valid rows and errors"""
+    usernames = [row['username'] for _, row in batch if row['username']]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    valid, errors = [], []
+    for line, row in batch:
+        username = row['username']
+        try:
+            if not username:
+                raise ValidationError('username is required')
+            if len(username) > 150:
+                raise ValidationError('username is longer than 150 characters')
+            User.username_validator(username)
+            if username in existing:
+                raise ValidationError('username already exists')
+            if username in seen:
+                raise ValidationError(f'username repeats line {seen[username]}')
+            row['role'] = row['role'].lower()
+            if row['role'] not in ROLES:
+                raise ValidationError(f'role must be one of: {", ".join(sorted(ROLES))}')
+            if row['email']:
+                validate_email(row['email'])
+            if row['password']:
+                validate_password(row['password'], User(
+                    username=username, email=row['email'],
+                    first_name=row['first_name'], last_name=row['last_name'],
+                ))
+        except ValidationError as e:
+            errors.append({'line': line, 'username': username, 'errors': e.messages})
+            continue
+        seen[username] = line
+        valid.append(row)
+    return valid, errors
+
+
+def _hash(password):
+    # Blank passwords get an unusable one; the user sets theirs via password reset
+    return make_password(password or None)
+
+
+def _insert(rows, school, pool):
+    passwords = pool.map(_hash, [row['password'] for row in rows])
+    users = [
+        User(
+            username=row['username'], email=row['email'], first_name=row['first_name'],
+            last_name=row['last_name'], password=password, is_active=True,
+        )
+        for row, password in zip(rows, passwords)
+    ]
+    User.objects.bulk_create(users)
+    # Not every backend returns primary keys from bulk inserts
+    ids = dict(User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', 'id'))
+
+    UserRole.objects.bulk_create([
+        UserRole(user_id=ids[row['username']], school=school, role=row['role'], department=row['department'] or None)
+        for row in rows
+    ])
+    UserSchool.objects.bulk_create(
+        [UserSchool(user_id=user_id, school=school, is_primary=True, is_active=True) for user_id in ids.values()],
+        ignore_conflicts=True,
+    )
+    provision_user_schools(list(ids.values()))
+
+
+def import_staff(rows, school, dry_run=False, workers=None, batch_size=BATCH_SIZE):
+    """
+    Create staff accounts for `school` from `rows` (dicts, e.g. read_csv()).
+    With dry_run, rows are only validated and 'created' counts the rows
+    that would be. Returns
+    {'created': n, 'skipped': n, 'errors': [{'line', 'username', 'errors'}]}.
+    """
+    workers = workers or _setting('STAFF_IMPORT_WORKERS', os.cpu_count() or 4)
+    created = 0
+    errors = []
+    seen = {}
+
+    def flush(batch):
+        nonlocal created
+        valid, batch_errors = _validate(batch, seen)
+        errors.extend(batch_errors)
+        if valid and not dry_run:
+            _insert(valid, school, pool)
+        created += len(valid)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='staff-import') as pool, \
+            transaction.atomic():
+        batch = []
+        # Line 1 is the header
+        for line, row in enumerate(rows, start=2):
+            batch.append((line, _clean(row)))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        if created and not dry_run:
+            bump_stats_generation(school.id)
+
+    return {'created': created, 'skipped': len(errors), 'errors': errors}
+
+
+def queue_import(school, text):
+    """Save CSV text privately and queue its import into `school`. Returns the Job."""
+    directory = import_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = f'{uuid.uuid4().hex}.csv'
+    fd = os.open(os.path.join(directory, name), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as handle:
+        handle.write(text)
+    return jobs.enqueue(import_staff_csv, school.id, name)
+
+
+# One attempt: the file is gone after it, and the import is all-or-nothing anyway
+@jobs.task(max_attempts=1)
+def import_staff_csv(school_id, name):
+    """Job importing a file saved by queue_import(), then deleting it; its result is kept on the job"""
+    path = os.path.join(import_dir(), os.path.basename(name))
+    try:
+        school = School.objects.get(id=school_id)
+        with open(path, newline='', encoding='utf-8') as handle:
+            return import_staff(read_csv(handle), school)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,142 @@
+/*
+ * Autocomplete for <select data-autocomplete-url="...">.
+ *
+ * The server renders only the selected options. This script hides the
+ * select, shows a search box, and fetches matching options page by page
+ * ({"results": [{"id", "text"}], "more": bool}). Picking a result adds a
+ * selected <option>; multiple selects show removable chips.
+ * Other scripts can preselect a value with select.autocompleteAdd(id, text).
+ */
+(function () {
+    function setup(select) {
+        var url = select.dataset.autocompleteUrl;
+        var multiple = select.multiple;
+
+        var wrapper = document.createElement('div');
+        wrapper.className = 'autocomplete position-relative';
+        var chips = document.createElement('div');
+        chips.className = 'autocomplete-chips mb-1';
+        var input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control';
+        input.placeholder = 'Type to search...';
+        input.autocomplete = 'off';
+        var menu = document.createElement('div');
+        menu.className = 'list-group position-absolute w-100 shadow-sm';
+        menu.style.cssText = 'z-index: 1050; max-height: 240px; overflow-y: auto; display: none;';
+
+        select.parentNode.insertBefore(wrapper, select);
+        wrapper.appendChild(chips);
+        wrapper.appendChild(input);
+        wrapper.appendChild(menu);
+        wrapper.appendChild(select);
+        select.style.display = 'none';
+
+        function renderChips() {
+            chips.innerHTML = '';
+            Array.prototype.forEach.call(select.selectedOptions, function (option) {
+                if (!option.value) return;
+                if (!multiple) {
+                    input.value = option.text;
+                    return;
+                }
+                var chip = document.createElement('span');
+                chip.className = 'badge bg-secondary me-1 mb-1';
+                chip.textContent = option.text + ' ';
+                var remove = document.createElement('a');
+                remove.href = '#';
+                remove.className = 'text-light text-decoration-none';
+                remove.textContent = '×';
+                remove.addEventListener('click', function (e) {
+                    e.preventDefault();
+                    option.remove();
+                    renderChips();
+                });
+                chip.appendChild(remove);
+                chips.appendChild(chip);
+            });
+        }
+
+        function add(id, text) {
+            id = String(id);
+            if (!multiple) {
+                select.innerHTML = '';
+            }
+            var option = Array.prototype.find.call(select.options, function (o) { return o.value === id; });
+            if (!option) {
+                option = new Option(text, id, true, true);
+                select.appendChild(option);
+            }
+            option.selected = true;
+            select.dispatchEvent(new Event('change', { bubbles: true }));
+            renderChips();
+        }
+        select.autocompleteAdd = add;
+
+        var page = 1;
+        var requestId = 0;
+        function fetchPage(reset) {
+            if (reset) {
+                page = 1;
+                menu.innerHTML = '';
+            }
+            var current = ++requestId;
+            var target = new URL(url, window.location.href);
+            target.searchParams.set('q', input.value.trim());
+            target.searchParams.set('page', page);
+            fetch(target, { credentials: 'same-origin' })
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    if (current !== requestId) return;
+                    var more = menu.querySelector('.autocomplete-more');
+                    if (more) more.remove();
+                    data.results.forEach(function (item) {
+                        var entry = document.createElement('button');
+                        entry.type = 'button';
+                        entry.className = 'list-group-item list-group-item-action py-1';
+                        entry.textContent = item.text;
+                        entry.addEventListener('mousedown', function (e) {
+                            e.preventDefault();
+                            add(item.id, item.text);
+                            if (multiple) input.value = '';
+                            menu.style.display = 'none';
+                        });
+                        menu.appendChild(entry);
+                    });
+                    if (data.more) {
+                        var next = document.createElement('button');
+                        next.type = 'button';
+                        next.className = 'list-group-item list-group-item-action py-1 text-muted autocomplete-more';
+                        next.textContent = 'More results…';
+                        next.addEventListener('mousedown', function (e) {
+                            e.preventDefault();
+                            page += 1;
+                            fetchPage(false);
+                        });
+                        menu.appendChild(next);
+                    }
+                    if (!data.results.length && page === 1) {
+                        menu.innerHTML = '<div class="list-group-item text-muted py-1">No matches</div>';
+                    }
+                    menu.style.display = 'block';
+                });
+        }
+
+        var timer = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () { fetchPage(true); }, 250);
+        });
+        input.addEventListener('focus', function () { fetchPage(true); });
+        input.addEventListener('blur', function () {
+            menu.style.display = 'none';
+            if (!multiple) renderChips();
+        });
+
+        renderChips();
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('select[data-autocomplete-url]').forEach(setup);
+    });
+})();
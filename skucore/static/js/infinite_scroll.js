@@ -0,0 +1,67 @@
+/*
+ * Infinite scroll for portal tables.
+ *
+ * <tbody data-infinite-scroll="/portal/students/rows/" data-search="#studentSearch">
+ *
+ * Rows are fetched as HTML fragments. A fragment ends with a
+ * <tr class="infinite-scroll-next" data-next="..."> sentinel; when it
+ * scrolls into view the next page is fetched and the sentinel replaced.
+ * Typing in the optional search input reloads the table from the first page.
+ */
+(function () {
+    function setup(tbody) {
+        var source = tbody.dataset.infiniteScroll;
+        var loading = false;
+        var generation = 0;
+        var observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    load(entry.target.dataset.next, entry.target);
+                }
+            });
+        }, { rootMargin: '200px' });
+
+        function load(url, sentinel) {
+            if (loading) return;
+            loading = true;
+            var current = generation;
+            fetch(url, { credentials: 'same-origin', headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+                .then(function (response) { return response.text(); })
+                .then(function (html) {
+                    if (current !== generation) return;  // A newer search replaced the table
+                    if (sentinel) {
+                        observer.unobserve(sentinel);
+                        sentinel.remove();
+                    } else {
+                        tbody.innerHTML = '';
+                    }
+                    tbody.insertAdjacentHTML('beforeend', html);
+                    var next = tbody.querySelector('tr.infinite-scroll-next');
+                    if (next) observer.observe(next);
+                })
+                .finally(function () { loading = false; });
+        }
+
+        function firstPage() {
+            generation += 1;
+            loading = false;
+            var url = new URL(source, window.location.href);
+            if (search && search.value.trim()) url.searchParams.set('q', search.value.trim());
+            load(url.toString(), null);
+        }
+
+        var search = tbody.dataset.search ? document.querySelector(tbody.dataset.search) : null;
+        if (search) {
+            var timer = null;
+            search.addEventListener('input', function () {
+                clearTimeout(timer);
+                timer = setTimeout(firstPage, 300);
+            });
+        }
+        firstPage();
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-infinite-scroll]').forEach(setup);
+    });
+})();
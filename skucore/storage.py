@@ -0,0 +1,263 @@
+"""
+Content-addressed storage for Record.file.
+
+Files are stored under their SHA-256, so the same document uploaded on an
+onboarding request, on the student and again for a sibling is written
+once:
+
+    records/<aa>/<bb>/<sha256><ext>
+
+Saving content that already exists skips the write and returns the same
+name. Every stored file has a RecordBlob row counting the Records that
+point at it; the signal handlers in skucore.signals keep the counts up to
+date. Blobs whose count drops to zero are deleted by gc_record_blobs after
+a grace period, which also covers files written by uploads that never
+produced a Record.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+BLOB_ROOT = 'records'
+BLOCK_SIZE = 64 * 1024
+PARTIAL_SUFFIX = '.partial'
+BLOB_NAME = re.compile(r'^records/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(?P<ext>\.[\w.]{0,16})?$')
+
+
+def blob_sha256(name):
+    """SHA-256 encoded in a content-addressed name, or None for other names"""
+    match = BLOB_NAME.match(name or '')
+    return match.group('sha256') if match else None
+
+
+def blob_name(sha256, filename=''):
+    ext = os.path.splitext(filename)[1].lower()
+    if not re.fullmatch(r'\.[\w.]{0,16}', ext):
+        ext = ''
+    return posixpath.join(BLOB_ROOT, sha256[:2], sha256[2:4], sha256 + ext)
+
+
+def content_sha256(content):
+    """Streaming SHA-256 of a File; a precomputed `sha256` attribute is trusted"""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(BLOCK_SIZE):
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by their content and never writes a duplicate"""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = blob_name(content_sha256(content), name)
+        if self._claim(name):
+            return name
+        # Write under a temporary name and rename, so a blob name never
+        # points at a partly written file
+        partial = super()._save(f'{name}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}', content)
+        os.replace(self.path(partial), self.path(name))
+        return name
+
+    def _claim(self, name):
+        """
+        True if `name` already exists. Marks it as recently used first, so
+        gc_record_blobs leaves it alone until the new Record references it.
+        """
+        from .models import RecordBlob
+        if not self.exists(name):
+            return False
+        RecordBlob.objects.filter(name=name).update(updated_at=timezone.now())
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False  # Collected in the meantime
+        return True
+
+
+def record_storage():
+    """Storage of Record.file (callable, so migrations do not depend on the class)"""
+    return _record_storage
+
+
+_record_storage = ContentAddressedStorage()
+
+
+# ============ REFERENCE COUNTS ============
+
+def add_reference(name):
+    """Count one more Record pointing at `name`"""
+    from .models import RecordBlob
+    if not blob_sha256(name):
+        return
+    if RecordBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=timezone.now()):
+        return
+    storage = record_storage()
+    size = storage.size(name) if storage.exists(name) else 0
+    try:
+        with transaction.atomic():
+            RecordBlob.objects.create(name=name, sha256=blob_sha256(name), size=size, ref_count=1)
+    except IntegrityError:
+        RecordBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+
+
+def remove_reference(name):
+    """Count one Record fewer pointing at `name`; the blob is collected later at zero"""
+    from .models import RecordBlob
+    if blob_sha256(name):
+        RecordBlob.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, updated_at=timezone.now()
+        )
+
+
+def recount_references():
+    """Recompute every count from the Record table. Returns the number of blobs changed."""
+    from .models import Record, RecordBlob
+    counts = {}
+    for name in Record.objects.exclude(file='').values_list('file', flat=True).iterator():
+        if blob_sha256(name):
+            counts[name] = counts.get(name, 0) + 1
+
+    changed = 0
+    known = set()
+    for blob in RecordBlob.objects.all().iterator():
+        known.add(blob.name)
+        expected = counts.get(blob.name, 0)
+        if blob.ref_count != expected:
+            RecordBlob.objects.filter(pk=blob.pk).update(ref_count=expected, updated_at=timezone.now())
+            changed += 1
+    storage = record_storage()
+    missing = [
+        RecordBlob(
+            name=name, sha256=blob_sha256(name), ref_count=count,
+            size=storage.size(name) if storage.exists(name) else 0,
+        )
+        for name, count in counts.items() if name not in known
+    ]
+    RecordBlob.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+    return changed + len(missing)
+
+
+def migrate_legacy_files(school_id=None):
+    """
+    Move Record files saved before content addressing into the blob store,
+    deleting each old file once no Record points at it. Returns (records moved, missing files).
+    """
+    from .models import Record
+    storage = record_storage()
+    records = Record.objects.exclude(file='')
+    if school_id:
+        records = records.filter(school_id=school_id)
+    moved = missing = 0
+    for record in records.iterator():
+        legacy = record.file.name
+        if blob_sha256(legacy):
+            continue
+        if not storage.exists(legacy):
+            missing += 1
+            continue
+        with storage.open(legacy, 'rb') as handle:
+            record.file.name = storage.save(legacy, File(handle, legacy))
+        record.save(update_fields=['file', 'sha256', 'size', 'updated_at'])
+        if not Record.objects.filter(file=legacy).exists():
+            storage.delete(legacy)
+        moved += 1
+    return moved, missing
+
+
+# ============ GARBAGE COLLECTION ============
+
+def _walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from _walk(storage, posixpath.join(path, directory))
+
+
+def collect_garbage(grace_hours=None, dry_run=False):
+    """
+    Delete blobs nobody has referenced for `grace_hours`, and stray blob
+    files without a RecordBlob row (uploads that never became a Record,
+    partial writes of crashed workers).
+    Returns (files deleted, bytes freed).
+    """
+    from .models import RecordBlob
+    if grace_hours is None:
+        grace_hours = getattr(settings, 'RECORD_BLOB_GC_GRACE_HOURS', 24)
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+    storage = record_storage()
+    deleted = freed = 0
+
+    for blob in RecordBlob.objects.filter(ref_count=0, updated_at__lt=cutoff).iterator():
+        with transaction.atomic():
+            # Re-check under the lock: a new Record may have just claimed it
+            locked = RecordBlob.objects.select_for_update().filter(
+                pk=blob.pk, ref_count=0, updated_at__lt=cutoff
+            ).first()
+            if locked is None:
+                continue
+            if not dry_run:
+                storage.delete(locked.name)
+                locked.delete()
+        deleted += 1
+        freed += blob.size
+
+    if storage.exists(BLOB_ROOT):
+        known = set(RecordBlob.objects.values_list('name', flat=True))
+        for name in _walk(storage, BLOB_ROOT):
+            if name in known or not (blob_sha256(name) or name.endswith(PARTIAL_SUFFIX)):
+                continue
+            if storage.get_modified_time(name) >= cutoff:
+                continue  # Possibly an upload still being saved
+            size = storage.size(name)
+            if not dry_run:
+                storage.delete(name)
+            deleted += 1
+            freed += size
+    return deleted, freed
+
+
+# ============ ACCOUNTING ============
+
+def storage_usage(school_id):
+    """
+    Record storage of one school: `logical_bytes` counts every Record,
+    `stored_bytes` counts each distinct blob once.
+    """
+    from .models import Record, RecordBlob
+    names = Record.objects.filter(school_id=school_id).exclude(file='').values_list('file', flat=True)
+    blobs = RecordBlob.objects.filter(name__in=names)
+    sizes = dict(blobs.values_list('name', 'size'))
+    records = logical = 0
+    for name in names:
+        records += 1
+        logical += sizes.get(name, 0)
+    return {
+        'records': records,
+        'blobs': len(sizes),
+        'logical_bytes': logical,
+        'stored_bytes': sum(sizes.values()),
+    }
@@ -0,0 +1,11 @@
+from django import template
+
+from skucore.media import signed_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def media_url(instance):
+    """Signed, short-lived URL of a Record file or a student photo"""
+    return signed_url(instance)
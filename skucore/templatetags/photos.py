@@ -0,0 +1,26 @@
+from django import template
+from django.utils.html import format_html
+
+from skucore.media import signed_url
+from skucore.photos import rendition_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def photo_picture(instance, rendition, alt='', css_class=''):
+    """
+    <picture> for a processed photo rendition with a WebP source and a JPEG
+    fallback. Falls back to the original upload until processing finishes.
+    """
+    if not instance.photo:
+        return ''
+    jpeg = rendition_url(instance, rendition, 'jpeg')
+    if jpeg is None:
+        return format_html('<img src="{}" alt="{}" class="{}">', signed_url(instance), alt, css_class)
+    entry = instance.photo_renditions[rendition]
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">'
+        '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy"></picture>',
+        rendition_url(instance, rendition, 'webp'), jpeg, alt, css_class, entry['width'], entry['height'],
+    )
@@ -0,0 +1,180 @@
+"""
+Process-local cache for tenant (school) resolution.
+
+SchoolContextMiddleware and the API resolve the active school on every
+request. These caches keep School rows and user -> primary school mappings
+in memory so that a warm request costs no extra queries. Entries are evicted
+LRU-style and expire after a TTL.
+
+Every entry is stamped with the tenant generation, a counter kept in the
+Django cache. The signal handlers in skucore.signals bump it on any School
+or UserSchool write, so with a shared cache (REDIS_URL) every worker stops
+serving its older entries on the next lookup, not after the TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_MISSING = object()
+
+GENERATION_KEY = 'skucore:tenant-generation'
+
+# Every LRUCache created in this process, for stats reporting
+_registry = []
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters"""
+
+    def __init__(self, name, max_size=1024, ttl=300):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry.append(self)
+
+    def get(self, key, default=None, version=None):
+        """Cached value, or default when missing, expired or stored under another version"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at, entry_version = entry
+                if expires_at > time.monotonic() and entry_version == version:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, version=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl, version)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        """Drop every entry whose (key, value) matches predicate"""
+        with self._lock:
+            stale = [key for key, (value, _, _) in self._data.items() if predicate(key, value)]
+            for key in stale:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+_max_size = getattr(settings, 'TENANT_CACHE_MAX_SIZE', 1024)
+_ttl = getattr(settings, 'TENANT_CACHE_TTL', 300)
+
+# school_id -> School (or None when the school does not exist)
+school_cache = LRUCache('schools', max_size=_max_size, ttl=_ttl)
+# user_id -> school_id of the user's primary (or first active) school, or None
+user_school_cache = LRUCache('user_schools', max_size=_max_size, ttl=_ttl)
+
+
+def get_generation():
+    """Current tenant generation (0 until the first invalidation)"""
+    return cache.get(GENERATION_KEY, 0)
+
+
+def bump_generation():
+    """Make every worker's cached tenant entries stale"""
+    if not cache.add(GENERATION_KEY, 1, timeout=None):
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, timeout=None)
+
+
+def get_school(school_id, generation=None):
+    """Return the School with this id, or None if it does not exist"""
+    if generation is None:
+        generation = get_generation()
+    school = school_cache.get(school_id, _MISSING, version=generation)
+    if school is _MISSING:
+        from .models import School
+        school = School.objects.filter(id=school_id).first()
+        school_cache.set(school_id, school, version=generation)
+    return school
+
+
+def get_user_school(user, generation=None):
+    """
+    Return the user's primary active school, falling back to any active
+    school, or None if the user has no active school membership.
+    """
+    if not user or not user.is_authenticated:
+        return None
+    if generation is None:
+        generation = get_generation()
+    school_id = user_school_cache.get(user.id, _MISSING, version=generation)
+    if school_id is _MISSING:
+        from .models import UserSchool
+        memberships = UserSchool.objects.filter(user=user, is_active=True).select_related('school')
+        user_school = memberships.filter(is_primary=True).first() or memberships.first()
+        if user_school and user_school.school_id:
+            school_id = user_school.school_id
+            school_cache.set(school_id, user_school.school, version=generation)
+        else:
+            school_id = None
+        user_school_cache.set(user.id, school_id, version=generation)
+    if school_id is None:
+        return None
+    return get_school(school_id, generation)
+
+
+def invalidate_school(school_id):
+    school_cache.delete(school_id)
+    user_school_cache.delete_where(lambda user_id, cached_id: cached_id == school_id)
+    bump_generation()
+
+
+def invalidate_user(user_id):
+    user_school_cache.delete(user_id)
+    bump_generation()
+
+
+def invalidate_users(user_ids):
+    user_ids = set(user_ids)
+    user_school_cache.delete_where(lambda user_id, cached_id: user_id in user_ids)
+    bump_generation()
+
+
+def cache_stats():
+    """Hit/miss counters for every LRUCache in this process"""
+    return [cache.stats() for cache in _registry]
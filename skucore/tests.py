@@ -1,3 +1,488 @@
-from django.test import TestCase
+"""
+Endpoint benchmarks with query budgets.
 
-# Create your tests here.
+setUpTestData seeds one fixed-size tenant with skucore.seeding (the data
+behind manage.py seed_scale). Every route of skucore/api_urls.py and the
+main HTML views is measured twice - cold, right after the process and
+shared caches are cleared (reported as <name>.cold), then warm - for wall
+time, query count and response size. A test fails when a route runs more
+queries than its budget. Budgets do not depend on the size of the tenant,
+so an N+1 regression shows up as a failure. The write tests also check
+that the derived data (daily summaries, attendance bitmaps, upload
+digests) agrees with the rows it is derived from, and the error tests that
+malformed input gets a 4xx rather than a 500.
+
+JobQueueTests run the job queue outside a test transaction, the way
+run_workers does, so commits and on_commit hooks really happen.
+
+Set BENCHMARK_REPORT to write the measurements as JSON, e.g. to diff two
+commits:
+
+    BENCHMARK_REPORT=bench.json python manage.py test skucore.tests
+"""
+
+import base64
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from . import attendance_index, jobs, media, tenant_cache
+from .school_stats import get_school_stats
+from .models import (
+    Attendance, AttendanceDailySummary, Grade, Job, Parent, Record, School, Student, StudentOnboardingRequest,
+)
+from .seeding import seed_school
+
+
+# Budgets below hold for any tenant size; this only sets how long the run takes
+BENCH_STUDENTS = 80
+BENCH_YEARS = 1
+BENCH_END_DATE = date(2026, 6, 30)
+BENCH_PASSWORD = 'bench-pass-2026'
+MEDIA_ROOT = tempfile.mkdtemp(prefix='skulz-bench-media-')
+UPLOAD_SESSION_DIR = tempfile.mkdtemp(prefix='skulz-bench-uploads-')
+STAFF_IMPORT_DIR = tempfile.mkdtemp(prefix='skulz-bench-imports-')
+
+# name, method, path, cold and warm query budgets, expected status, request options.
+# {student}, {parent}, ... are filled in from the seeded tenant.
+API_READS = [
+    ('api.me', 'get', '/api/auth/me/', 3, 1, 200, {}),
+    ('api.cache_stats', 'get', '/api/system/cache-stats/', 3, 1, 200, {}),
+    ('api.storage_usage', 'get', '/api/system/storage-usage/', 5, 3, 200, {}),
+    ('api.search', 'get', '/api/search/?q=em', 4, 2, 200, {}),
+    ('api.students.list', 'get', '/api/students/', 10, 8, 200, {}),
+    ('api.students.list_cursor', 'get', '/api/students/?pagination=cursor', 9, 7, 200, {}),
+    ('api.students.list_fields', 'get', '/api/students/?fields=id,first_name,last_name', 5, 3, 200, {}),
+    ('api.students.detail', 'get', '/api/students/{student}/', 9, 7, 200, {}),
+    ('api.students.active', 'get', '/api/students/active/', 9, 7, 200, {}),
+    ('api.students.attendance', 'get', '/api/students/{student}/attendance/', 10, 8, 200, {}),
+    ('api.students.attendance_stats', 'get', '/api/students/{student}/attendance_stats/?year=2025', 10, 8, 200, {}),
+    ('api.students.records', 'get', '/api/students/{student}/records/', 9, 7, 200, {}),
+    ('api.students.records_archive', 'get', '/api/students/{student}/records/archive/', 10, 8, 200, {}),
+    ('api.parents.list', 'get', '/api/parents/', 5, 3, 200, {}),
+    ('api.parents.detail', 'get', '/api/parents/{parent}/', 4, 2, 200, {}),
+    ('api.parents.students', 'get', '/api/parents/{parent}/students/', 10, 8, 200, {}),
+    ('api.grades.list', 'get', '/api/grades/', 5, 3, 200, {}),
+    ('api.grades.detail', 'get', '/api/grades/{grade}/', 4, 2, 200, {}),
+    ('api.grades.records_archive', 'get', '/api/grades/{grade}/records/archive/', 6, 4, 200, {}),
+    ('api.subjects.list', 'get', '/api/subjects/', 5, 3, 200, {}),
+    ('api.routes.list', 'get', '/api/routes/', 5, 3, 200, {}),
+    ('api.buses.list', 'get', '/api/buses/', 5, 3, 200, {}),
+    ('api.buses.students', 'get', '/api/buses/{bus}/students/', 10, 8, 200, {}),
+    ('api.attendance.list', 'get', '/api/attendance/', 5, 3, 200, {}),
+    ('api.attendance.list_cursor', 'get', '/api/attendance/?pagination=cursor', 4, 2, 200, {}),
+    ('api.attendance.rates', 'get', '/api/attendance/rates/?year=2025', 4, 2, 200, {}),
+    ('api.attendance.absent_on', 'get', '/api/attendance/absent_on/?dates=2026-06-29,2026-06-30', 5, 3, 200, {}),
+    ('api.attendance.chronic_absence', 'get', '/api/attendance/chronic_absence/?as_of=2026-06-30', 5, 3, 200, {}),
+    ('api.attendance.by_date', 'get', '/api/attendance/by_date/?date=2026-06-30', 4, 2, 200, {}),
+    ('api.attendance.summary', 'get', '/api/attendance/summary/?from_date=2026-06-01&to_date=2026-06-30', 4, 2, 200, {}),
+    ('api.onboarding.list', 'get', '/api/onboarding/', 5, 3, 200, {}),
+    ('api.onboarding.pending', 'get', '/api/onboarding/pending/', 4, 2, 200, {}),
+    ('api.onboarding.detail', 'get', '/api/onboarding/{onboarding}/', 4, 2, 200, {}),
+    ('api.uploads.list', 'get', '/api/uploads/', 4, 2, 200, {}),
+]
+
+# name, method, path, expected status, request options: malformed input must not 500
+API_ERRORS = [
+    ('students.bad_cursor', 'get', '/api/students/?pagination=cursor&cursor={bad_cursor}', 404, {}),
+    ('attendance.bad_cursor', 'get', '/api/attendance/?pagination=cursor&cursor={bad_cursor}', 404, {}),
+    ('attendance.garbage_cursor', 'get', '/api/attendance/?pagination=cursor&cursor=%%%', 404, {}),
+    ('attendance.rates.year_high', 'get', '/api/attendance/rates/?year=99999', 400, {}),
+    ('attendance.rates.year_negative', 'get', '/api/attendance/rates/?year=-5', 400, {}),
+    ('attendance.rates.year_huge', 'get', '/api/attendance/rates/?year=100000000000', 400, {}),
+    ('students.attendance_stats.year_high', 'get', '/api/students/{student}/attendance_stats/?year=99999', 400, {}),
+    ('students.attendance_stats.bad_date', 'get', '/api/students/{student}/attendance_stats/?from_date=2026-13-45', 400, {}),
+    ('attendance.chronic_absence.days_huge', 'get', '/api/attendance/chronic_absence/?days=999999999', 400, {}),
+    ('attendance.chronic_absence.days_zero', 'get', '/api/attendance/chronic_absence/?days=0', 400, {}),
+    ('attendance.chronic_absence.threshold', 'get', '/api/attendance/chronic_absence/?threshold=2', 400, {}),
+    ('staff.import.no_file', 'post', '/api/staff/import/', 400, {}),
+    ('staff.import.bad_header', 'post', '/api/staff/import/', 400, {'file': ('staff.csv', b'name,email\nx,y\n')}),
+    ('staff.import.not_utf8', 'post', '/api/staff/import/', 400, {'file': ('staff.csv', b'username,role\n\xff\xfe,teacher\n')}),
+    ('staff.import_status.unknown', 'get', '/api/staff/import/999999/', 404, {}),
+]
+
+# name, path, cold and warm query budgets
+HTML_VIEWS = [
+    ('html.dashboard', '/', 8, 2),
+    ('html.school_selection', '/school-selection/', 4, 3),
+    ('html.portal_admin', '/portal/admin/', 6, 4),
+    ('html.portal_student_rows', '/portal/students/rows/', 4, 3),
+    ('html.portal_parent_rows', '/portal/parents/rows/', 4, 3),
+    ('html.students', '/students/', 4, 3),
+    ('html.student_detail', '/students/{student}/', 8, 7),
+    ('html.student_edit', '/students/{student}/edit/', 11, 10),
+    ('html.parents', '/parents/', 4, 3),
+    ('html.parent_detail', '/parents/{parent}/', 7, 6),
+    ('html.grades', '/grades/', 4, 3),
+    ('html.subjects', '/subjects/', 4, 3),
+    ('html.routes', '/routes/', 5, 4),
+    ('html.buses', '/buses/', 6, 5),
+    ('html.bus_detail', '/buses/{bus}/', 7, 6),
+    ('html.attendance', '/attendance/', 5, 3),
+    ('html.attendance_create', '/attendance/create/', 3, 2),
+    ('html.onboarding', '/onboarding/', 4, 3),
+    ('html.onboarding_detail', '/onboarding/{onboarding}/', 10, 9),
+    ('html.onboarding_pending', '/onboarding/pending-approvals/', 5, 4),
+    ('html.autocomplete', '/autocomplete/students/?q=a', 4, 3),
+]
+
+
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    MEDIA_ROOT=MEDIA_ROOT,
+    UPLOAD_SESSION_DIR=UPLOAD_SESSION_DIR,
+    STAFF_IMPORT_DIR=STAFF_IMPORT_DIR,
+    JOBS_EAGER=False,
+)
+class EndpointBenchmarks(TestCase):
+    results = []
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = seed_school(
+            1, BENCH_STUDENTS, years=BENCH_YEARS, seed=0,
+            end_date=BENCH_END_DATE, password_hash=make_password(BENCH_PASSWORD),
+        )
+        cls.school = School.objects.get(code='SCALE001')
+        cls.admin = User.objects.get(username='scale001.admin.0')
+        cls.admin.is_staff = True
+        cls.admin.save()
+        cls.token = Token.objects.create(user=cls.admin)
+
+        student = Student.objects.filter(school=cls.school, records__isnull=False, bus__isnull=False).first()
+        cls.ids = {
+            'student': student.id,
+            'parent': Parent.objects.filter(school=cls.school).first().id,
+            'grade': student.grade_id,
+            'bus': student.bus_id,
+            'onboarding': StudentOnboardingRequest.objects.filter(school=cls.school).first().id,
+        }
+        cls.record = Record.objects.filter(student=student).first()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_SESSION_DIR, ignore_errors=True)
+        shutil.rmtree(STAFF_IMPORT_DIR, ignore_errors=True)
+        path = os.environ.get('BENCHMARK_REPORT')
+        if path:
+            report = {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'machine': platform.machine(),
+                'tenant': cls.tenant,
+                'endpoints': sorted(cls.results, key=lambda result: result['name']),
+            }
+            with open(path, 'w') as handle:
+                json.dump(report, handle, indent=2)
+
+    def setUp(self):
+        # Process-local caches outlive the rolled-back rows of other tests
+        self.clear_caches()
+        self.api_headers = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+
+    # ============ HELPERS ============
+
+    def clear_caches(self):
+        for lru in tenant_cache._registry:
+            lru.clear()
+        cache.clear()
+
+    def measure(self, name, budget, request, expected_status=200, warm=True, cold_budget=None):
+        """
+        Run `request()` and check the query budget. With cold_budget, it is
+        first measured with empty caches as <name>.cold (which also warms
+        them); otherwise it is warmed up once unless it has side effects.
+        """
+        if cold_budget is not None:
+            self.clear_caches()
+            self._measure(f'{name}.cold', cold_budget, request, expected_status)
+        elif warm:
+            request()
+        return self._measure(name, budget, request, expected_status)
+
+    def _measure(self, name, budget, request, expected_status):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = request()
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = time.perf_counter() - started
+        self.results.append({
+            'name': name,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 2),
+            'queries': len(queries),
+            'budget': budget,
+            'bytes': size,
+        })
+        self.assertEqual(response.status_code, expected_status, f'{name}: {getattr(response, "content", b"")[:300]}')
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{name} ran {len(queries)} queries (budget {budget}):\n'
+            + '\n'.join(query['sql'][:200] for query in queries.captured_queries),
+        )
+        return response
+
+    def api(self, method, path, **options):
+        return getattr(self.client, method)(path.format(**self.ids), **self.api_headers, **options)
+
+    def upload_session(self, content):
+        response = self.api('post', '/api/uploads/', content_type='application/json', data={
+            'student': self.ids['student'], 'record_type': 'other', 'filename': 'bench.bin', 'total_size': len(content),
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    # ============ API ============
+
+    def test_api_reads(self):
+        for name, method, path, cold_budget, budget, expected, options in API_READS:
+            with self.subTest(name):
+                self.measure(name, budget, lambda: self.api(method, path, **options), expected, cold_budget=cold_budget)
+
+    def test_api_errors(self):
+        bad_cursor = base64.urlsafe_b64encode(b'{"p":["notadate","x"],"r":0}').decode().rstrip('=')
+        for name, method, path, expected, files in API_ERRORS:
+            with self.subTest(name):
+                data = {key: SimpleUploadedFile(*value) for key, value in files.items()}
+                response = self.api(method, path.replace('{bad_cursor}', bad_cursor), **({'data': data} if data else {}))
+                self.assertEqual(response.status_code, expected, f'{name}: {response.content[:300]}')
+
+    def test_api_login_logout(self):
+        self.measure('api.auth.login', 2, lambda: self.client.post(
+            '/api/auth/login/', {'username': self.admin.username, 'password': BENCH_PASSWORD},
+            content_type='application/json',
+        ), warm=False)
+        other = Token.objects.create(user=User.objects.get(username='scale001.operator.3'))
+        self.measure('api.auth.logout', 4, lambda: self.client.post(
+            '/api/auth/logout/', HTTP_AUTHORIZATION=f'Token {other.key}',
+        ), warm=False)
+
+    def test_api_student_writes(self):
+        grade = Grade.objects.filter(school=self.school).first()
+        response = self.measure('api.students.create', 16, lambda: self.api(
+            'post', '/api/students/', content_type='application/json', data={
+                'first_name': 'Bench', 'last_name': 'Mark', 'email': 'bench.mark@example.com',
+                'date_of_birth': '2015-04-01', 'grade': grade.id,
+            },
+        ), 201, warm=False)
+        new_id = response.json()['id']
+        self.measure('api.students.update', 16, lambda: self.api(
+            'patch', f'/api/students/{new_id}/', content_type='application/json', data={'last_name': 'Marks'},
+        ), warm=False)
+        self.measure('api.students.records_upload', 11, lambda: self.api(
+            'post', f'/api/students/{new_id}/records/', data={
+                'record_type': 'other', 'description': 'bench',
+                'file': SimpleUploadedFile('bench.txt', b'benchmark record'),
+            },
+        ), 201, warm=False)
+        self.measure('api.students.delete', 20, lambda: self.api('delete', f'/api/students/{new_id}/'), 204, warm=False)
+
+    def test_api_attendance_bulk(self):
+        students = Student.objects.filter(school=self.school).values_list('id', flat=True)[:40]
+        items = [{'student': student_id, 'date': '2026-07-02', 'status': 'present'} for student_id in students]
+        self.measure('api.attendance.bulk', 12, lambda: self.api(
+            'post', '/api/attendance/bulk/', data=items, content_type='application/json',
+        ), 201, warm=False)
+
+        attendance = Attendance.objects.filter(school=self.school)
+        summaries = AttendanceDailySummary.objects.filter(school=self.school).aggregate(
+            total=Sum('total'), present=Sum('present'), absent=Sum('absent'), late=Sum('late'), excused=Sum('excused'),
+        )
+        statuses = Counter(attendance.values_list('status', flat=True))
+        self.assertEqual(summaries, {'total': attendance.count(), **{s: statuses[s] for s in attendance_index.STATUSES}})
+
+        academic_year = attendance_index.academic_year_for(date(2026, 7, 2))
+        expected = {}
+        for student_id, day, mark in attendance.values_list('student_id', 'date', 'status'):
+            if attendance_index.academic_year_for(day) == academic_year:
+                expected.setdefault(student_id, Counter())[mark] += 1
+        rates = {
+            row['student']: {s: row[s] for s in attendance_index.STATUSES}
+            for row in attendance_index.school_rates(self.school, academic_year)
+        }
+        self.assertEqual(rates, {
+            student_id: {s: counts[s] for s in attendance_index.STATUSES} for student_id, counts in expected.items()
+        })
+
+    def test_api_onboarding_decisions(self):
+        pending = list(StudentOnboardingRequest.objects.filter(school=self.school).values_list('id', flat=True)[:2])
+        StudentOnboardingRequest.objects.filter(id__in=pending).update(status='pending')
+        self.measure('api.onboarding.reject', 9, lambda: self.api(
+            'post', f'/api/onboarding/{pending[0]}/reject/', data={'reason': 'bench'}, content_type='application/json',
+        ), warm=False)
+        self.measure('api.onboarding.approve', 29, lambda: self.api(
+            'post', f'/api/onboarding/{pending[1]}/approve/'
+        ), 201, warm=False)
+
+    def test_api_upload_session(self):
+        content = b'x' * 4096
+        response = self.measure('api.uploads.create', 5, lambda: self.api(
+            'post', '/api/uploads/', content_type='application/json', data={
+                'student': self.ids['student'], 'record_type': 'other',
+                'filename': 'bench.bin', 'total_size': len(content),
+            },
+        ), 201, warm=False)
+        session = response.json()['id']
+        self.measure('api.uploads.chunk', 7, lambda: self.api(
+            'put', f'/api/uploads/{session}/chunk/?offset=0', data=content, content_type='application/octet-stream',
+        ), warm=False)
+        response = self.measure('api.uploads.finalize', 14, lambda: self.api(
+            'post', f'/api/uploads/{session}/finalize/'
+        ), 201, warm=False)
+
+        record = Record.objects.get(id=response.json()['record']['id'])
+        with record.file.open('rb') as stored:
+            self.assertEqual(hashlib.sha256(stored.read()).hexdigest(), hashlib.sha256(content).hexdigest())
+        self.assertEqual(record.sha256, hashlib.sha256(content).hexdigest())
+
+    def test_api_upload_errors(self):
+        content = b'y' * 1000
+        session = self.upload_session(content)
+        chunk = lambda offset, data: self.api(
+            'put', f'/api/uploads/{session}/chunk/?offset={offset}', data=data, content_type='application/octet-stream',
+        )
+        self.assertEqual(chunk(500, content[500:]).status_code, 409)  # Past the bytes received
+        self.assertEqual(chunk(0, content + b'z').status_code, 400)  # Past the declared size
+        self.assertEqual(self.api('post', f'/api/uploads/{session}/finalize/').status_code, 400)
+        self.assertEqual(chunk(0, content[:600]).status_code, 200)
+        self.assertEqual(chunk(400, content[400:]).status_code, 200)  # Resent overlap
+        self.assertEqual(self.api('post', f'/api/uploads/{session}/finalize/').status_code, 201)
+        self.assertEqual(os.listdir(UPLOAD_SESSION_DIR), [])
+
+    def test_api_staff_import(self):
+        rows = 'username,email,role,password\n' + ''.join(
+            f'bench.staff.{n},staff{n}@example.com,teacher,Bench-Pass-{n}x\n' for n in range(50)
+        )
+        response = self.measure('api.staff.import', 4, lambda: self.api(
+            'post', '/api/staff/import/',
+            data={'file': SimpleUploadedFile('staff.csv', rows.encode())},
+        ), 202, warm=False)
+        self.assertEqual(jobs.run_pending(), 1)
+        response = self.measure('api.staff.import_status', 2, lambda: self.api(
+            'get', f'/api/staff/import/{response.json()["job"]}/'
+        ))
+        self.assertEqual(response.json()['status'], 'succeeded')
+        self.assertEqual(response.json()['created'], 50)
+        self.assertEqual(os.listdir(STAFF_IMPORT_DIR), [])
+        self.assertNotIn('Bench-Pass', json.dumps(Job.objects.get(id=response.json()['job']).args))
+
+    # ============ HTML ============
+
+    def test_html_views(self):
+        self.client.force_login(self.admin)
+        for name, path, cold_budget, budget in HTML_VIEWS:
+            with self.subTest(name):
+                self.measure(name, budget, lambda: self.client.get(path.format(**self.ids)), cold_budget=cold_budget)
+
+    def test_html_invalid_choices(self):
+        self.client.force_login(self.admin)
+        for path in ('/students/create/', '/students/{student}/edit/'):
+            with self.subTest(path):
+                response = self.client.post(path.format(**self.ids), {
+                    'first_name': '', 'parents': ['abc', self.ids['parent']], 'subjects': ['1.5'], 'grade': 'x',
+                })
+                self.assertEqual(response.status_code, 200)  # The form comes back with its errors
+                self.assertContains(response, f'value="{self.ids["parent"]}" selected')
+
+    def test_signed_media(self):
+        self.client.force_login(self.admin)
+        url = media.signed_url(self.record)
+        self.measure('html.media_file', 1, lambda: self.client.get(url), cold_budget=1)
+
+    def test_signed_media_types(self):
+        self.client.force_login(self.admin)
+        url = media.signed_url(self.record)
+        self.assertEqual(self.client.get(url.rsplit('/', 1)[0] + '/x.html').status_code, 404)
+        for filename, body, disposition in [
+            ('page.html', b'<script>alert(1)</script>', 'attachment'),
+            ('drawing.svg', b'<svg xmlns="http://www.w3.org/2000/svg"/>', 'attachment'),
+            ('scan.pdf', b'%PDF-1.4\n%%EOF\n', 'inline'),
+        ]:
+            with self.subTest(filename):
+                response = self.api('post', f'/api/students/{self.ids["student"]}/records/', data={
+                    'record_type': 'other', 'file': SimpleUploadedFile(filename, body),
+                })
+                self.assertEqual(response.status_code, 201)
+                response = self.client.get(media.signed_url(Record.objects.get(id=response.json()['id'])))
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Disposition'].startswith(disposition), response['Content-Disposition'])
+                self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+
+
+@jobs.task(max_attempts=2)
+def failing_task(message):
+    raise RuntimeError(message)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    MEDIA_ROOT=MEDIA_ROOT,
+    STAFF_IMPORT_DIR=STAFF_IMPORT_DIR,
+    JOBS_EAGER=False,
+)
+class JobQueueTests(TransactionTestCase):
+    """The job queue in autocommit mode, as run_workers drives it"""
+
+    def setUp(self):
+        seed_school(1, 5, years=BENCH_YEARS, seed=0, end_date=BENCH_END_DATE, password_hash=make_password(BENCH_PASSWORD))
+        for lru in tenant_cache._registry:
+            lru.clear()
+        cache.clear()
+        self.school = School.objects.get(code='SCALE001')
+        self.admin = User.objects.get(username='scale001.admin.0')
+        self.api_headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.admin).key}'}
+
+    def test_staff_import_job(self):
+        users = get_school_stats(self.school)['total_users']
+        rows = 'username,role,password\n' + ''.join(f'job.staff.{n},teacher,Job-Pass-{n}x\n' for n in range(5))
+        response = self.client.post(
+            '/api/staff/import/', {'file': SimpleUploadedFile('staff.csv', rows.encode())}, **self.api_headers,
+        )
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(id=response.json()['job'])
+        self.assertNotIn('Job-Pass', json.dumps(job.args))
+
+        self.assertEqual(jobs.run_pending(), 1)
+        response = self.client.get(f'/api/staff/import/{job.id}/', **self.api_headers)
+        self.assertEqual(response.json()['status'], 'succeeded')
+        self.assertEqual(response.json()['created'], 5)
+        self.assertEqual(os.listdir(STAFF_IMPORT_DIR), [])
+        self.assertEqual(get_school_stats(self.school)['total_users'], users + 5)
+
+    def test_failing_job_is_retried_then_failed(self):
+        job = jobs.enqueue(failing_task, 'boom')
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertIn('boom', job.last_error)
+        self.assertEqual(jobs.run_pending(), 0)  # Backing off
+
+        Job.objects.filter(id=job.id).update(run_at=job.created_at)
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(jobs.run_pending(), 0)
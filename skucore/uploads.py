@@ -0,0 +1,201 @@
+"""
+Resumable, chunked uploads of Record files.
+
+A client opens an UploadSession with the file name and total size, PUTs
+the bytes in chunks at increasing offsets, then finalizes it:
+
+- each chunk is streamed from the request into a part file under
+  UPLOAD_SESSION_DIR, a block at a time
+- finalize hashes the part file while holding the session lock, so the
+  digest always describes the bytes on disk, whichever workers wrote them
+- it then copies the part file into Record.file through the storage
+  backend, again block by block, and removes the part file
+
+A chunk may start anywhere up to the bytes already received, so a client
+that lost the response to a chunk can resend it. The chunk is first read
+from the client into a file of its own with no transaction open; only
+then is the session row locked to re-check the offset, move the bytes
+into the part file and record the new offset, so concurrent chunks for
+one session serialize without a slow client holding the lock.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Record, UploadSession
+
+
+BLOCK_SIZE = 64 * 1024
+
+
+class OffsetMismatch(ValueError):
+    """A chunk does not start within the bytes received so far"""
+
+    def __init__(self, received):
+        super().__init__(f'Chunk must start at or before offset {received}')
+        self.received = received
+
+
+def max_chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 8 * 1024 * 1024)
+
+
+def max_upload_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+
+
+def part_path(session):
+    directory = getattr(settings, 'UPLOAD_SESSION_DIR', os.path.join(settings.BASE_DIR, 'upload_sessions'))
+    return os.path.join(directory, f'{session.id}.part')
+
+
+# ============ HASHING ============
+
+def _hash_file(path, length):
+    """SHA-256 state over the first `length` bytes of a file"""
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as handle:
+        while remaining > 0:
+            block = handle.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+# ============ SESSIONS ============
+
+def _check_chunk(session, offset, length):
+    if session.status != 'open':
+        raise ValueError(f'Upload is {session.status}')
+    if offset < 0 or offset > session.received:
+        raise OffsetMismatch(session.received)
+    if offset + length > session.total_size:
+        raise ValueError(f'Chunk ends past the declared size of {session.total_size} bytes')
+
+
+def write_chunk(session_id, offset, stream, length):
+    """
+    Append `length` bytes read from `stream` at `offset`, discarding anything
+    received after `offset`. Returns the updated session.
+
+    Raises UploadSession.DoesNotExist, OffsetMismatch or ValueError.
+    """
+    if length > max_chunk_size():
+        raise ValueError(f'Chunks may be at most {max_chunk_size()} bytes')
+    session = UploadSession.objects.get(id=session_id)
+    _check_chunk(session, offset, length)
+
+    # Read the (possibly slow) client stream with no transaction or lock held
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    chunk_path = f'{path}.{uuid.uuid4().hex}.chunk'
+    try:
+        written = 0
+        with open(chunk_path, 'wb') as handle:
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break  # Client went away; keep what arrived so it can resume
+                handle.write(block)
+                written += len(block)
+
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(id=session_id)
+            # Another chunk may have landed meanwhile
+            _check_chunk(session, offset, written)
+            if offset == 0:
+                os.replace(chunk_path, path)
+            else:
+                with open(path, 'r+b') as handle, open(chunk_path, 'rb') as chunk:
+                    handle.seek(offset)
+                    handle.truncate()
+                    shutil.copyfileobj(chunk, handle, BLOCK_SIZE)
+            session.received = offset + written
+            session.save(update_fields=['received', 'updated_at'])
+    finally:
+        if os.path.exists(chunk_path):
+            os.remove(chunk_path)
+    return session
+
+
+def finalize(session_id):
+    """
+    Verify a fully received session and turn it into a Record.
+    Returns the session. Raises UploadSession.DoesNotExist or ValueError.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(id=session_id)
+        if session.status == 'completed':
+            return session
+        if session.status != 'open':
+            raise ValueError(f'Upload is {session.status}')
+        if session.received != session.total_size:
+            raise ValueError(f'Received {session.received} of {session.total_size} bytes')
+
+        path = part_path(session)
+        if session.total_size == 0:
+            open(path, 'wb').close()
+        # Hashed from disk under the lock: chunks may have been (re)written by any worker
+        digest = _hash_file(path, session.received).hexdigest()
+        if session.expected_sha256 and session.expected_sha256.lower() != digest:
+            raise ValueError('Checksum mismatch; upload the file again')
+
+        record = Record(
+            school=session.school,
+            student=session.student,
+            onboarding_request=session.onboarding_request,
+            record_type=session.record_type,
+            description=session.description,
+            uploaded_by=session.created_by,
+            size=session.total_size,
+            sha256=digest,
+        )
+        with open(path, 'rb') as handle:
+            content = File(handle)
+            content.sha256 = digest  # Just computed from this file; storage need not hash it again
+            record.file.save(session.filename, content, save=False)
+        record.save()
+
+        session.status = 'completed'
+        session.record = record
+        session.save(update_fields=['status', 'record', 'updated_at'])
+    _remove_part(session)
+    return session
+
+
+def abort(session):
+    session.status = 'aborted'
+    session.save(update_fields=['status', 'updated_at'])
+    _remove_part(session)
+
+
+def _remove_part(session):
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def purge_stale_sessions(hours=None):
+    """Abort open sessions idle for `hours` and delete old finished ones. Returns the count."""
+    if hours is None:
+        hours = getattr(settings, 'UPLOAD_SESSION_TTL_HOURS', 24)
+    cutoff = timezone.now() - timedelta(hours=hours)
+    stale = UploadSession.objects.filter(status='open', updated_at__lt=cutoff)
+    count = 0
+    for session in stale.iterator():
+        abort(session)
+        count += 1
+    UploadSession.objects.exclude(status='open').filter(updated_at__lt=cutoff).delete()
+    return count
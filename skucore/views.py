@@ -8,8 +8,10 @@ from datetime import datetime, timedelta
 import calendar
 
 #Remove the Code Later
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_safe
 from django.db import connection
+from django.db.models import Count, Prefetch, Q
 
 def db_info(request):
     """Temporary debug endpoint - remove after checking"""
@@ -36,6 +38,9 @@ from .forms import (
     BusForm, RouteForm, AttendanceForm, AddressForm, RecordForm
 )
 from .permissions import user_is_operator, user_is_admin
+from .attendance import month_calendar
+from .school_stats import get_school_stats
+from . import media
 
 
 def python_home(request):
@@ -51,21 +56,16 @@ def api_data(request):
 def dashboard(request):
     can_create_student = user_is_admin(request.user)
     context = {
-        'total_students': Student.objects.filter(school=request.school).count(),
-        'total_parents': Parent.objects.filter(school=request.school).count(),
-        'total_grades': Grade.objects.filter(school=request.school).count(),
-        'total_subjects': Subject.objects.filter(school=request.school).count(),
-        'total_buses': Bus.objects.filter(school=request.school).count(),
-        'active_students': Student.objects.filter(school=request.school, is_active=True).count(),
+        **get_school_stats(request.school),
         'can_create_student': can_create_student,
-        'pending_onboarding': StudentOnboardingRequest.objects.filter(school=request.school, status='pending').count(),
     }
     return render(request, 'core/dashboard.html', context)
 
 
 # =============== STUDENT CRUD ===============
 def student_list(request):
-    students = Student.objects.filter(school=request.school).select_related('grade', 'bus')
+    # Grade.__str__ shows the school name
+    students = Student.objects.filter(school=request.school).select_related('grade__school', 'bus')
     # Pass permission to template
     can_create_student = user_is_admin(request.user)
     return render(request, 'core/student/list.html', {'students': students, 'can_create_student': can_create_student})
@@ -92,7 +92,12 @@ def student_create(request):
 
 
 def student_detail(request, pk):
-    student = get_object_or_404(Student, pk=pk, school=request.school)
+    student = get_object_or_404(
+        Student.objects.select_related('grade__school', 'address', 'bus__route__school').prefetch_related(
+            Prefetch('subjects', queryset=Subject.objects.select_related('school')), 'parents',
+        ),
+        pk=pk, school=request.school,
+    )
     attendance_records = student.attendance_records.all()[:10]
     
     # Handle adding new records
@@ -154,7 +159,7 @@ def student_delete(request, pk):
 
 # =============== PARENT CRUD ===============
 def parent_list(request):
-    parents = Parent.objects.filter(school=request.school).select_related('address')
+    parents = Parent.objects.filter(school=request.school).select_related('address').annotate(student_count=Count('students'))
     return render(request, 'core/parent/list.html', {'parents': parents})
 
 
@@ -202,7 +207,7 @@ def parent_delete(request, pk):
 
 # =============== GRADE CRUD ===============
 def grade_list(request):
-    grades = Grade.objects.filter(school=request.school)
+    grades = Grade.objects.filter(school=request.school).annotate(student_count=Count('students'))
     return render(request, 'core/grade/list.html', {'grades': grades})
 
 
@@ -245,7 +250,7 @@ def grade_delete(request, pk):
 
 # =============== SUBJECT CRUD ===============
 def subject_list(request):
-    subjects = Subject.objects.filter(school=request.school)
+    subjects = Subject.objects.filter(school=request.school).annotate(student_count=Count('students'))
     return render(request, 'core/subject/list.html', {'subjects': subjects})
 
 
@@ -351,7 +356,7 @@ def bus_create(request):
 
 def bus_detail(request, pk):
     bus = get_object_or_404(Bus, pk=pk, school=request.school)
-    students = bus.students.all()
+    students = bus.students.select_related('grade__school')
     return render(request, 'core/bus/detail.html', {'bus': bus, 'students': students})
 
 
@@ -408,12 +413,8 @@ def attendance_list(request):
     # Get attendance for selected date
     attendance = Attendance.objects.filter(date=selected_date, school=request.school).select_related('student').order_by('student__first_name')
     
-    # Get all dates with attendance records for calendar highlighting
-    all_attendance_dates = Attendance.objects.filter(school=request.school).values_list('date', flat=True).distinct()
-    dates_with_records = set(all_attendance_dates)
-    
-    # Generate calendar for selected month
-    cal = calendar.monthcalendar(current_year, current_month)
+    # Calendar cells with per-day counts for the displayed month only (cached)
+    cal = month_calendar(request.school.id, current_year, current_month) if request.school else []
     
     # Calculate previous and next month/year
     if current_month == 1:
@@ -432,7 +433,6 @@ def attendance_list(request):
         'calendar': cal,
         'current_month': current_month,
         'current_year': current_year,
-        'dates_with_records': dates_with_records,
         'month_name': calendar.month_name[current_month],
         'prev_month': prev_month,
         'prev_year': prev_year,
@@ -444,7 +444,7 @@ def attendance_list(request):
 
 def attendance_create(request):
     if request.method == 'POST':
-        form = AttendanceForm(request.POST)
+        form = AttendanceForm(request.POST, school=request.school)
         if form.is_valid():
             attendance = form.save(commit=False)
             attendance.school = request.school
@@ -452,20 +452,20 @@ def attendance_create(request):
             messages.success(request, f'Attendance recorded successfully!')
             return redirect('attendance_list')
     else:
-        form = AttendanceForm()
+        form = AttendanceForm(school=request.school)
     return render(request, 'core/attendance/form.html', {'form': form, 'title': 'Record Attendance'})
 
 
 def attendance_update(request, pk):
     attendance = get_object_or_404(Attendance, pk=pk, school=request.school)
     if request.method == 'POST':
-        form = AttendanceForm(request.POST, instance=attendance)
+        form = AttendanceForm(request.POST, instance=attendance, school=request.school)
         if form.is_valid():
             form.save()
             messages.success(request, f'Attendance updated successfully!')
             return redirect('attendance_list')
     else:
-        form = AttendanceForm(instance=attendance)
+        form = AttendanceForm(instance=attendance, school=request.school)
     return render(request, 'core/attendance/form.html', {'form': form, 'title': 'Update Attendance', 'attendance': attendance})
 
 
@@ -477,3 +477,61 @@ def attendance_delete(request, pk):
         return redirect('attendance_list')
     return render(request, 'core/confirm_delete.html', {'object': attendance, 'object_type': 'Attendance'})
 
+
+
+# =============== AUTOCOMPLETE ===============
+AUTOCOMPLETE_PAGE_SIZE = 20
+
+# kind -> (model, fields matched by prefix, ordering, label)
+AUTOCOMPLETE_SOURCES = {
+    'students': (Student, ['first_name', 'last_name', 'email'], ('last_name', 'first_name', 'id'),
+                 lambda obj: f"{obj.first_name} {obj.last_name}"),
+    'parents': (Parent, ['first_name', 'last_name', 'email', 'phone_number'], ('last_name', 'first_name', 'id'),
+                lambda obj: f"{obj.first_name} {obj.last_name} ({obj.get_parent_type_display()})"),
+    'subjects': (Subject, ['subject_name'], ('subject_name', 'id'),
+                 lambda obj: obj.subject_name),
+}
+
+
+@login_required
+def autocomplete(request, kind):
+    """
+    GET /autocomplete/<students|parents|subjects>/?q=&page=1
+    One page of options for the autocomplete widgets, scoped to the current
+    school. Every word of q must prefix-match one of the searched fields.
+    Returns {"results": [{"id": 1, "text": "..."}], "more": bool}.
+    """
+    if kind not in AUTOCOMPLETE_SOURCES:
+        raise Http404('Unknown autocomplete source')
+    model, fields, ordering, label = AUTOCOMPLETE_SOURCES[kind]
+
+    rows = model.objects.filter(school=request.school)
+    for word in request.GET.get('q', '').split()[:5]:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__istartswith': word})
+        rows = rows.filter(condition)
+
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    start = (page - 1) * AUTOCOMPLETE_PAGE_SIZE
+    # Fetch one extra row to know whether there is a next page without a COUNT
+    rows = list(rows.order_by(*ordering)[start:start + AUTOCOMPLETE_PAGE_SIZE + 1])
+    return JsonResponse({
+        'results': [{'id': obj.pk, 'text': label(obj)} for obj in rows[:AUTOCOMPLETE_PAGE_SIZE]],
+        'more': len(rows) > AUTOCOMPLETE_PAGE_SIZE,
+    })
+
+
+# =============== MEDIA ===============
+
+@require_safe
+def media_file(request, token, filename):
+    """
+    GET /media/signed/<token>/<filename>
+    A Record file or photo behind a signed link (see skucore.media); the
+    signature, not the session, grants access.
+    """
+    return media.serve(request, token, filename)
@@ -0,0 +1,37 @@
+#!/bin/bash
+# Start command of the Render web service: prepare the database, then run the
+# job worker (manage.py run_workers) next to gunicorn on the same instance, so
+# both see the same MEDIA_ROOT and STAFF_IMPORT_DIR. The worker is restarted
+# if it exits; both get SIGTERM when the service stops.
+set -o errexit
+
+python manage.py migrate --noinput
+python manage.py collectstatic --noinput --clear
+python manage.py setup_schools
+python manage.py check_db
+
+set +o errexit
+
+run_worker() {
+    trap 'kill -TERM "$child" 2>/dev/null; wait "$child"; exit 0' TERM INT
+    while true; do
+        python manage.py run_workers --threads "${JOB_WORKER_THREADS:-2}" &
+        child=$!
+        wait "$child"
+        echo "run_workers exited with status $?, restarting in 5s" >&2
+        sleep 5
+    done
+}
+
+run_worker &
+worker=$!
+
+gunicorn skubackend.wsgi:application --workers 2 &
+web=$!
+
+trap 'kill -TERM "$web" "$worker" 2>/dev/null' TERM INT
+wait "$web"
+status=$?
+kill -TERM "$web" "$worker" 2>/dev/null
+wait
+exit $status